@@ -3,6 +3,7 @@ from logging import Logger as __Logger
 from logging import getLogger
 
 from anilist.client.anilist_client import Anilist
+from anilist.client.sync_client import SyncAnilist
 
 from . import errors
 
@@ -0,0 +1,8 @@
+from .search import TitleIndex, normalize
+from .store import INDEXES, MediaCatalogue
+from .engine import QueryEngine
+from .timeline import AiringTimeline, RefreshScheduler, time_until
+from .sync import DeltaSync
+from .snapshot import CatalogueSnapshot, write_snapshot
+from .charts import ORDERS, SeasonCharts
+from .similarity import TagSimilarity
@@ -0,0 +1,240 @@
+"""
+Season charts over the catalogue, kept sorted as the catalogue changes.
+
+Every chart holds the media of a season (along with its year) and format - in one
+sorted list per order. Media is filed under the chart of its own format, and under the
+chart of its season across every format. A change to a single media moves it within
+the few lists holding it - its previous position is found through a binary search over
+the keys it was filed under, the new one through an insertion into the sorted list.
+Reading a chart is a slice of the list.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from bisect import bisect_left, insort
+from threading import RLock
+
+from anilist.catalogue.store import MediaCatalogue
+from anilist.types import MediaData, MediaFormat, MediaRankType, MediaSeason
+
+# Orders the charts are kept in.
+ORDERS = ("score", "popularity", "rank")
+
+# Season, year and format of a chart - format is `None` for the chart of the season.
+ChartKey = Tuple[MediaSeason, int, Optional[MediaFormat]]
+
+
+def score(media: MediaData) -> Optional[float]:
+    """
+    Compute the score of media, used to order the charts.
+
+    Notes:
+        The average score is used when present, the mean of the score distribution of
+        the media otherwise.
+
+    Args:
+        media: The media.
+
+    Returns:
+        The score of the media, `None` if there is no score.
+    """
+
+    if media.averageScore is not None:
+        return media.averageScore
+
+    distribution = media.stats.scoreDistribution if media.stats else []
+    votes = sum(x.amount for x in distribution)
+
+    return sum(x.score * x.amount for x in distribution) / votes if votes else None
+
+
+def _rank(media: MediaData) -> Optional[int]:
+    # Rank of the media by its rating, within its season and format.
+    for entry in media.rankings or []:
+        if (
+            entry.type == MediaRankType.RATED
+            and not entry.allTime
+            and entry.season == media.season
+            and entry.year == media.seasonYear
+        ):
+            return entry.rank
+
+    return None
+
+
+def _keys(media: MediaData) -> Dict[str, Tuple[Any, ...]]:
+    # Sort keys of the media for every order - media without a value goes last, media
+    # with the same value is ordered by its id.
+    rating = score(media)
+    by_score = (rating is None, -(rating or 0))
+    popularity = media.popularity
+
+    rank = _rank(media)
+    return {
+        "score": by_score + (media.id,),
+        "popularity": (popularity is None, -(popularity or 0), media.id),
+        "rank": (rank is None, rank or 0) + by_score + (media.id,),
+    }
+
+
+class SeasonCharts:
+    def __init__(self, catalogue: MediaCatalogue):
+        """
+        Season charts over a catalogue, updated along with the catalogue.
+
+        Notes:
+            The sort keys of every media are kept along with it - moving media within
+            a chart does not depend on the previous version of the media, media that
+            was modified in place is moved once added to the catalogue again.
+
+            Orders by rank use the rank of the media by its rating, within its season
+            and format. The chart of a season across every format places the media
+            ranked first in every format together, ties are broken by the score.
+
+        Args:
+            catalogue: The catalogue the charts are built from.
+        """
+
+        if not isinstance(catalogue, MediaCatalogue):
+            raise TypeError
+
+        self.catalogue = catalogue
+
+        self._charts: Dict[ChartKey, Dict[str, List[Tuple[Any, ...]]]] = {}
+        self._entries: Dict[int, Tuple[List[ChartKey], Dict[str, Tuple[Any, ...]]]] = {}
+        self._media: Dict[int, MediaData] = {}
+        self._lock = RLock()
+
+        # Building the charts and registering for changes at once, no change is missed.
+        with catalogue.locked():
+            for media in catalogue:
+                self._add(media)
+
+            catalogue.listen(self._update)
+
+    def _update(
+        self, previous: Optional[MediaData], media: Optional[MediaData]
+    ) -> None:
+        with self._lock:
+            if previous is not None:
+                self._remove(previous.id)
+
+            if media is not None:
+                self._add(media)
+
+    def _add(self, media: MediaData) -> None:
+        if media.season is None or media.seasonYear is None:
+            return
+
+        charts: List[ChartKey] = [(media.season, media.seasonYear, None)]
+        if media.format is not None:
+            charts.append((media.season, media.seasonYear, media.format))
+
+        keys = _keys(media)
+        with self._lock:
+            for chart in charts:
+                lists = self._charts.setdefault(chart, {x: [] for x in ORDERS})
+                for order, key in keys.items():
+                    insort(lists[order], key)
+
+            self._entries[media.id] = (charts, keys)
+            self._media[media.id] = media
+
+    def _remove(self, media_id: int) -> None:
+        entry = self._entries.pop(media_id, None)
+        if entry is None:
+            return
+
+        charts, keys = entry
+        for chart in charts:
+            lists = self._charts[chart]
+            for order, key in keys.items():
+                values = lists[order]
+                del values[bisect_left(values, key)]
+
+            if not lists[ORDERS[0]]:
+                del self._charts[chart]
+
+        del self._media[media_id]
+
+    def chart(
+        self,
+        season: MediaSeason,
+        year: int,
+        media_format: Optional[MediaFormat] = None,
+        order: str = "score",
+        page: int = 1,
+        per_page: int = 50,
+    ) -> List[MediaData]:
+        """
+        Fetch a page of a season chart.
+
+        Args:
+            season: The season.
+            year: The year of the season.
+            media_format: Only include media of the format, media of every format if
+                not passed in.
+            order: The order of the chart, one of `ORDERS` - the highest score,
+                popularity, or rank (by rating) first.
+            page: Number of the page, starting from 1.
+            per_page: Number of media in a page.
+
+        Raises:
+            ValueError: Raised for an unknown order, or an invalid page.
+
+        Returns:
+            List containing the media in the page.
+        """
+
+        if (
+            not isinstance(season, MediaSeason)
+            or not isinstance(year, int)
+            or (media_format is not None and not isinstance(media_format, MediaFormat))
+        ):
+            raise TypeError
+
+        if order not in ORDERS:
+            raise ValueError(f"Unknown order `{order}`")
+
+        if page < 1 or per_page < 1:
+            raise ValueError("Pages start from 1, and hold at least one media")
+
+        start = (page - 1) * per_page
+        with self._lock:
+            lists = self._charts.get((season, year, media_format), None)
+            if lists is None:
+                return []
+
+            return [self._media[x[-1]] for x in lists[order][start : start + per_page]]
+
+    def count(
+        self, season: MediaSeason, year: int, media_format: Optional[MediaFormat] = None
+    ) -> int:
+        """
+        Count the media in a season chart.
+
+        Args:
+            season: The season.
+            year: The year of the season.
+            media_format: Only count media of the format, media of every format if not
+                passed in.
+
+        Returns:
+            Number of media in the chart.
+        """
+
+        with self._lock:
+            lists = self._charts.get((season, year, media_format), None)
+            return 0 if lists is None else len(lists[ORDERS[0]])
+
+    def charts(self) -> List[ChartKey]:
+        """
+        Fetch the season, year and format of every chart holding media.
+
+        Returns:
+            List containing the charts, the format is `None` for the charts across
+            every format.
+        """
+
+        with self._lock:
+            return list(self._charts)
@@ -0,0 +1,544 @@
+"""
+Evaluates media queries against the local catalogue, as opposed to sending them to the
+API.
+
+The arguments of a query are compiled into a plan once - filters covered by the
+secondary indexes of the catalogue narrow down the candidates, every other filter is
+checked through a list of predicates over the remaining candidates. Plans are cached,
+repeated queries only pay for the lookups.
+"""
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import math
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from operator import attrgetter
+
+from anilist.catalogue.store import MediaCatalogue
+from anilist.queries import MediaQuery
+from anilist.types import (
+    MediaData,
+    MediaFormat,
+    MediaSeason,
+    MediaSource,
+    MediaStatus,
+    MediaType,
+    decode_page,
+)
+
+# Arguments that can't be evaluated without the data of a user.
+UNSUPPORTED = frozenset(("onList",))
+
+# Suffixes of the arguments, longest first - `idMal_not_in` is `idMal` with `_not_in`.
+_SUFFIXES = ("_not_in", "_greater", "_lesser", "_not", "_like", "_in")
+
+# Enums held by the media, used to map the values sent to the API back to the enums.
+_ENUMS = {
+    "type": MediaType,
+    "format": MediaFormat,
+    "status": MediaStatus,
+    "season": MediaSeason,
+    "source": MediaSource,
+}
+
+# Arguments answered through the secondary indexes of the catalogue, with the name of
+# the index.
+_INDEXED = {"type": "type", "format": "format", "status": "status", "source": "source"}
+_INDEXED_IN = {"format_in": "format", "status_in": "status", "source_in": "source"}
+
+
+def _date(name: str) -> Callable[[MediaData], Optional[int]]:
+    # Packed date, unknown dates are `None` - they never match a range.
+    def getter(media: MediaData) -> Optional[int]:
+        value = getattr(media, name)
+        return (value.packed or None) if value is not None else None
+
+    return getter
+
+
+def _title(media: MediaData) -> List[str]:
+    # Every name the media is known by.
+    title = media.title
+    names = [] if title is None else [title.romaji, title.english, title.native]
+    names.extend(media.synonyms or [])
+
+    return [x.lower() for x in names if x]
+
+
+# Fields holding a single value, mapped to the method fetching it.
+_SCALARS: Dict[str, Callable[[MediaData], Any]] = {
+    "id": attrgetter("id"),
+    "idMal": attrgetter("idMal"),
+    "seasonYear": attrgetter("seasonYear"),
+    "episodes": attrgetter("episodes"),
+    "duration": attrgetter("duration"),
+    "chapters": attrgetter("chapters"),
+    "volumes": attrgetter("volumes"),
+    "averageScore": attrgetter("averageScore"),
+    "popularity": attrgetter("popularity"),
+    "isAdult": attrgetter("isAdult"),
+    "countryOfOrigin": attrgetter("countryOfOrigin"),
+    "startDate": _date("startDate"),
+    "endDate": _date("endDate"),
+    **{name: attrgetter(name) for name in _ENUMS},
+}
+
+# Keys for every sort, the `_DESC` variants are the same keys in the reverse order.
+_SORTS: Dict[str, Callable[[MediaData], Any]] = {
+    "ID": attrgetter("id"),
+    "TITLE_ROMAJI": lambda x: x.title and x.title.romaji,
+    "TITLE_ENGLISH": lambda x: x.title and x.title.english,
+    "TITLE_NATIVE": lambda x: x.title and x.title.native,
+    "TYPE": lambda x: x.type and x.type.value,
+    "FORMAT": lambda x: x.format and x.format.value,
+    "STATUS": lambda x: x.status and x.status.value,
+    "START_DATE": _date("startDate"),
+    "END_DATE": _date("endDate"),
+    "SCORE": attrgetter("averageScore"),
+    "POPULARITY": attrgetter("popularity"),
+    "TRENDING": attrgetter("trending"),
+    "EPISODES": attrgetter("episodes"),
+    "DURATION": attrgetter("duration"),
+    "CHAPTERS": attrgetter("chapters"),
+    "VOLUMES": attrgetter("volumes"),
+    "UPDATED_AT": attrgetter("updatedAt"),
+    "FAVOURITES": attrgetter("favourites"),
+}
+
+Check = Callable[[MediaData], bool]
+
+
+def _members(name: str, value: Any) -> Any:
+    # Maps the value(s) sent to the API back to the members of the enum.
+    if isinstance(value, list):
+        return frozenset(_members(name, x) for x in value)
+
+    for member in _ENUMS[name]:
+        if member.translate == value:
+            return member
+
+    raise ValueError(f"Unknown value `{value}` for `{name}`")
+
+
+def _scalar(base: str, suffix: str, value: Any) -> Check:
+    # Predicate for a filter over a field holding a single value.
+    get = _SCALARS[base]
+    if base in _ENUMS:
+        value = _members(base, value)
+
+    if suffix == "":
+        return lambda x: get(x) == value
+    elif suffix == "_not":
+        return lambda x: get(x) != value
+    elif suffix == "_in":
+        values = frozenset(value)
+        return lambda x: get(x) in values
+    elif suffix == "_not_in":
+        values = frozenset(value)
+        return lambda x: get(x) not in values
+    elif suffix == "_greater":
+        return _present(get, lambda y: y > value)
+    elif suffix == "_lesser":
+        return _present(get, lambda y: y < value)
+
+    # Date patterns, such as `2020%` for anything starting in 2020.
+    pattern = str(value).replace("%", "*")
+    return _present(get, lambda y: fnmatchcase(str(y), pattern))
+
+
+def _present(get: Callable[[MediaData], Any], test: Callable[[Any], bool]) -> Check:
+    # Predicate applying the test to the value of a field, false if it is missing.
+    def check(media: MediaData) -> bool:
+        value = get(media)
+        return value is not None and test(value)
+
+    return check
+
+
+def _collection(
+    suffix: str, value: Any, get: Callable[[MediaData], FrozenSet[str]], every: bool
+) -> Check:
+    # Predicate for a filter over a field holding multiple values - genres, tags.
+    if suffix == "":
+        return lambda x: value in get(x)
+    elif suffix == "_in" and every:
+        values = frozenset(value)
+        return lambda x: values <= get(x)
+    elif suffix == "_in":
+        values = frozenset(value)
+        return lambda x: not values.isdisjoint(get(x))
+    elif suffix == "_not_in":
+        values = frozenset(value)
+        return lambda x: values.isdisjoint(get(x))
+
+    raise ValueError(f"Unsupported filter `{suffix}` over a list")
+
+
+class _Plan:
+    def __init__(self, arguments: Tuple[Tuple[str, Any], ...]):
+        """
+        Compiled version of the arguments of a query.
+
+        Args:
+            arguments: Arguments of the query, as sent to the API - lists are frozen
+                into tuples.
+        """
+
+        self.lookups: List[Tuple[str, Any]] = []
+        self.checks: List[Check] = []
+        self.sort: List[str] = []
+        self.search: Optional[str] = None
+
+        values = {k: list(v) if isinstance(v, tuple) else v for k, v in arguments}
+
+        # Tags below the minimum rank are ignored by every filter on tags.
+        minimum = values.pop("minimumTagRank", None)
+        if minimum is not None and not isinstance(minimum, (int, str)):
+            raise TypeError
+
+        rank = None if minimum is None else int(minimum)
+
+        def tags(media: MediaData) -> List[Any]:
+            return [x for x in media.tags or [] if rank is None or x.rank >= rank]
+
+        multiple: Dict[str, Tuple[Callable[[MediaData], FrozenSet[str]], bool]] = {
+            "genre": (lambda x: frozenset(x.genres or []), True),
+            "tag": (lambda x: frozenset(y.name for y in tags(x)), True),
+            "tagCategory": (lambda x: frozenset(y.category for y in tags(x)), True),
+            # Licensed by any of the sites.
+            "licensedBy": (
+                lambda x: frozenset(y.site for y in x.externalLinks or []),
+                False,
+            ),
+        }
+
+        for key, value in values.items():
+            if key in UNSUPPORTED:
+                raise ValueError(f"`{key}` can't be evaluated locally")
+
+            if key == "sort":
+                self.sort = list(value)
+                continue
+
+            if key == "search":
+                if not isinstance(value, str):
+                    raise TypeError
+
+                search = self.search = value.lower()
+                self.checks.append(lambda x: any(search in y for y in _title(x)))
+                continue
+
+            if key in ("id", "id_in", "idMal", "idMal_in"):
+                self.lookups.append((key, value))
+                continue
+
+            if key in _INDEXED:
+                self.lookups.append((_INDEXED[key], _members(key, value)))
+                continue
+
+            if key in _INDEXED_IN:
+                index = _INDEXED_IN[key]
+                self.lookups.append((f"{index}_in", _members(index, value)))
+                continue
+
+            if key in ("season", "seasonYear"):
+                if key == "season":
+                    value = _members("season", value)
+
+                self.lookups.append((key, value))
+                continue
+
+            if rank is None and key in ("genre", "genre_in", "tag", "tag_in"):
+                # Media holding all of the genres (or tags).
+                index = key.split("_")[0]
+                for entry in [value] if isinstance(value, str) else value:
+                    self.lookups.append((index, entry))
+
+                continue
+
+            base, suffix = key, ""
+            for entry in _SUFFIXES:
+                if key.endswith(entry) and key[: -len(entry)] in {
+                    *_SCALARS,
+                    *multiple,
+                }:
+                    base, suffix = key[: -len(entry)], entry
+                    break
+
+            if base in multiple:
+                self.checks.append(_collection(suffix, value, *multiple[base]))
+            elif base in _SCALARS:
+                self.checks.append(_scalar(base, suffix, value))
+            else:
+                raise ValueError(f"Unknown argument `{key}`")
+
+    def match(self, media: MediaData) -> bool:
+        for check in self.checks:
+            if not check(media):
+                return False
+
+        return True
+
+    def relevance(self, media: MediaData) -> int:
+        # Exact titles first, followed by titles starting with the search.
+        names = _title(media)
+        if self.search in names:
+            return 0
+
+        return 1 if any(x.startswith(self.search) for x in names) else 2  # type: ignore
+
+
+def _freeze(value: Any) -> Hashable:
+    return tuple(value) if isinstance(value, list) else value
+
+
+@lru_cache(maxsize=256)
+def _compile(arguments: Tuple[Tuple[str, Any], ...]) -> _Plan:
+    return _Plan(arguments)
+
+
+class QueryEngine:
+    def __init__(self, catalogue: MediaCatalogue, client: Any = None):
+        """
+        Runs media queries against a local catalogue.
+
+        Notes:
+            Filters follow the semantics of the API - `_greater` and `_lesser` are
+            exclusive, and never match unknown values. `genre_in`, `tag_in` and
+            `tagCategory_in` select media holding all the values, the remaining `_in`
+            filters select media holding any one of them. Searches match a part of any
+            title, or synonym, ignoring the case.
+
+            Results are ordered by the id of the media unless a sort is given, unknown
+            values are placed last with every sort.
+
+        Args:
+            catalogue: The catalogue holding the media.
+            client: Client used by `fetch` for queries that can't be answered locally,
+                an instance of `Anilist`.
+        """
+
+        if not isinstance(catalogue, MediaCatalogue):
+            raise TypeError
+
+        self.catalogue = catalogue
+        self.client = client
+
+    @staticmethod
+    def _plan(query: MediaQuery) -> _Plan:
+        if not isinstance(query, MediaQuery):
+            raise TypeError
+
+        arguments = tuple(sorted((k, _freeze(v)) for k, v in query.arguments.items()))
+        return _compile(arguments)
+
+    def supports(self, query: MediaQuery) -> bool:
+        """
+        Check if a query can be answered locally.
+
+        Args:
+            query: The query to be checked.
+
+        Returns:
+            Boolean indicating if the query can be run through `execute`.
+        """
+
+        try:
+            self._plan(query)
+        except ValueError:
+            return False
+
+        return True
+
+    def _candidates(self, lookups: List[Tuple[str, Any]]) -> Optional[Set[int]]:
+        # Ids of the media matching every filter covered by the indexes, `None` if no
+        # such filter was given.
+        catalogue = self.catalogue
+        sets: List[Set[int]] = []
+        filters: Dict[str, Any] = {}
+        genres: List[str] = []
+        tags: List[str] = []
+
+        for kind, value in lookups:
+            if kind == "id":
+                sets.append({value})
+            elif kind == "id_in":
+                sets.append(set(value))
+            elif kind in ("idMal", "idMal_in"):
+                values = [value] if kind == "idMal" else value
+                sets.append({x.id for x in map(catalogue.get_mal, values) if x})
+            elif kind.endswith("_in"):
+                # Any one of the values - merging the matches for every value.
+                name = {"format": "media_format", "type": "media_type"}.get(
+                    kind[:-3], kind[:-3]
+                )
+                merged: Set[int] = set()
+                for member in value:
+                    merged |= catalogue.ids(**{name: member})
+
+                sets.append(merged)
+            elif kind == "genre":
+                genres.append(value)
+            elif kind == "tag":
+                tags.append(value)
+            else:
+                name = {
+                    "format": "media_format",
+                    "type": "media_type",
+                    "seasonYear": "year",
+                }.get(kind, kind)
+                filters[name] = value
+
+        if filters or genres or tags:
+            sets.append(
+                catalogue.ids(genre=genres or None, tag=tags or None, **filters)
+            )
+
+        if not sets:
+            return None
+
+        sets.sort(key=len)
+        return set(sets[0]).intersection(*sets[1:])
+
+    def _run(self, plan: _Plan) -> List[MediaData]:
+        with self.catalogue.locked():
+            candidates = self._candidates(plan.lookups)
+
+            if candidates is None:
+                media = list(self.catalogue)
+            else:
+                get = self.catalogue.get
+                media = [x for x in map(get, sorted(candidates)) if x is not None]
+
+        if plan.checks:
+            media = [x for x in media if plan.match(x)]
+
+        if candidates is None:
+            media.sort(key=attrgetter("id"))
+
+        # Stable sorts, from the last key to the first one.
+        for entry in reversed(plan.sort):
+            if entry == "SEARCH_MATCH":
+                if plan.search is not None:
+                    media.sort(key=plan.relevance)
+
+                continue
+
+            descending = entry.endswith("_DESC")
+            key = _SORTS[entry[:-5] if descending else entry]
+
+            # Unknown values are placed last, in either direction.
+            def order(
+                x: MediaData, key: Callable[[MediaData], Any] = key
+            ) -> Tuple[bool, Any]:
+                value = key(x)
+                return (value is None) != descending, 0 if value is None else value
+
+            media.sort(key=order, reverse=descending)
+
+        return media
+
+    def execute(
+        self, query: MediaQuery, page: int = 1, per_page: int = 50
+    ) -> Tuple[List[MediaData], Dict[str, Any]]:
+        """
+        Run a query against the catalogue.
+
+        Args:
+            query: The query to be run.
+            page: Number of the page, starting from 1.
+            per_page: Number of media in a page.
+
+        Raises:
+            ValueError: Raised if the query can't be answered locally, for example
+                queries filtering the list of a user.
+
+        Returns:
+            Tuple containing the media in the page, along with the page info - the same
+            as `decode_page`.
+        """
+
+        if not isinstance(page, int) or not isinstance(per_page, int):
+            raise TypeError
+
+        if page < 1 or per_page < 1:
+            raise ValueError("Invalid page")
+
+        media = self._run(self._plan(query))
+
+        total = len(media)
+        last = max(1, math.ceil(total / per_page))
+        start = (page - 1) * per_page
+
+        return media[start : start + per_page], {
+            "total": total,
+            "perPage": per_page,
+            "currentPage": page,
+            "lastPage": last,
+            "hasNextPage": page < last,
+        }
+
+    def count(self, query: MediaQuery) -> int:
+        """
+        Count the media matching a query.
+
+        Args:
+            query: The query to be run.
+
+        Returns:
+            Number of matching media in the catalogue.
+        """
+
+        return len(self._run(self._plan(query)))
+
+    async def fetch(
+        self,
+        query: MediaQuery,
+        page: int = 1,
+        per_page: int = 50,
+        fallback: bool = True,
+    ) -> Tuple[List[MediaData], Dict[str, Any]]:
+        """
+        Answer a query locally when possible, through the API otherwise.
+
+        Notes:
+            Queries that can't be answered locally, and queries without any match in
+            the catalogue (if `fallback` is set) are sent to the API. The media
+            received is added to the catalogue.
+
+        Args:
+            query: The query to be run.
+            page: Number of the page, starting from 1.
+            per_page: Number of media in a page.
+            fallback: Boolean indicating if queries without any local match are sent
+                to the API.
+
+        Returns:
+            Tuple containing the media in the page, along with the page info.
+        """
+
+        if self.supports(query):
+            items, info = self.execute(query, page, per_page)
+            if items or not fallback:
+                return items, info
+
+        if self.client is None:
+            raise ValueError("No client to send the query through")
+
+        items, info = await self.client.execute(
+            query.query, query.variables(page, per_page), decode_page
+        )
+        self.catalogue.extend(items)
+
+        return items, info
@@ -0,0 +1,342 @@
+"""
+Fuzzy search over the titles of media, for autocompletion.
+
+Titles are normalized (Unicode compatibility forms, case, accents, katakana folded into
+hiragana) and split into trigrams. Titles starting with the text are found through a
+binary search over the sorted titles. An inverted list maps every trigram to the titles
+containing it - fuzzy matches only look at titles sharing trigrams with the text, and
+gather candidates from the rarest lists. A typo changes a few trigrams of the text, the
+rest of them still match the title.
+"""
+
+from typing import Container, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import heapq
+import math
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from functools import lru_cache
+
+from anilist.types import MediaData, MediaTitle
+
+# Range of katakana that has a hiragana counterpart, and the offset between the two.
+_KATAKANA = ("ァ", "ヶ")
+_KANA_OFFSET = 0x60
+
+_NONE: Set[int] = frozenset()  # type: ignore
+
+
+@lru_cache(maxsize=4096)
+def _fold(char: str) -> str:
+    # Folds a single (alphanumeric) character - accents are dropped from latin letters,
+    # katakana is mapped to hiragana.
+    base = unicodedata.normalize("NFKD", char)[0]
+    if base.isascii():
+        return base
+
+    if _KATAKANA[0] <= char <= _KATAKANA[1]:
+        return chr(ord(char) - _KANA_OFFSET)
+
+    return char
+
+
+def normalize(text: str) -> str:
+    """
+    Normalize text for the search - the same title written in different ways ends up
+    as the same string.
+
+    Args:
+        text: The text to be normalized.
+
+    Returns:
+        Lower-case text, with punctuation replaced by single spaces.
+    """
+
+    text = unicodedata.normalize("NFKC", text).casefold()
+    folded = "".join(_fold(x) if x.isalnum() else " " for x in text)
+
+    return " ".join(folded.split())
+
+
+def grams(text: str, prefix: bool = False) -> Set[str]:
+    """
+    Split normalized text into trigrams.
+
+    Notes:
+        Words are padded with a space, along with a bigram for the first character of
+        every word - allowing single characters to be searched for.
+
+    Args:
+        text: Normalized text.
+        prefix: Boolean indicating if the text is the start of a title, the last word
+            is not padded at the end.
+
+    Returns:
+        Set containing the trigrams.
+    """
+
+    if not text:
+        return set()
+
+    padded = f" {text}" if prefix else f" {text} "
+    result = {padded[x : x + 3] for x in range(len(padded) - 2)}
+    result.update(f" {x[0]}" for x in text.split())
+
+    return result
+
+
+class _Prefixes:
+    def __init__(self) -> None:
+        """
+        Sorted list of strings (along with the entry each belongs to), for prefix
+        lookups through a binary search.
+
+        Notes:
+            New strings go to a small buffer, merged into the main list once the
+            buffer grows past a fraction of it - inserting into a large list one at a
+            time would move the entire list for every string. Removed entries are
+            dropped while merging, lookups filter them out till then.
+        """
+
+        self._sorted: List[Tuple[str, int]] = []
+        self._buffer: List[Tuple[str, int]] = []
+
+    def add(self, text: str, entry: int) -> None:
+        insort(self._buffer, (text, entry))
+
+    def merge(self, alive: Container[int]) -> None:
+        # Merging only once the buffer is large enough, the cost is amortized over the
+        # strings added since the last merge.
+        if len(self._buffer) > max(256, len(self._sorted) // 8):
+            merged = heapq.merge(self._sorted, self._buffer)
+            self._sorted = [x for x in merged if x[1] in alive]
+            self._buffer = []
+
+    def scan(self, prefix: str, alive: Container[int]) -> Iterator[Tuple[str, int]]:
+        # Every string starting with the prefix belonging to an entry that is still
+        # alive, in alphabetical order.
+        def lookup(values: List[Tuple[str, int]]) -> Iterator[Tuple[str, int]]:
+            for index in range(bisect_left(values, (prefix,)), len(values)):
+                if not values[index][0].startswith(prefix):
+                    return
+
+                if values[index][1] in alive:
+                    yield values[index]
+
+        return heapq.merge(lookup(self._sorted), lookup(self._buffer))
+
+
+def _titles(media: MediaData) -> Iterable[str]:
+    # Every name the media is known by.
+    title = media.title
+    if isinstance(title, MediaTitle):
+        yield from (title.romaji, title.english, title.native, title.userPreferred)
+
+    yield from media.synonyms or []
+
+
+class TitleIndex:
+    def __init__(self, media: Optional[Iterable[MediaData]] = None):
+        """
+        Trigram index over the titles of media.
+
+        Notes:
+            The index is updated in place as media is added, or removed. It is not
+            safe to update the index while searching from another thread - the
+            catalogue guards its index with its own lock.
+
+        Args:
+            media: Media to be added to the index.
+        """
+
+        self._postings: Dict[str, Set[int]] = {}
+
+        # Every distinct (normalized) title - the media, text, and number of trigrams.
+        self._entries: Dict[int, Tuple[int, str, int]] = {}
+        self._media: Dict[int, List[int]] = {}
+        self._next = 0
+
+        # Sorted titles, and sorted words (along with the rest of the title) after the
+        # first one - prefixes are found through a binary search.
+        self._starts = _Prefixes()
+        self._words = _Prefixes()
+
+        for entry in media or []:
+            self.add(entry)
+
+    def __len__(self) -> int:
+        return len(self._media)
+
+    @staticmethod
+    def _suffixes(text: str) -> List[str]:
+        # The title from every word after the first one.
+        return [text[x + 1 :] for x, char in enumerate(text) if char == " "]
+
+    def add(self, media: MediaData) -> None:
+        """
+        Add the titles of media to the index, replacing the titles that were indexed
+        for the media before (if any).
+
+        Args:
+            media: The media to be added.
+        """
+
+        if not isinstance(media, MediaData):
+            raise TypeError
+
+        self.remove(media.id)
+
+        entries = []
+        for text in dict.fromkeys(normalize(x) for x in _titles(media) if x):
+            if not text:
+                continue
+
+            entry = self._next
+            self._next += 1
+
+            keys = grams(text)
+            for key in keys:
+                self._postings.setdefault(key, set()).add(entry)
+
+            self._starts.add(text, entry)
+            for suffix in self._suffixes(text):
+                self._words.add(suffix, entry)
+
+            self._entries[entry] = (media.id, text, len(keys))
+            entries.append(entry)
+
+        if entries:
+            self._media[media.id] = entries
+
+        self._starts.merge(self._entries)
+        self._words.merge(self._entries)
+
+    def remove(self, media_id: int) -> None:
+        """
+        Remove the titles of media from the index, if present.
+
+        Args:
+            media_id: The id of the media.
+        """
+
+        for entry in self._media.pop(media_id, []):
+            _, text, _ = self._entries.pop(entry)
+
+            for key in grams(text):
+                postings = self._postings[key]
+                postings.discard(entry)
+                if not postings:
+                    del self._postings[key]
+
+    def _prefixed(
+        self, values: _Prefixes, query: str, found: Dict[int, float], bonus: float
+    ) -> None:
+        # Scores every media with a title starting with the query, keeping the best
+        # score of the media - shorter titles score higher.
+        for text, entry in values.scan(query, self._entries):
+            media_id = self._entries[entry][0]
+            score = bonus + len(query) / len(text)
+            if score > found.get(media_id, 0.0):
+                found[media_id] = score
+
+    def search(
+        self, text: str, limit: int = 10, threshold: float = 0.5
+    ) -> List[Tuple[int, float]]:
+        """
+        Find the media with titles closest to the text - the text can be the start of
+        a title, and can contain typos.
+
+        Notes:
+            Titles starting with the text go first (scored above 2, an exact match
+            scores 3), followed by titles with a word starting with the text (above
+            1). The remaining results are fuzzy matches, ranked by the number of
+            trigrams of the text found in the title (scored up to 1) - shorter titles go
+            first among titles sharing the same number of trigrams.
+
+            Every title starting with the text is scored before the best ones are
+            picked. Fuzzy matches are only looked for if there are not enough titles
+            starting with the text.
+
+        Args:
+            text: The text being searched for.
+            limit: Maximum number of results.
+            threshold: Minimum share of the trigrams of the text a fuzzy match must
+                contain.
+
+        Returns:
+            List of tuples containing the id of the media and its score, the best
+            matches first. Every media is present once, with its best title.
+        """
+
+        if not isinstance(text, str) or not isinstance(limit, int):
+            raise TypeError
+
+        if not 0 < threshold <= 1:
+            raise ValueError("Threshold must be between 0 and 1")
+
+        query = normalize(text)
+        if not query or limit < 1:
+            return []
+
+        found: Dict[int, float] = {}
+        self._prefixed(self._starts, query, found, 2.0)
+        self._prefixed(self._words, query, found, 1.0)
+
+        if len(found) > limit:
+            found = dict(heapq.nlargest(limit, found.items(), _rank))
+        elif len(found) < limit:
+            fuzzy = self._fuzzy(query, threshold, limit - len(found), found)
+            found.update(heapq.nlargest(limit - len(found), fuzzy.items(), _rank))
+
+        return sorted(found.items(), key=_rank, reverse=True)
+
+    def _fuzzy(
+        self, query: str, threshold: float, limit: int, skip: Dict[int, float]
+    ) -> Dict[int, float]:
+        # Scores the titles sharing the most trigrams with the query.
+        keys = grams(query, prefix=True)
+
+        # Rarest lists first - a title sharing enough trigrams must be present in at
+        # least one of the first few lists.
+        postings = sorted((self._postings.get(x, _NONE) for x in keys), key=len)
+        needed = max(1, math.ceil(threshold * len(keys)))
+        split = len(keys) - needed + 1
+
+        # Counting is left to sets and counters - the rarest lists provide the
+        # candidates, the rest only count towards the candidates they contain.
+        counts: "Counter[int]" = Counter()
+        for entries in postings[:split]:
+            counts.update(entries)
+
+        candidates = set(counts)
+        for entries in postings[split:]:
+            counts.update(candidates.intersection(entries))
+
+        # Titles sharing more trigrams always score higher, going through the titles
+        # from the most shared trigrams down - till there are enough results, and every
+        # title sharing as many trigrams as the last one has been scored.
+        result: Dict[int, float] = {}
+        last = 0
+        for entry, shared in counts.most_common():
+            if shared < needed or (len(result) >= limit and shared < last):
+                break
+
+            media_id, _, count = self._entries[entry]
+            last = shared
+            if media_id in skip:
+                continue
+
+            # Shorter titles are closer to the text, among titles sharing the same
+            # number of trigrams.
+            closeness = shared / (count + len(keys) - shared)
+            score = (shared + closeness) / (len(keys) + 1)
+            if score > result.get(media_id, 0.0):
+                result[media_id] = score
+
+        return result
+
+
+def _rank(item: Tuple[int, float]) -> Tuple[float, int]:
+    # Highest scores first, lowest ids first among equal scores.
+    return item[1], -item[0]
@@ -0,0 +1,282 @@
+"""
+Finds media similar to other media, through the tags they share.
+
+Every media is a sparse vector over tags, weighted by the rank of the tag (its
+relevance to the media) and normalized to unit length. The vectors are held as an
+inverted index - every tag maps to the media holding it, along with its weight. The
+similarity between a media and the seed is the dot product of their vectors, with the
+tags of the seed scaled up the rarer they are across the catalogue - gathered one tag
+at a time from the lists of the tags in the seed.
+
+Tags of the seed are visited from the one that can contribute the most. Once the tags
+left can't lift media that has not been seen yet into the results, the remaining lists
+are only looked up for the media already seen - tags held by a large part of the
+catalogue are never walked through in full.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import heapq
+import math
+from threading import RLock
+
+from anilist.catalogue.store import MediaCatalogue
+from anilist.types import MediaData, MediaTag
+
+
+class TagSimilarity:
+    def __init__(
+        self,
+        catalogue: MediaCatalogue,
+        spoilers: bool = False,
+        adult: bool = False,
+        minimum_rank: int = 0,
+    ):
+        """
+        Tag similarity over a catalogue, updated along with the catalogue.
+
+        Args:
+            catalogue: The catalogue the vectors are built from.
+            spoilers: Boolean indicating if spoiler tags are used.
+            adult: Boolean indicating if adult tags (and adult media) are used.
+            minimum_rank: Tags ranked below this (out of 100) are ignored.
+        """
+
+        if not isinstance(catalogue, MediaCatalogue):
+            raise TypeError
+
+        if not isinstance(minimum_rank, int):
+            raise TypeError
+
+        self.catalogue = catalogue
+        self.spoilers = spoilers
+        self.adult = adult
+        self.minimum_rank = minimum_rank
+
+        # Weight of every media holding a tag, and the highest weight ever held - an
+        # upper bound on the weight of every media holding it.
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._maximum: Dict[str, float] = {}
+
+        # Vector of every media.
+        self._vectors: Dict[int, Dict[str, float]] = {}
+        self._lock = RLock()
+
+        with catalogue.locked():
+            for media in catalogue:
+                self._add(media)
+
+            catalogue.listen(self._update)
+
+    def _usable(self, tag: MediaTag) -> bool:
+        return (
+            isinstance(tag.rank, int)
+            and tag.rank >= max(self.minimum_rank, 1)
+            and (self.spoilers or not (tag.isGeneralSpoiler or tag.isMediaSpoiler))
+            and (self.adult or not tag.isAdult)
+        )
+
+    def vector(self, media: MediaData) -> Dict[str, float]:
+        """
+        Build the vector of media, without adding it.
+
+        Args:
+            media: The media.
+
+        Returns:
+            Dictionary mapping the name of every tag to its weight, empty if the media
+            has no usable tags.
+        """
+
+        if not self.adult and media.isAdult:
+            return {}
+
+        weights: Dict[str, float] = {}
+        for tag in media.tags or []:
+            if self._usable(tag):
+                weights[tag.name] = max(weights.get(tag.name, 0.0), tag.rank / 100)
+
+        norm = math.sqrt(sum(x * x for x in weights.values()))
+        return {key: value / norm for key, value in weights.items()}
+
+    def _update(
+        self, previous: Optional[MediaData], media: Optional[MediaData]
+    ) -> None:
+        with self._lock:
+            if previous is not None:
+                self._remove(previous.id)
+
+            if media is not None:
+                self._add(media)
+
+    def _add(self, media: MediaData) -> None:
+        vector = self.vector(media)
+        if not vector:
+            return
+
+        with self._lock:
+            for name, weight in vector.items():
+                self._postings.setdefault(name, {})[media.id] = weight
+                self._maximum[name] = max(self._maximum.get(name, 0.0), weight)
+
+            self._vectors[media.id] = vector
+
+    def _remove(self, media_id: int) -> None:
+        # The highest weight of a tag is left as-is, still an upper bound.
+        for name in self._vectors.pop(media_id, {}):
+            postings = self._postings[name]
+            del postings[media_id]
+
+            if not postings:
+                del self._postings[name]
+                del self._maximum[name]
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def __contains__(self, media_id: object) -> bool:
+        return media_id in self._vectors
+
+    def _idf(self, name: str) -> float:
+        # Rarer tags weigh more, a tag held by every media still counts.
+        return math.log(1 + len(self._vectors) / len(self._postings[name]))
+
+    def similar_to(
+        self,
+        tags: Dict[str, float],
+        limit: int = 10,
+        exclude: Iterable[int] = (),
+    ) -> List[Tuple[int, float]]:
+        """
+        Find the media closest to a set of weighted tags.
+
+        Args:
+            tags: Dictionary mapping the name of every tag to its weight.
+            limit: Maximum number of results.
+            exclude: Ids of media left out of the results.
+
+        Returns:
+            List of tuples containing the id of the media and its similarity (between
+            0 and 1), the most similar first.
+        """
+
+        if not isinstance(tags, dict) or not isinstance(limit, int):
+            raise TypeError
+
+        with self._lock:
+            query = {
+                name: weight * self._idf(name)
+                for name, weight in tags.items()
+                if name in self._postings and weight > 0
+            }
+            norm = math.sqrt(sum(x * x for x in query.values()))
+            excluded = set(exclude)
+            if not query or limit < 1:
+                return []
+
+            # Tags that can contribute the most first, along with the most the tags
+            # left can add up to.
+            terms = sorted(
+                query.items(), key=lambda x: x[1] * self._maximum[x[0]], reverse=True
+            )
+            left = [0.0] * (len(terms) + 1)
+            for index in range(len(terms) - 1, -1, -1):
+                name, factor = terms[index]
+                left[index] = left[index + 1] + factor * self._maximum[name]
+
+            scores: Dict[int, float] = {}
+            get = scores.get
+            needed = limit + len(excluded)
+            bound = 0.0
+
+            for index, (name, factor) in enumerate(terms):
+                postings = self._postings[name]
+
+                # Scores only go up, the bound from the previous tags still holds - it
+                # is only computed again while it can't rule out the media left.
+                if bound <= left[index] and len(scores) >= needed:
+                    bound = heapq.nlargest(needed, scores.values())[-1]
+
+                if bound <= left[index]:
+                    for media_id, weight in postings.items():
+                        scores[media_id] = get(media_id, 0.0) + factor * weight
+
+                    continue
+
+                # Unseen media can't reach the results anymore, neither can media seen
+                # so far that is further behind the results than the tags left.
+                least = bound - left[index]
+                scores = {x: y for x, y in scores.items() if y >= least}
+                get = scores.get
+
+                for media_id in scores:
+                    found = postings.get(media_id, None)
+                    if found is not None:
+                        scores[media_id] += factor * found
+
+        results = heapq.nlargest(
+            limit,
+            ((x, y / norm) for x, y in scores.items() if x not in excluded),
+            key=lambda x: (x[1], -x[0]),
+        )
+        return results
+
+    def similar(self, media_id: int, limit: int = 10) -> List[Tuple[int, float]]:
+        """
+        Find the media most similar to other media.
+
+        Args:
+            media_id: The id of the media.
+            limit: Maximum number of results.
+
+        Returns:
+            List of tuples containing the id of the media and its similarity (between
+            0 and 1), the most similar first. Empty if the media has no usable tags.
+        """
+
+        vector = self._vectors.get(media_id, None)
+        if vector is None:
+            return []
+
+        return self.similar_to(vector, limit, exclude=(media_id,))
+
+    def similar_many(
+        self, media_ids: Sequence[int], limit: int = 10
+    ) -> Dict[int, List[Tuple[int, float]]]:
+        """
+        Find the media most similar to each of several media.
+
+        Notes:
+            Seeds with the same vector (media sharing the same tags, with the same
+            ranks - common across the seasons of a series) are grouped, every group
+            is looked up once. The results of a group hold one extra media, every
+            seed drops itself from them. Seeds with distinct vectors are looked up
+            one after another, with no work shared between them.
+
+        Args:
+            media_ids: The ids of the media.
+            limit: Maximum number of results, for each media.
+
+        Returns:
+            Dictionary mapping the id of every media to its results, see `similar`.
+        """
+
+        if not isinstance(limit, int):
+            raise TypeError
+
+        # Results are in the order of the ids, empty for media without usable tags.
+        results: Dict[int, List[Tuple[int, float]]] = {x: [] for x in media_ids}
+        with self._lock:
+            groups: Dict[Tuple[Tuple[str, float], ...], List[int]] = {}
+            for media_id in results:
+                vector = self._vectors.get(media_id, None)
+                if vector is not None and limit > 0:
+                    key = tuple(sorted(vector.items()))
+                    groups.setdefault(key, []).append(media_id)
+
+            for seeds in groups.values():
+                shared = self.similar_to(self._vectors[seeds[0]], limit + 1)
+                for seed in seeds:
+                    results[seed] = [x for x in shared if x[0] != seed][:limit]
+
+        return results
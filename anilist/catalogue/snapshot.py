@@ -0,0 +1,468 @@
+"""
+Read-only snapshots of a catalogue, memory-mapped by the processes reading them.
+
+A snapshot is a single file - a fixed-size header, followed by the media (as compact
+JSON, one after another) and a set of fixed-width columns:
+
+    ids         Id of every media, sorted
+    mal         Id of every media on MyAnimeList, in the same order (-1 if missing)
+    offsets     Offset of every media in the file, along with the end of the last one
+    mal keys    Ids on MyAnimeList, sorted, and the matching ids on Anilist
+    directory   Every entry of the secondary indexes - its index, the position of its
+                key in the string pool and the position of its ids in the postings
+    postings    Sorted ids of the media filed under every entry, one after another
+    strings     Keys of the entries, encoded in UTF-8
+
+The columns are read in place, through views over the mapped file - opening a
+snapshot only reads the header and the (small) directory. Media is built from its JSON
+the first time it is looked up, every process mapping the same file shares a single
+copy of it in the page cache.
+"""
+
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from enum import Enum
+
+from anilist.catalogue.store import INDEXES, MediaCatalogue, SeasonKey, index_filters
+from anilist.types import (
+    MediaData,
+    MediaFormat,
+    MediaSeason,
+    MediaSource,
+    MediaStatus,
+    MediaType,
+    decode,
+)
+
+MAGIC = b"ANLSNAP\x01"
+
+# Magic, byte order of the columns (1 for little-endian), the number of media, ids on
+# MyAnimeList, index entries and postings, followed by the offset of every column.
+_HEADER = struct.Struct("<8sB3xIIII8Q")
+
+# Index, offset and length of the key, first posting and number of postings.
+_ENTRY = struct.Struct("<B3xIIII")
+
+# Enums stored in every index, by name - genres and tags are stored as-is.
+_ENUMS = {
+    "type": MediaType,
+    "format": MediaFormat,
+    "status": MediaStatus,
+    "source": MediaSource,
+}
+
+_ALIGNMENT = 8
+
+
+def _encode_key(index: str, key: Hashable) -> bytes:
+    # Seasons are stored along with their year, either one of them can be missing.
+    if index == "season":
+        season, year = cast(SeasonKey, key)
+        text = f"{'' if season is None else season.name}|{'' if year is None else year}"
+    elif index in _ENUMS:
+        text = cast(Enum, key).name
+    else:
+        text = str(key)
+
+    return text.encode("utf-8")
+
+
+def _decode_key(index: str, text: str) -> Hashable:
+    if index == "season":
+        season, year = text.split("|")
+        return (
+            MediaSeason[season] if season else None,
+            int(year) if year else None,
+        )
+
+    return _ENUMS[index][text] if index in _ENUMS else text
+
+
+def write_snapshot(
+    catalogue: MediaCatalogue, path: Union[str, "os.PathLike[str]"]
+) -> None:
+    """
+    Write a snapshot of a catalogue to a file.
+
+    Notes:
+        The snapshot is written to a temporary file first, replacing the file once
+        complete - processes that have the previous snapshot mapped keep reading it.
+
+    Args:
+        catalogue: The catalogue to be written.
+        path: Path to the file.
+    """
+
+    if not isinstance(catalogue, MediaCatalogue):
+        raise TypeError
+
+    # Copying the references under the lock, the media is encoded without holding it.
+    media, mal, exported = catalogue.export()
+    indexes = [
+        (number, key, ids)
+        for number, name in enumerate(INDEXES)
+        for key, ids in exported[name].items()
+    ]
+
+    temporary = f"{os.fspath(path)}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(bytes(_HEADER.size))
+
+        offsets = array("q", [file.tell()])
+        for item in media:
+            file.write(item.stringify(indent=None).encode("utf-8"))
+            offsets.append(file.tell())
+
+        strings = bytearray()
+        directory = bytearray()
+        postings = array("i")
+        for number, key, ids in indexes:
+            encoded = _encode_key(INDEXES[number], key)
+            directory += _ENTRY.pack(
+                number, len(strings), len(encoded), len(postings), len(ids)
+            )
+
+            strings += encoded
+            postings.extend(ids)
+
+        columns: List[Union["array[int]", bytearray]] = [
+            array("i", [x.id for x in media]),
+            array("i", [-1 if x.idMal is None else x.idMal for x in media]),
+            offsets,
+            array("i", [x for x, _ in mal]),
+            array("i", [x for _, x in mal]),
+            directory,
+            postings,
+            strings,
+        ]
+
+        # Every column starts at an aligned offset, to be read in place.
+        positions = []
+        for column in columns:
+            file.write(bytes(-file.tell() % _ALIGNMENT))
+            positions.append(file.tell())
+            file.write(column)
+
+        file.seek(0)
+        file.write(
+            _HEADER.pack(
+                MAGIC,
+                sys.byteorder == "little",
+                len(media),
+                len(mal),
+                len(indexes),
+                len(postings),
+                *positions,
+            )
+        )
+
+    os.replace(temporary, path)
+
+
+class CatalogueSnapshot:
+    def __init__(self, path: Union[str, "os.PathLike[str]"]):
+        """
+        Catalogue read from a memory-mapped snapshot, supports the lookups of
+        `MediaCatalogue`.
+
+        Notes:
+            Every lookup builds the media again from the mapped file, objects are not
+            kept around. Use `load` to build an updatable catalogue out of the
+            snapshot, along with its title search.
+
+            Snapshots are only read on machines with the same byte order as the
+            machine they were written on.
+
+        Args:
+            path: Path to the snapshot.
+
+        Raises:
+            ValueError: Raised if the file is not a snapshot.
+        """
+
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError("Not a catalogue snapshot")
+
+        self._views: List[memoryview] = []
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self) -> None:
+        if len(self._map) < _HEADER.size:
+            raise ValueError("Not a catalogue snapshot")
+
+        magic, little, count, mal, entries, postings, *positions = _HEADER.unpack_from(
+            self._map
+        )
+        if magic != MAGIC:
+            raise ValueError("Not a catalogue snapshot")
+
+        if bool(little) != (sys.byteorder == "little"):
+            raise ValueError("Snapshot written on a machine with another byte order")
+
+        buffer = memoryview(self._map)
+        self._views.append(buffer)
+
+        def column(position: int, size: int) -> memoryview:
+            # View over `size` bytes of the file, released when closing.
+            view = buffer[position : position + size]
+            self._views.append(view)
+            return view
+
+        def integers(position: int, count: int, wide: bool = False) -> memoryview:
+            # Column of integers - 64-bit integers if wide, otherwise 32-bit.
+            raw = column(position, count * array("q" if wide else "i").itemsize)
+            view = raw.cast("q") if wide else raw.cast("i")
+            self._views.append(view)
+            return view
+
+        self._buffer = buffer
+        self._ids = integers(positions[0], count)
+        self._mal_ids = integers(positions[1], count)
+        self._offsets = integers(positions[2], count + 1, wide=True)
+        self._mal_keys = integers(positions[3], mal)
+        self._mal_values = integers(positions[4], mal)
+        self._postings = integers(positions[6], postings)
+
+        # The directory is small (a few thousand entries), read into a dictionary.
+        strings = column(positions[7], len(self._map) - positions[7])
+        self._indexes: Dict[str, Dict[Hashable, Tuple[int, int]]] = {
+            x: {} for x in INDEXES
+        }
+        for number, offset, length, start, size in _ENTRY.iter_unpack(
+            self._map[positions[5] : positions[5] + entries * _ENTRY.size]
+        ):
+            index = INDEXES[number]
+            key = _decode_key(index, str(strings[offset : offset + length], "utf-8"))
+            self._indexes[index][key] = (start, size)
+
+    def close(self) -> None:
+        """
+        Unmap the snapshot, media built from it remains usable.
+
+        Notes:
+            Results of every lookup are copies, none of them hold on to the mapped
+            file. Views over the file are only held while a lookup runs - closing the
+            snapshot from another thread in the middle of a lookup raises a
+            `BufferError`.
+        """
+
+        for view in reversed(self._views):
+            view.release()
+
+        self._views = []
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "CatalogueSnapshot":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def _build(self, position: int) -> MediaData:
+        start, end = self._offsets[position], self._offsets[position + 1]
+        return cast(MediaData, decode(self._buffer[start:end], MediaData))
+
+    def _position(self, media_id: int) -> Optional[int]:
+        position = bisect_left(self._ids, media_id)
+        if position < len(self._ids) and self._ids[position] == media_id:
+            return position
+
+        return None
+
+    def get(self, media_id: int) -> Optional[MediaData]:
+        """
+        Fetch media by its id on Anilist.
+
+        Args:
+            media_id: The id of the media on Anilist.
+
+        Returns:
+            The media, `None` if the snapshot does not hold it.
+        """
+
+        position = self._position(media_id)
+        return None if position is None else self._build(position)
+
+    def get_mal(self, mal_id: int) -> Optional[MediaData]:
+        """
+        Fetch media by its id on MyAnimeList.
+
+        Args:
+            mal_id: The id of the media on MyAnimeList.
+
+        Returns:
+            The media, `None` if the snapshot does not hold it.
+        """
+
+        position = bisect_left(self._mal_keys, mal_id)
+        if position == len(self._mal_keys) or self._mal_keys[position] != mal_id:
+            return None
+
+        return self.get(self._mal_values[position])
+
+    def __getitem__(self, media_id: int) -> MediaData:
+        media = self.get(media_id)
+        if media is None:
+            raise KeyError(media_id)
+
+        return media
+
+    def __contains__(self, media_id: Any) -> bool:
+        return isinstance(media_id, int) and self._position(media_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[MediaData]:
+        # Media is built one at a time, in the order of the ids.
+        return (self._build(x) for x in range(len(self._ids)))
+
+    def _entry(self, index: str, key: Hashable) -> memoryview:
+        # View over the postings of an entry, released by the caller.
+        start, size = self._indexes[index].get(key, (0, 0))
+        return self._postings[start : start + size]
+
+    def _season(
+        self, season: Optional[MediaSeason], year: Optional[int]
+    ) -> Union[memoryview, Set[int]]:
+        if season is not None and year is not None:
+            return self._entry("season", (season, year))
+
+        result: Set[int] = set()
+        for key in self._indexes["season"]:
+            x, y = cast(SeasonKey, key)
+            if (season is None or x == season) and (year is None or y == year):
+                entry = self._entry("season", key)
+                try:
+                    result.update(entry)
+                finally:
+                    entry.release()
+
+        return result
+
+    def ids(
+        self,
+        media_type: Optional[MediaType] = None,
+        media_format: Optional[MediaFormat] = None,
+        status: Optional[MediaStatus] = None,
+        season: Optional[MediaSeason] = None,
+        year: Optional[int] = None,
+        source: Optional[MediaSource] = None,
+        genre: Union[str, List[str], None] = None,
+        tag: Union[str, List[str], None] = None,
+    ) -> Set[int]:
+        """
+        Fetch the ids of all the media matching every filter that is passed in. See
+        `MediaCatalogue.ids`.
+
+        Returns:
+            Set containing the ids of the matching media, every media in the snapshot
+            if no filter is passed in. Always a copy, usable once the snapshot is
+            closed.
+        """
+
+        filters = index_filters(
+            media_type, media_format, status, season, year, source, genre, tag
+        )
+        sets: List[Union[memoryview, Set[int]]] = [
+            (
+                self._season(*cast(SeasonKey, key))
+                if name == "season"
+                else self._entry(name, key)
+            )
+            for name, key in filters
+        ]
+
+        try:
+            if not sets:
+                return set(self._ids)
+
+            # Starting from the smallest list - the postings are sorted, the ids are
+            # looked up through a binary search in lists much larger than the result.
+            sets.sort(key=len)
+            result = set(sets[0])
+            for values in sets[1:]:
+                if isinstance(values, set) or len(values) < 32 * len(result):
+                    result.intersection_update(values)
+                else:
+                    result = {x for x in result if _contains(values, x)}
+
+            return result
+        finally:
+            # Views over the file are released right away, the snapshot can be closed.
+            for values in sets:
+                if isinstance(values, memoryview):
+                    values.release()
+
+    def find(self, **kwargs: Any) -> List[MediaData]:
+        """
+        Fetch all the media matching every filter that is passed in. Accepts the same
+        filters as `MediaCatalogue.ids`.
+
+        Returns:
+            List containing the matching media, ordered by their id.
+        """
+
+        ids = sorted(self.ids(**kwargs))
+        return [self._build(bisect_left(self._ids, x)) for x in ids]
+
+    def values(self, index: str) -> Dict[Hashable, int]:
+        """
+        Fetch the values present in a secondary index.
+
+        Args:
+            index: Name of the index, one of `INDEXES`.
+
+        Raises:
+            ValueError: Raised if there is no index with the name.
+
+        Returns:
+            Dictionary mapping every value to the number of media holding it.
+        """
+
+        if index not in self._indexes:
+            raise ValueError(f"Unknown index `{index}`")
+
+        return {key: size for key, (_, size) in self._indexes[index].items()}
+
+    def load(self) -> MediaCatalogue:
+        """
+        Build a catalogue holding every media in the snapshot.
+
+        Returns:
+            The catalogue.
+        """
+
+        return MediaCatalogue(self)
+
+
+def _contains(values: memoryview, value: int) -> bool:
+    # Membership in a sorted list of ids.
+    position = bisect_left(values, value)
+    return position < len(values) and values[position] == value
@@ -0,0 +1,483 @@
+"""
+In-memory catalogue of media - answers lookups without touching the network.
+
+Media is keyed by its id on Anilist, along with its id on MyAnimeList. Secondary
+indexes map every format, status, season, source, genre and tag to the ids of the media
+holding it. A lookup over several attributes intersects the matching sets, starting
+from the smallest one - the cost depends on the number of matches, not the size of the
+catalogue. Titles are held in a trigram index, for fuzzy searches.
+"""
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
+
+from contextlib import contextmanager
+from threading import RLock
+
+from anilist.catalogue.search import TitleIndex
+from anilist.types import (
+    MediaData,
+    MediaFormat,
+    MediaSeason,
+    MediaSource,
+    MediaStatus,
+    MediaType,
+)
+
+# Names of the secondary indexes.
+INDEXES = ("type", "format", "status", "season", "source", "genre", "tag")
+
+# Key of the season index - the season, along with its year.
+SeasonKey = Tuple[Optional[MediaSeason], Optional[int]]
+
+# Called with the previous and the new version of media, on every change.
+Listener = Callable[[Optional[MediaData], Optional[MediaData]], Any]
+
+# Returned for lookups on a value that is not present in an index.
+_EMPTY: Set[int] = frozenset()  # type: ignore
+
+
+def _keys(media: MediaData) -> Iterator[Tuple[str, Hashable]]:
+    # Every entry the media is filed under, across all the secondary indexes.
+    for name, value in (
+        ("type", media.type),
+        ("format", media.format),
+        ("status", media.status),
+        ("source", media.source),
+    ):
+        if value is not None:
+            yield name, value
+
+    if media.season is not None or media.seasonYear is not None:
+        yield "season", (media.season, media.seasonYear)
+
+    for genre in media.genres or []:
+        yield "genre", genre
+
+    for tag in media.tags or []:
+        yield "tag", tag.name
+
+
+def index_filters(
+    media_type: Optional[MediaType],
+    media_format: Optional[MediaFormat],
+    status: Optional[MediaStatus],
+    season: Optional[MediaSeason],
+    year: Optional[int],
+    source: Optional[MediaSource],
+    genre: Union[str, List[str], None],
+    tag: Union[str, List[str], None],
+) -> List[Tuple[str, Hashable]]:
+    """
+    Map the filters of a lookup to the entries of the secondary indexes to be
+    intersected, shared by every store answering the lookups of `MediaCatalogue.ids`.
+
+    Notes:
+        A season is looked up along with its year, as a single entry - either one of
+        them can be `None`. A list of genres (or tags) is mapped to an entry for each.
+
+    Args:
+        media_type: Filter media by its type.
+        media_format: Filter media by its format.
+        status: Filter media by its current release status.
+        season: Filter media by the season it was released in.
+        year: Filter media by the year of the season it was released in.
+        source: Filter media by its source.
+        genre: Filter media by a genre, or a list of genres.
+        tag: Filter media by the name of a tag, or a list of names.
+
+    Returns:
+        List of tuples containing the name of the index, and the key looked up in it.
+    """
+
+    for given, kind in (
+        (media_type, MediaType),
+        (media_format, MediaFormat),
+        (status, MediaStatus),
+        (season, MediaSeason),
+        (source, MediaSource),
+    ):
+        if given is not None and not isinstance(given, kind):
+            raise TypeError
+
+    if year is not None and not isinstance(year, int):
+        raise TypeError
+
+    names = [x for x in (genre, tag) if x is not None]
+    if not all(isinstance(x, (str, list)) for x in names):
+        raise TypeError
+
+    result: List[Tuple[str, Hashable]] = [
+        (name, value)
+        for name, value in (
+            ("type", media_type),
+            ("format", media_format),
+            ("status", status),
+            ("source", source),
+        )
+        if value is not None
+    ]
+
+    if season is not None or year is not None:
+        result.append(("season", (season, year)))
+
+    for name, value in (("genre", genre), ("tag", tag)):
+        for entry in [value] if isinstance(value, str) else value or []:
+            result.append((name, entry))
+
+    return result
+
+
+class MediaCatalogue:
+    def __init__(self, media: Optional[Iterable[MediaData]] = None):
+        """
+        Local store of media, with secondary indexes.
+
+        Notes:
+            The catalogue is safe to share between threads - writes and lookups are
+            performed under a lock, lookups are never blocked for long.
+
+            Objects are stored as-is, modifying an object that is in the catalogue
+            leaves the indexes out of date. Add the object again to update them.
+
+            The catalogue can be passed to a crawl as the sink.
+
+            Listeners are called with the previous and the new version of the media
+            on every change, under the lock - `None` for media that is added for the
+            first time, or removed.
+
+        Args:
+            media: Media to be added to the catalogue.
+        """
+
+        self._media: Dict[int, MediaData] = {}
+        self._mal: Dict[int, int] = {}
+        self._indexes: Dict[str, Dict[Hashable, Set[int]]] = {x: {} for x in INDEXES}
+        self._titles = TitleIndex()
+        self._listeners: List[Listener] = []
+        self._lock = RLock()
+
+        if media is not None:
+            self.extend(media)
+
+    def add(self, media: MediaData) -> None:
+        """
+        Add media to the catalogue, replacing the media with the same id (if any).
+
+        Args:
+            media: The media to be added.
+        """
+
+        if not isinstance(media, MediaData) or not isinstance(media.id, int):
+            raise TypeError
+
+        with self._lock:
+            previous = self._media.get(media.id, None)
+            if previous is not None:
+                self._unindex(previous)
+
+            self._media[media.id] = media
+            if media.idMal is not None:
+                self._mal[media.idMal] = media.id
+
+            for name, key in _keys(media):
+                self._indexes[name].setdefault(key, set()).add(media.id)
+
+            self._titles.add(media)
+
+            for listener in self._listeners:
+                listener(previous, media)
+
+    def extend(self, media: Iterable[MediaData]) -> None:
+        """
+        Add multiple media to the catalogue.
+
+        Args:
+            media: Iterable containing the media to be added.
+        """
+
+        for entry in media:
+            self.add(entry)
+
+    def __call__(self, media: Iterable[MediaData]) -> None:
+        self.extend(media)
+
+    def remove(self, media_id: int) -> MediaData:
+        """
+        Remove media from the catalogue.
+
+        Args:
+            media_id: The id of the media on Anilist.
+
+        Raises:
+            KeyError: Raised if the catalogue does not hold the media.
+
+        Returns:
+            The media that was removed.
+        """
+
+        with self._lock:
+            media = self._media.pop(media_id)
+            self._unindex(media)
+
+            for listener in self._listeners:
+                listener(media, None)
+
+        return media
+
+    def listen(self, listener: Listener) -> None:
+        """
+        Register a listener, called on every change to the catalogue.
+
+        Args:
+            listener: Called with the previous and the new version of the media.
+        """
+
+        if not callable(listener):
+            raise TypeError
+
+        with self._lock:
+            self._listeners.append(listener)
+
+    @contextmanager
+    def locked(self) -> Iterator["MediaCatalogue"]:
+        """
+        Hold the lock of the catalogue for the duration of the block - the catalogue
+        is not modified by other threads within the block, a series of lookups sees
+        the same state.
+
+        Notes:
+            Keep the block short, every write to the catalogue waits for it. The lock
+            is reentrant, lookups within the block do not wait.
+
+        Returns:
+            Context manager yielding the catalogue.
+        """
+
+        with self._lock:
+            yield self
+
+    def export(
+        self,
+    ) -> Tuple[
+        List[MediaData], List[Tuple[int, int]], Dict[str, Dict[Hashable, List[int]]]
+    ]:
+        """
+        Copy the contents of the catalogue, along with its indexes, at a single point
+        in time.
+
+        Notes:
+            Only the references are copied, under the lock - the media is shared with
+            the catalogue.
+
+        Returns:
+            Tuple containing the media ordered by its id, the ids on MyAnimeList
+            along with the matching ids on Anilist (ordered by the former), and every
+            secondary index - mapping every key to the sorted ids of the media
+            holding it.
+        """
+
+        with self._lock:
+            media = [self._media[x] for x in sorted(self._media)]
+            mal = sorted(self._mal.items())
+            indexes = {
+                name: {key: sorted(ids) for key, ids in index.items()}
+                for name, index in self._indexes.items()
+            }
+
+        return media, mal, indexes
+
+    def _unindex(self, media: MediaData) -> None:
+        # Drops the entries of the media from the indexes, along with entries that are
+        # left empty.
+        if media.idMal is not None and self._mal.get(media.idMal, None) == media.id:
+            del self._mal[media.idMal]
+
+        self._titles.remove(media.id)
+
+        for name, key in _keys(media):
+            index = self._indexes[name]
+            entry = index.get(key, None)
+
+            if entry is not None:
+                entry.discard(media.id)
+                if not entry:
+                    del index[key]
+
+    def get(self, media_id: int) -> Optional[MediaData]:
+        """
+        Fetch media by its id on Anilist.
+
+        Args:
+            media_id: The id of the media on Anilist.
+
+        Returns:
+            The media, `None` if the catalogue does not hold it.
+        """
+
+        return self._media.get(media_id, None)
+
+    def get_mal(self, mal_id: int) -> Optional[MediaData]:
+        """
+        Fetch media by its id on MyAnimeList.
+
+        Args:
+            mal_id: The id of the media on MyAnimeList.
+
+        Returns:
+            The media, `None` if the catalogue does not hold it.
+        """
+
+        with self._lock:
+            media_id = self._mal.get(mal_id, None)
+            return None if media_id is None else self._media.get(media_id, None)
+
+    def __getitem__(self, media_id: int) -> MediaData:
+        return self._media[media_id]
+
+    def __contains__(self, media_id: Any) -> bool:
+        return media_id in self._media
+
+    def __len__(self) -> int:
+        return len(self._media)
+
+    def __iter__(self) -> Iterator[MediaData]:
+        # Iterating over a copy, the catalogue can be modified while iterating.
+        with self._lock:
+            media = list(self._media.values())
+
+        return iter(media)
+
+    def ids(
+        self,
+        media_type: Optional[MediaType] = None,
+        media_format: Optional[MediaFormat] = None,
+        status: Optional[MediaStatus] = None,
+        season: Optional[MediaSeason] = None,
+        year: Optional[int] = None,
+        source: Optional[MediaSource] = None,
+        genre: Union[str, List[str], None] = None,
+        tag: Union[str, List[str], None] = None,
+    ) -> Set[int]:
+        """
+        Fetch the ids of all the media matching every filter that is passed in.
+
+        Notes:
+            Genres and tags are matched by their exact name. Passing a list requires
+            the media to have all of them.
+
+        Args:
+            media_type: Filter media by its type.
+            media_format: Filter media by its format.
+            status: Filter media by its current release status.
+            season: Filter media by the season it was released in.
+            year: Filter media by the year of the season it was released in.
+            source: Filter media by its source.
+            genre: Filter media by a genre, or a list of genres.
+            tag: Filter media by the name of a tag, or a list of names.
+
+        Returns:
+            Set containing the ids of the matching media, every media in the catalogue
+            if no filter is passed in.
+        """
+
+        filters = index_filters(
+            media_type, media_format, status, season, year, source, genre, tag
+        )
+
+        with self._lock:
+            sets = [
+                (
+                    self._season(*cast(SeasonKey, key))
+                    if name == "season"
+                    else self._indexes[name].get(key, _EMPTY)
+                )
+                for name, key in filters
+            ]
+
+            if not sets:
+                return set(self._media)
+
+            # Intersecting from the smallest set, the cost of every step is bound by
+            # the size of the result so far.
+            sets.sort(key=len)
+            return set(sets[0]).intersection(*sets[1:])
+
+    def _season(self, season: Optional[MediaSeason], year: Optional[int]) -> Set[int]:
+        # The index is keyed by the season along with its year, lookups on either one
+        # of them merge the (few) matching entries.
+        index = self._indexes["season"]
+        if season is not None and year is not None:
+            return index.get((season, year), _EMPTY)
+
+        result: Set[int] = set()
+        for key, entry in index.items():
+            x, y = cast(SeasonKey, key)
+            if (season is None or x == season) and (year is None or y == year):
+                result |= entry
+
+        return result
+
+    def find(self, **kwargs: Any) -> List[MediaData]:
+        """
+        Fetch all the media matching every filter that is passed in. Accepts the same
+        filters as `ids`.
+
+        Returns:
+            List containing the matching media, ordered by their id.
+        """
+
+        with self._lock:
+            return [self._media[x] for x in sorted(self.ids(**kwargs))]
+
+    def search(
+        self, text: str, limit: int = 10, threshold: float = 0.5
+    ) -> List[MediaData]:
+        """
+        Find media by its title - the text can be the start of a title, and can
+        contain typos. See `TitleIndex.search`.
+
+        Args:
+            text: The text being searched for, in any of the titles (or synonyms).
+            limit: Maximum number of results.
+            threshold: Minimum share of the trigrams of the text a title must contain.
+
+        Returns:
+            List containing the matching media, the best matches first.
+        """
+
+        with self._lock:
+            matches = self._titles.search(text, limit, threshold)
+            return [self._media[x] for x, _ in matches]
+
+    def values(self, index: str) -> Dict[Hashable, int]:
+        """
+        Fetch the values present in a secondary index.
+
+        Args:
+            index: Name of the index, one of `INDEXES`.
+
+        Raises:
+            ValueError: Raised if there is no index with the name.
+
+        Returns:
+            Dictionary mapping every value to the number of media holding it.
+        """
+
+        if index not in self._indexes:
+            raise ValueError(f"Unknown index `{index}`")
+
+        with self._lock:
+            return {key: len(entry) for key, entry in self._indexes[index].items()}
@@ -0,0 +1,157 @@
+"""
+Keeps a catalogue up to date with the API, by fetching only the media that changed.
+
+Media is paged through in the order it was last updated, most recent first. The time
+of the most recent update seen so far (the high-water mark) is kept - paging stops at
+the first media updated before the mark, everything past it is already held by the
+catalogue. A sync with nothing new costs a single request.
+
+The mark is persisted to a file once a sync completes, a sync that fails half-way is
+repeated from the same mark.
+"""
+
+from typing import Any, Dict, Optional, Union
+
+import asyncio
+import json
+import os
+
+from anilist.catalogue.store import MediaCatalogue
+from anilist.queries import MediaQuery
+from anilist.types import MediaData, MediaSort, MediaType, decode_page
+
+
+class DeltaSync:
+    def __init__(
+        self,
+        client: Any,
+        catalogue: MediaCatalogue,
+        path: Union[str, "os.PathLike[str]", None] = None,
+        media_type: Optional[MediaType] = None,
+        per_page: int = 50,
+    ):
+        """
+        Incremental sync of a catalogue, driven by the time media was last updated.
+
+        Notes:
+            The first sync (without a mark) pages through all the media. Media that is
+            updated while paging moves ahead of the pages already fetched - it is
+            picked up by the next sync, as it was updated after the new mark.
+
+            Media updated at the same second as the mark is fetched again, and only
+            stored if its update time differs from the copy in the catalogue.
+
+        Args:
+            client: Client used to fetch the media.
+            catalogue: Catalogue updated with the media that changed.
+            path: File the mark is persisted to, and loaded from (if present).
+            media_type: Only sync media of the type, all the media if not passed in.
+            per_page: Number of media requested per page, the API allows up to 50.
+        """
+
+        if not isinstance(catalogue, MediaCatalogue) or (
+            media_type is not None and not isinstance(media_type, MediaType)
+        ):
+            raise TypeError
+
+        if not isinstance(per_page, int) or not 1 <= per_page <= 50:
+            raise ValueError("Invalid number of media per page")
+
+        self.client = client
+        self.catalogue = catalogue
+        self.path = path
+        self.media_type = media_type
+        self.per_page = per_page
+
+        self.mark: Optional[int] = None
+        if path is not None and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                self.mark = json.load(file)["updatedAt"]
+
+    def _save(self) -> None:
+        # Replacing the file in a single step, an interrupted write never leaves a
+        # partial file behind.
+        if self.path is None:
+            return
+
+        temporary = f"{os.fspath(self.path)}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({"updatedAt": self.mark}, file)
+
+        os.replace(temporary, self.path)
+
+    def _changed(self, media: MediaData) -> bool:
+        stored = self.catalogue.get(media.id)
+        return stored is None or stored.updatedAt != media.updatedAt
+
+    async def sync(self) -> Dict[str, Any]:
+        """
+        Fetch the media updated since the last sync, and store the media that changed.
+
+        Returns:
+            Dictionary containing the number of pages requested, the number of media
+            received, the number of media stored, and the new mark.
+        """
+
+        query = MediaQuery(sort=[MediaSort.UPDATED_AT_DESC], media_type=self.media_type)
+        pages = received = stored = 0
+
+        mark = self.mark
+        latest = mark
+        page = 1
+
+        while True:
+            items, info = await self.client.execute(
+                query.query, query.variables(page, self.per_page), decode_page
+            )
+            pages += 1
+            received += len(items)
+
+            # Media without an update time is always stored, and never moves the mark.
+            fresh = [
+                x
+                for x in items
+                if mark is None or x.updatedAt is None or x.updatedAt >= mark
+            ]
+            changed = [x for x in fresh if self._changed(x)]
+            self.catalogue.extend(changed)
+            stored += len(changed)
+
+            times = [x.updatedAt for x in fresh if x.updatedAt is not None]
+            if times:
+                latest = max(times) if latest is None else max(latest, *times)
+
+            if len(fresh) < len(items) or not info.get("hasNextPage", False):
+                break
+
+            page += 1
+
+        self.mark = latest
+        self._save()
+
+        return {"pages": pages, "received": received, "stored": stored, "mark": latest}
+
+    async def run(
+        self, interval: float = 60, stop: Optional[asyncio.Event] = None
+    ) -> None:
+        """
+        Sync at a fixed interval, till stopped.
+
+        Args:
+            interval: Number of seconds between the start of every sync.
+            stop: Event which stops the sync once set, the sync runs till cancelled if
+                not passed in.
+        """
+
+        loop = asyncio.get_running_loop()
+        stop = stop or asyncio.Event()
+
+        while not stop.is_set():
+            start = loop.time()
+            await self.sync()
+
+            try:
+                delay = max(0.0, interval - (loop.time() - start))
+                await asyncio.wait_for(stop.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
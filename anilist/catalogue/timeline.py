@@ -0,0 +1,512 @@
+"""
+Timeline of upcoming episodes, along with a scheduler refreshing it from the API.
+
+Episodes are kept in a list sorted by the time they air at - the episodes airing within
+a window are found through a binary search, and the next episode of every media through
+a (short) sorted list of its own. The time left till an episode airs is derived from
+the time it airs at, instead of being fetched again.
+
+Media is refreshed more often the closer its next episode is to airing. Media that is
+days away from its next episode is polled rarely, while media about to air (or that
+has just aired, till the next episode shows up) is polled every few minutes.
+"""
+
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+
+import asyncio
+import heapq
+import logging
+from bisect import bisect_left, insort
+from threading import RLock
+from time import time
+
+from anilist.catalogue.store import MediaCatalogue
+from anilist.queries import MediaQuery
+from anilist.types import AiringSchedule, MediaData
+from anilist.types.decoder import decode_page
+
+# Refresh intervals (in seconds) for media with an episode airing within the given
+# number of seconds, closest first.
+INTERVALS = ((3600, 300), (6 * 3600, 900), (24 * 3600, 3600))
+
+# Refresh interval for media with an episode that has already aired.
+AIRED_INTERVAL = 300
+
+# Refresh interval for media airing later than every interval above, or not airing.
+IDLE_INTERVAL = 6 * 3600
+
+# Number of ids sent in a single query, the largest page the API returns.
+BATCH_SIZE = 50
+
+_logger = logging.getLogger(__name__)
+
+
+def time_until(schedule: AiringSchedule, now: Optional[float] = None) -> int:
+    """
+    Compute the seconds left till an episode airs.
+
+    Args:
+        schedule: The airing episode.
+        now: Current time, as a unix timestamp.
+
+    Returns:
+        Number of seconds till the episode airs, negative if it has already aired.
+    """
+
+    return schedule.airingAt - int(time() if now is None else now)
+
+
+class AiringTimeline:
+    def __init__(self, entries: Optional[Iterable[Any]] = None):
+        """
+        Episodes of media, ordered by the time they air at.
+
+        Notes:
+            Episodes returned from the timeline have their `timeUntilAiring` updated
+            from the time they air at.
+
+            The timeline is safe to share between threads, and can be passed to a
+            crawl as the sink - media replaces the episodes of the media with its next
+            airing episode.
+
+        Args:
+            entries: Media, or airing episodes, to be added to the timeline.
+        """
+
+        # Time the episode airs at, id of the media, and the number of the episode.
+        self._times: List[Tuple[int, int, int]] = []
+        self._schedules: Dict[Tuple[int, int], AiringSchedule] = {}
+
+        # Time the episode airs at and the number of the episode, for every media.
+        self._media: Dict[int, List[Tuple[int, int]]] = {}
+        self._lock = RLock()
+
+        if entries is not None:
+            self.extend(entries)
+
+    def add(self, entry: Union[AiringSchedule, MediaData]) -> None:
+        """
+        Add an airing episode to the timeline, replacing the same episode (if any).
+
+        Notes:
+            Passing media replaces every episode of the media with its next airing
+            episode - media that is not airing is dropped from the timeline.
+
+        Args:
+            entry: The airing episode, or media.
+        """
+
+        if isinstance(entry, MediaData):
+            with self._lock:
+                self.remove(entry.id)
+                if entry.nextAiringEpisode is not None:
+                    self.add(entry.nextAiringEpisode)
+
+            return
+
+        if not isinstance(entry, AiringSchedule):
+            raise TypeError
+
+        with self._lock:
+            self._discard(entry.mediaId, entry.episode)
+
+            self._schedules[entry.mediaId, entry.episode] = entry
+            insort(self._times, (entry.airingAt, entry.mediaId, entry.episode))
+            insort(
+                self._media.setdefault(entry.mediaId, []),
+                (entry.airingAt, entry.episode),
+            )
+
+    def extend(self, entries: Iterable[Union[AiringSchedule, MediaData]]) -> None:
+        """
+        Add multiple airing episodes (or media) to the timeline.
+
+        Args:
+            entries: Iterable containing the episodes, or media.
+        """
+
+        for entry in entries:
+            self.add(entry)
+
+    def __call__(self, entries: Iterable[Union[AiringSchedule, MediaData]]) -> None:
+        self.extend(entries)
+
+    def _discard(self, media_id: int, episode: int) -> None:
+        # Drops a single episode, if present.
+        schedule = self._schedules.pop((media_id, episode), None)
+        if schedule is None:
+            return
+
+        key = (schedule.airingAt, media_id, episode)
+        del self._times[bisect_left(self._times, key)]
+
+        episodes = self._media[media_id]
+        del episodes[bisect_left(episodes, key[::2])]
+        if not episodes:
+            del self._media[media_id]
+
+    def remove(self, media_id: int) -> None:
+        """
+        Remove every episode of media from the timeline, if present.
+
+        Args:
+            media_id: The id of the media.
+        """
+
+        with self._lock:
+            for _, episode in list(self._media.get(media_id, [])):
+                self._discard(media_id, episode)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """
+        Remove the episodes that have already aired.
+
+        Args:
+            now: Current time, as a unix timestamp.
+
+        Returns:
+            Number of episodes removed.
+        """
+
+        now = time() if now is None else now
+        with self._lock:
+            aired = self._times[: bisect_left(self._times, (now,))]
+            for _, media_id, episode in aired:
+                self._discard(media_id, episode)
+
+        return len(aired)
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    def __contains__(self, media_id: Any) -> bool:
+        return media_id in self._media
+
+    def __iter__(self) -> Iterator[AiringSchedule]:
+        return iter(self.between(float("-inf"), float("inf")))
+
+    def media(self) -> List[int]:
+        """
+        Fetch the ids of the media present in the timeline.
+
+        Returns:
+            List containing the ids of the media.
+        """
+
+        with self._lock:
+            return list(self._media)
+
+    def _refreshed(self, key: Tuple[int, int], now: float) -> AiringSchedule:
+        # The stored episode, with the time left derived from the time it airs at.
+        schedule = self._schedules[key]
+        schedule.timeUntilAiring = time_until(schedule, now)
+
+        return schedule
+
+    def between(
+        self, start: float, end: float, now: Optional[float] = None
+    ) -> List[AiringSchedule]:
+        """
+        Fetch the episodes airing in a window of time.
+
+        Args:
+            start: Start of the window (inclusive), as a unix timestamp.
+            end: End of the window (exclusive), as a unix timestamp.
+            now: Current time, as a unix timestamp.
+
+        Returns:
+            List containing the episodes, in the order they air.
+        """
+
+        now = time() if now is None else now
+        with self._lock:
+            first = bisect_left(self._times, (start,))
+            last = bisect_left(self._times, (end,))
+
+            return [self._refreshed((x[1], x[2]), now) for x in self._times[first:last]]
+
+    def upcoming(
+        self, hours: float = 24, now: Optional[float] = None
+    ) -> List[AiringSchedule]:
+        """
+        Fetch the episodes airing within the next few hours.
+
+        Args:
+            hours: Number of hours to look ahead.
+            now: Current time, as a unix timestamp.
+
+        Returns:
+            List containing the episodes, in the order they air.
+        """
+
+        now = time() if now is None else now
+        return self.between(now, now + hours * 3600, now)
+
+    def next_episode(
+        self, media_id: int, now: Optional[float] = None
+    ) -> Optional[AiringSchedule]:
+        """
+        Fetch the next episode of media that is yet to air.
+
+        Args:
+            media_id: The id of the media.
+            now: Current time, as a unix timestamp.
+
+        Returns:
+            The next episode, `None` if the timeline holds no upcoming episode.
+        """
+
+        now = time() if now is None else now
+        with self._lock:
+            episodes = self._media.get(media_id, [])
+            index = bisect_left(episodes, (now,))
+
+            if index == len(episodes):
+                return None
+
+            return self._refreshed((media_id, episodes[index][1]), now)
+
+    def _earliest(self, media_id: int) -> Optional[int]:
+        # Time the earliest episode of the media airs at, aired or not.
+        with self._lock:
+            episodes = self._media.get(media_id, None)
+            return None if not episodes else episodes[0][0]
+
+
+class RefreshScheduler:
+    def __init__(
+        self,
+        timeline: AiringTimeline,
+        client: Any,
+        catalogue: Optional[MediaCatalogue] = None,
+        intervals: Sequence[Tuple[float, float]] = INTERVALS,
+        aired: float = AIRED_INTERVAL,
+        idle: float = IDLE_INTERVAL,
+    ):
+        """
+        Schedules refreshes of tracked media, polling media more often the closer it
+        is to airing.
+
+        Notes:
+            Refreshes are kept in a heap ordered by the time they are due at. Tracking
+            media again replaces its refresh, the older one is skipped once it reaches
+            the top of the heap.
+
+        Args:
+            timeline: Timeline updated with the media that is fetched.
+            client: Client used to fetch the media.
+            catalogue: Catalogue updated with the media that is fetched, if any.
+            intervals: Tuples containing the seconds left till the next episode airs,
+                and the refresh interval for media airing within that time - closest
+                first.
+            aired: Refresh interval for media with an episode that has already aired.
+            idle: Refresh interval for every other media.
+        """
+
+        if not isinstance(timeline, AiringTimeline) or (
+            catalogue is not None and not isinstance(catalogue, MediaCatalogue)
+        ):
+            raise TypeError
+
+        self.timeline = timeline
+        self.client = client
+        self.catalogue = catalogue
+        self.intervals = sorted(intervals)
+        self.aired = aired
+        self.idle = idle
+
+        self._heap: List[Tuple[float, int]] = []
+        self._due: Dict[int, float] = {}
+
+    def interval(self, media_id: int, now: Optional[float] = None) -> float:
+        """
+        Compute the refresh interval of media, from its earliest episode.
+
+        Args:
+            media_id: The id of the media.
+            now: Current time, as a unix timestamp.
+
+        Returns:
+            Number of seconds till the media is refreshed.
+        """
+
+        earliest = self.timeline._earliest(media_id)
+        if earliest is None:
+            return self.idle
+
+        left = earliest - (time() if now is None else now)
+        if left <= 0:
+            return self.aired
+
+        for within, interval in self.intervals:
+            if left <= within:
+                return interval
+
+        return self.idle
+
+    def track(self, media_id: int, now: Optional[float] = None) -> None:
+        """
+        Schedule the next refresh of media, replacing the refresh that was scheduled
+        (if any).
+
+        Args:
+            media_id: The id of the media.
+            now: Current time, as a unix timestamp.
+        """
+
+        if not isinstance(media_id, int):
+            raise TypeError
+
+        now = time() if now is None else now
+        due = now + self.interval(media_id, now)
+
+        self._due[media_id] = due
+        heapq.heappush(self._heap, (due, media_id))
+
+    def untrack(self, media_id: int) -> None:
+        """
+        Stop refreshing media, its entry in the heap is skipped once popped.
+
+        Args:
+            media_id: The id of the media.
+        """
+
+        self._due.pop(media_id, None)
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def _prune(self) -> None:
+        # Drops outdated refreshes from the top of the heap.
+        while self._heap and self._due.get(self._heap[0][1], None) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def next_due(self) -> Optional[float]:
+        """
+        Fetch the time at which the next refresh is due.
+
+        Returns:
+            Unix timestamp of the next refresh, `None` if no media is tracked.
+        """
+
+        self._prune()
+        return self._heap[0][0] if self._heap else None
+
+    def due(self, now: Optional[float] = None) -> List[int]:
+        """
+        Pop the media with refreshes due.
+
+        Notes:
+            The media is no longer scheduled, till it is tracked again.
+
+        Args:
+            now: Current time, as a unix timestamp.
+
+        Returns:
+            List containing the ids of the media, the earliest refresh first.
+        """
+
+        now = time() if now is None else now
+        result = []
+
+        self._prune()
+        while self._heap and self._heap[0][0] <= now:
+            _, media_id = heapq.heappop(self._heap)
+            del self._due[media_id]
+            result.append(media_id)
+
+            self._prune()
+
+        return result
+
+    async def _fetch(self, ids: List[int]) -> List[MediaData]:
+        query = MediaQuery(id_in=ids)
+        items, _ = await self.client.execute(
+            query.query, query.variables(1, len(ids)), decode_page
+        )
+
+        return cast(List[MediaData], items)
+
+    async def refresh(self, now: Optional[float] = None) -> List[MediaData]:
+        """
+        Fetch the media with refreshes due, update the timeline (and catalogue) and
+        schedule the next refreshes.
+
+        Notes:
+            Ids are sent in batches of `BATCH_SIZE`, with all the batches in flight at
+            once - the client paces the requests.
+
+            Every media that was due is scheduled again, even if its batch failed (or
+            the refresh was cancelled) - the media fetched by the other batches is
+            still applied, before the error of the first failed batch is raised.
+
+        Args:
+            now: Current time, as a unix timestamp.
+
+        Returns:
+            List containing the media that was fetched.
+        """
+
+        now = time() if now is None else now
+        ids = self.due(now)
+
+        try:
+            batches = [ids[x : x + BATCH_SIZE] for x in range(0, len(ids), BATCH_SIZE)]
+            results = await asyncio.gather(
+                *(self._fetch(x) for x in batches), return_exceptions=True
+            )
+
+            media = [x for batch in results if isinstance(batch, list) for x in batch]
+
+            self.timeline.extend(media)
+            if self.catalogue is not None:
+                self.catalogue.extend(media)
+
+            for error in results:
+                if isinstance(error, BaseException):
+                    raise error
+        finally:
+            # Media missing from the response is polled again at the idle interval.
+            for media_id in ids:
+                if media_id not in self._due:
+                    self.track(media_id, now)
+
+        return media
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """
+        Refresh media as it becomes due, till stopped.
+
+        Notes:
+            Failed refreshes are logged, the media is refreshed again once it is due.
+
+        Args:
+            stop: Event which stops the scheduler once set, the scheduler runs till
+                cancelled if not passed in.
+        """
+
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            try:
+                await self.refresh()
+            except Exception:
+                _logger.exception("Refresh of the airing timeline failed")
+
+            # Sleeping till the next refresh, waking up early if stopped.
+            due = self.next_due()
+            delay = self.idle if due is None else max(0.0, due - time())
+            try:
+                await asyncio.wait_for(stop.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
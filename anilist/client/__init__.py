@@ -1,2 +1,3 @@
+from . import codec
 from .base_enum import BaseEnum
-from .base_object import BaseObject
+from .base_object import BaseObject, RawData, ValueObject
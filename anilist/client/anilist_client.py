@@ -1,3 +1,297 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from time import monotonic
+
+from aiohttp import ClientSession
+
+from . import codec
+from .credentials import CredentialPool
+from .executor import DecodeExecutor
+from .rate_limit import AdaptiveLimiter, LaneScheduler, TokenBucket
+from ..errors import APIError
+
+# Endpoint for the GraphQL API.
+API_URL = "https://graphql.anilist.co"
+
+# Seconds to wait for after being rate limited, if the response does not specify.
+RETRY_AFTER = 60
+
+
+def _process(
+    body: bytes, status: int, decoder: Optional[Callable[[Dict[str, Any]], Any]]
+) -> Any:
+    # Parses the response, and builds the objects out of it. Defined at the module
+    # level, allowing it to be run in a separate process by the executor.
+    try:
+        data = codec.loads(body)
+    except ValueError:
+        raise APIError(status, "Invalid response received from the API", None)
+
+    errors = data.get("errors", None) if isinstance(data, dict) else None
+    if errors:
+        error = errors[0]
+        locations = error.get("locations", None) or [None]
+
+        raise APIError(
+            error.get("status", None) or status,
+            error.get("message", None) or "Unknown error",
+            locations[0],
+        )
+
+    if not isinstance(data, dict) or status >= 400:
+        raise APIError(status, "Invalid response received from the API", None)
+
+    return data if decoder is None else decoder(data)
+
+
 class Anilist:
-    def __init__(self):
-        pass
+    def __init__(
+        self,
+        url: str = API_URL,
+        session: Optional[ClientSession] = None,
+        executor: Optional[DecodeExecutor] = None,
+        limiter: Optional[TokenBucket] = None,
+        retries: int = 3,
+        adaptive: Optional[AdaptiveLimiter] = None,
+        scheduler: Optional[LaneScheduler] = None,
+        credentials: Optional[CredentialPool] = None,
+    ):
+        """
+        Asynchronous client for the API.
+
+        Notes:
+            A single session (and its pool of connections) is shared by all the
+            requests made through the client - the session is created on the first
+            request, unless one is provided.
+
+        Args:
+            url: URL of the GraphQL endpoint.
+            session: Existing session to be used for requests. Not closed along with
+                the client.
+            executor: Decides where the responses are decoded, by default responses
+                above 64 KiB are decoded in a thread pool.
+            limiter: Rate limiter shared by all the requests, defaults to the limit
+                imposed by the API (90 requests per minute).
+            retries: Number of times a request is retried after being rate limited.
+            adaptive: Limits the number of requests in-flight, adapting the limit to
+                the latency and the errors seen. No limit by default.
+            scheduler: Serves requests from multiple lanes (of differing priority)
+                out of a single token bucket. Its bucket replaces the rate limiter.
+            credentials: Pool of access tokens used to authenticate the requests, each
+                token with its own rate limit - replaces the rate limiter, and can't be
+                used along with a scheduler.
+        """
+
+        if not isinstance(url, str) or not isinstance(retries, int):
+            raise TypeError
+
+        if (
+            (session is not None and not isinstance(session, ClientSession))
+            or (executor is not None and not isinstance(executor, DecodeExecutor))
+            or (limiter is not None and not isinstance(limiter, TokenBucket))
+            or (adaptive is not None and not isinstance(adaptive, AdaptiveLimiter))
+            or (scheduler is not None and not isinstance(scheduler, LaneScheduler))
+            or (credentials is not None and not isinstance(credentials, CredentialPool))
+        ):
+            raise TypeError
+
+        if scheduler is not None and credentials is not None:
+            raise ValueError("A scheduler can't be used along with a credential pool")
+
+        if scheduler is not None and limiter not in (None, scheduler.bucket):
+            raise ValueError("The scheduler and the rate limiter should share a bucket")
+
+        self.url = url
+        self.retries = retries
+        self.executor = executor or DecodeExecutor()
+        self.limiter = scheduler.bucket if scheduler else limiter or TokenBucket()
+        self.adaptive = adaptive
+        self.scheduler = scheduler
+        self.credentials = credentials
+
+        self._session = session
+        self._owns_session = session is None
+
+    def _get_session(self) -> ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(
+                headers={
+                    "Content-Type": "application/json",
+                    "Accept": "application/json",
+                }
+            )
+            self._owns_session = True
+
+        return self._session
+
+    async def execute(
+        self,
+        query: str,
+        variables: Optional[Dict[str, Any]] = None,
+        decoder: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        lane: Optional[str] = None,
+        credential: Optional[str] = None,
+    ) -> Any:
+        """
+        Run a query against the API.
+
+        Args:
+            query: String containing the GraphQL query.
+            variables: Values for the variables used in the query.
+            decoder: Method used to build objects out of the parsed response - for
+                example, `decode_page`. Should be defined at the module level if the
+                executor is using a process pool.
+            lane: Name of the lane the request belongs to, used with a scheduler.
+                Defaults to the lane with the highest priority.
+            credential: Name of the access token the request is pinned to, used with a
+                credential pool. Defaults to the token with the most budget left.
+
+        Raises:
+            APIError: Raised if the API responds with an error.
+
+        Returns:
+            The value returned by the decoder, or the parsed response if there is no
+            decoder.
+        """
+
+        if not isinstance(query, str) or (
+            variables is not None and not isinstance(variables, dict)
+        ):
+            raise TypeError
+
+        body, status = await self.request(query, variables, lane, credential)
+        return await self.executor.run(_process, body, status, decoder)
+
+    async def request(
+        self,
+        query: str,
+        variables: Optional[Dict[str, Any]] = None,
+        lane: Optional[str] = None,
+        credential: Optional[str] = None,
+    ) -> Tuple[bytes, int]:
+        """
+        Send a query to the API, without decoding the response.
+
+        Notes:
+            Waits on the rate limiter before every attempt. If the API responds with
+            `429 Too Many Requests`, the rate limiter (the bucket of the access token,
+            with a credential pool) is paused for the time specified by the response
+            and the request is retried.
+
+            With an adaptive limiter, a slot is taken before waiting on the rate
+            limiter - the latency reported back only covers the request itself.
+
+        Args:
+            query: String containing the GraphQL query.
+            variables: Values for the variables used in the query.
+            lane: Name of the lane the request belongs to, used with a scheduler.
+            credential: Name of the access token the request is pinned to, used with a
+                credential pool.
+
+        Returns:
+            Tuple containing the body of the response, and its status code.
+        """
+
+        payload = codec.dumps({"query": query, "variables": variables or {}}).encode(
+            "utf-8"
+        )
+
+        attempt = 0
+        while True:
+            body, status = await self._send(payload, lane, credential)
+
+            if status != 429 or attempt >= self.retries:
+                return body, status
+
+            attempt += 1
+
+    async def _send(
+        self, payload: bytes, lane: Optional[str], credential: Optional[str]
+    ) -> Tuple[bytes, int]:
+        # Makes a single attempt, under the limits imposed by the limiters.
+        adaptive = self.adaptive
+        if adaptive is not None:
+            await adaptive.acquire()
+
+        start: Optional[float] = None
+        ok = False
+        try:
+            headers = None
+            bucket = self.limiter
+
+            if self.credentials is not None:
+                chosen = await self.credentials.acquire(credential)
+                headers, bucket = chosen.headers, chosen.bucket
+            elif self.scheduler is not None:
+                await self.scheduler.acquire(lane)
+            else:
+                await self.limiter.acquire()
+
+            start = monotonic()
+            async with self._get_session().post(
+                self.url, data=payload, headers=headers
+            ) as response:
+                body = await response.read()
+                status = response.status
+                retry_after = response.headers.get("Retry-After", None)
+
+            if status == 429:
+                try:
+                    bucket.pause(float(retry_after or RETRY_AFTER))
+                except ValueError:
+                    bucket.pause(RETRY_AFTER)
+
+            ok = status != 429 and status < 500
+            return body, status
+        finally:
+            if adaptive is not None:
+                if start is None:
+                    adaptive.discard()
+                else:
+                    adaptive.release(monotonic() - start, ok)
+
+    async def crawl(
+        self,
+        sources: Iterable[Any],
+        sink: Callable[[List[Any]], Any],
+        concurrency: int = 4,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Crawl media through a pipeline of bounded stages - fetch, decode and sink. A
+        slow sink slows down the fetching, as opposed to responses piling up in memory.
+
+        Notes:
+            See `anilist.client.crawler.crawl` for the remaining arguments.
+
+        Args:
+            sources: Iterable yielding media ids, or instances of `MediaQuery`.
+            sink: Called with the list of objects in every page, can be a coroutine
+                function.
+            concurrency: Number of requests that can be in-flight at a time.
+            kwargs: Additional arguments for the crawl.
+
+        Returns:
+            Metrics for the crawl, containing the throughput of every stage.
+        """
+
+        from .crawler import crawl
+
+        return await crawl(self, sources, sink, concurrency, **kwargs)
+
+    async def close(self) -> None:
+        """
+        Close the session created by the client, and shut down the executor.
+        """
+
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+
+        self._session = None
+        self.executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> "Anilist":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
@@ -6,50 +6,116 @@ Used to define the common behaviour among all objects.
 """
 
 from abc import ABC, abstractmethod
-from ast import literal_eval
-from json import JSONEncoder
-from json import dumps as prettify_json
-from typing import Any, Union, Dict
+from typing import Any, Iterator, Union, Dict, List, Tuple, Type
 
-from . import BaseEnum
+from . import BaseEnum, codec
 
 
-class _CustomEncoder(JSONEncoder):
+def _encode(o: Any) -> Any:
     """
-    Implementing a custom encoder to encode a classes into a a printable string.
+    Hook used by the JSON codec to encode objects it can't handle by itself into a
+    printable string.
 
     Depending on the type of variable encountered, behaviour of the encoder will vary
     to ensure that the final JSON structure maps all the variables present in each
     object.
+
+    Args:
+        o: The object to be encoded.
+
+    Returns:
+        A version of the object that can be directly converted into JSON.
+    """
+
+    if isinstance(o, BaseEnum):
+        # If the object is derived from an enum, calling the `stringify()` method on
+        # this - the result will simply be a string.
+        return o.stringify()
+    elif isinstance(o, BaseObject):
+        # If the object is derived from `BaseObject`, handing its public instance
+        # variables back to the encoder - any nested object will be encoded through
+        # this method again. Enums are converted right away, some backends would
+        # otherwise encode them using their (integer) value.
+        return {
+            key: value.stringify() if isinstance(value, BaseEnum) else value
+            for key, value in o._fields().items()
+        }
+    else:
+        Warning(
+            f"Error; Unexpected object of type `{type(o)}` encountered. Unable "
+            f"to encode it into a string"
+        )
+
+        return "<error>"
+
+
+def _restore(cls: Type["BaseObject"], state: Dict[str, Any]) -> "BaseObject":
+    """
+    Recreates an object from its pickled state.
+
+    Notes:
+        The constructor is skipped on purpose - the state was validated while creating
+        the original object, re-running the type-checks for every object in a large
+        graph would only slow down the transfer.
+
+    Args:
+        cls: The class of the object being restored.
+        state: Dictionary containing the instance variables of the object.
+
+    Returns:
+        Instance of `cls` populated with the state.
+    """
+
+    obj = cls.__new__(cls)
+    obj.__setstate__(state)
+    return obj
+
+
+# Data accepted while initializing an object - raw JSON (as received over the network,
+# or decoded into a string), or a dictionary that has already been parsed.
+RawData = Union[str, bytes, bytearray, memoryview, Dict[Any, Any]]
+
+# A single change in a patch - path to the changed value (names of instance variables,
+# or indexes in a list), along with the new value.
+Change = Tuple[Tuple[Union[str, int], ...], Any]
+
+
+def _diff(
+    old: Any, new: Any, path: Tuple[Union[str, int], ...], into: List[Change]
+) -> None:
+    """
+    Recursively compares two values, appending the differences to a list.
+
+    Args:
+        old: The value being compared.
+        new: The value being compared against.
+        path: Path of the values being compared, from the root object.
+        into: List to which the changes are appended.
     """
 
-    def default(self, o: Any) -> Any:
-        if isinstance(o, (int, str, list, dict, tuple, float)):
-            # In case of primitive data types, using the built-in encoder.
-            #
-            # In case of complex datatype, i.e. list/dictionary/tuple, the
-            # encoder will iterate over each element present in the structure, calling
-            # this method for every object encountered - ensuring that the
-            # custom implementation works with iterable data types as well.
-            return JSONEncoder.default(self=self, o=o)
-        if isinstance(o, BaseEnum):
-            # If the object is derived from an enum, calling the `stringify()`
-            # method on this - not using `literal_eval` as the result will simply
-            # be a string.
-            return o.stringify()
-        elif isinstance(o, BaseObject):
-            # If the object is derived from `BaseObject`, calling the `stringify()`
-            # method on the object to get its string representation - the response
-            # will contain escape sequences (such as "\n"), using `literal_eval` to
-            # convert them into a printable string.
-            return literal_eval(o.stringify())
-        else:
-            Warning(
-                f"Error; Unexpected object of type `{type(o)}` encountered. Unable "
-                f"to encode it into a string"
-            )
-
-            return f"<error>"
+    if old is new:
+        return
+
+    if (
+        isinstance(old, BaseObject)
+        and not isinstance(old, ValueObject)
+        and type(old) is type(new)
+    ):
+        # Walking through the instance variables of both the objects - a change is
+        # recorded against the innermost value that differs. Value objects are
+        # replaced as a whole, an object used as a key is never modified.
+        old_fields = old._fields()
+        new_fields = new._fields()
+
+        for key in {**old_fields, **new_fields}:
+            _diff(old_fields.get(key), new_fields.get(key), path + (key,), into)
+    elif isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        for index, (x, y) in enumerate(zip(old, new)):
+            _diff(x, y, path + (index,), into)
+    elif type(old) is not type(new) or old != new:
+        # Any other change replaces the value as a whole - including lists with a
+        # different number of entries.
+        into.append((path, new))
 
 
 class BaseObject(ABC):
@@ -72,31 +138,217 @@ class BaseObject(ABC):
         # Using built-in method(s), generate a dictionary of instance variables present
         # in the object-name of the variable being the key with its value being the
         # the value in the dictionary. Then, converting this into a JSON response
-        return prettify_json(
-            obj={
-                # Allowing the JSON library to automatically map primitive types
-                f"{key}": value
-                for key, value in self.__dict__.items()
-                # Appending any instance variable if it does not start with an
-                # underscore - private and protected variables are not exposed.
-                if key[0] != "_" and not callable(key)
-            },
+        return codec.dumps(
+            _encode(self),
             indent=indent,
             sort_keys=True,
-            cls=_CustomEncoder,  # Using custom-encoder to handle complex data types
+            default=_encode,  # Using custom hook to handle complex data types
+        )
+
+    def iterencode(
+        self, indent: Union[int, None] = 4, chunk_size: int = codec.CHUNK_SIZE
+    ) -> Iterator[str]:
+        """
+        Convert the data held by this instance into JSON incrementally - same as
+        `stringify`, without building the entire string in memory.
+
+        Notes:
+            Joining the chunks gives the output of `stringify` with the `json` backend,
+            non-ASCII characters are always escaped.
+
+        Args:
+            indent: Integer containing amount of indent required, `None` for a single
+                line.
+            chunk_size: Minimum size of a chunk, in characters.
+
+        Returns:
+            Iterator yielding the chunks of the JSON data.
+        """
+
+        return codec.iterencode(
+            self, indent=indent, sort_keys=True, default=_encode, chunk_size=chunk_size
         )
 
+    def dump(self, fp: Any, indent: Union[int, None] = 4) -> None:
+        """
+        Write the data held by this instance as JSON to a file, incrementally.
+
+        Args:
+            fp: File-like object opened for writing, in text or binary mode.
+            indent: Integer containing amount of indent required, `None` for a single
+                line.
+        """
+
+        codec.dump(self, fp, indent=indent, sort_keys=True, default=_encode)
+
+    async def adump(self, writer: Any, indent: Union[int, None] = 4) -> None:
+        """
+        Write the data held by this instance as JSON to an asynchronous writer, for
+        example an `asyncio.StreamWriter`. See `codec.adump`.
+
+        Args:
+            writer: Object with a `write` method, returning a coroutine or not.
+            indent: Integer containing amount of indent required, `None` for a single
+                line.
+        """
+
+        await codec.adump(self, writer, indent=indent, sort_keys=True, default=_encode)
+
+    def _fields(self) -> Dict[str, Any]:
+        """
+        Fetch the public instance variables of this object.
+
+        Returns:
+            Dictionary with the name of the instance variable as the key, and its value
+            as the value.
+        """
+
+        return {
+            # Allowing the JSON library to automatically map primitive types
+            key: value
+            for key, value in self.__dict__.items()
+            # Appending any instance variable if it does not start with an
+            # underscore - private and protected variables are not exposed.
+            if key[0] != "_"
+        }
+
+    def __eq__(self, other: Any) -> bool:
+        # Field-wise comparison, nested objects are compared through this method as
+        # well - no need to convert both the objects into JSON strings.
+        if self is other:
+            return True
+
+        if type(other) is not type(self):
+            return NotImplemented
+
+        return bool(self._fields() == other._fields())
+
+    def diff(self, other: "BaseObject") -> List[Change]:
+        """
+        Compute the changes required to turn this object into another one.
+
+        Notes:
+            The changes are path based - a path is a tuple containing names of the
+            instance variables (or indexes in a list) that lead from this object to
+            the changed value. The change is recorded against the innermost value,
+            for example, `(("nextAiringEpisode", "timeUntilAiring"), 1800)`. Value
+            objects are not walked into, a change to one of them replaces the object
+            as a whole - `(("stats", "scoreDistribution", 3), ScoreDistribution(...))`.
+
+            The new values are not copied, they are shared with `other`.
+
+        Args:
+            other: Object of the same type as this object.
+
+        Returns:
+            List of changes, empty if both the objects are equal. Can be passed to
+            `apply` to update this object.
+        """
+
+        if type(other) is not type(self):
+            raise TypeError
+
+        changes: List[Change] = []
+        _diff(self, other, (), changes)
+
+        return changes
+
+    def apply(self, patch: List[Change]) -> "BaseObject":
+        """
+        Update this object in-place using the changes computed through `diff`.
+
+        Notes:
+            Value objects are never modified in-place, they might be in use as keys.
+            Paths leading into a value object are rejected.
+
+        Args:
+            patch: List of changes, as returned by `diff`.
+
+        Raises:
+            ValueError: Raised for an empty path, or a path leading into a value
+                object.
+
+        Returns:
+            This object, after applying the changes.
+        """
+
+        if not isinstance(patch, list):
+            raise TypeError
+
+        for path, value in patch:
+            if not isinstance(path, tuple) or len(path) == 0:
+                raise ValueError(f"Invalid path `{path}` in patch")
+
+            # Walking up to the parent of the changed value.
+            parent: Any = self
+            for key in path[:-1]:
+                parent = parent[key] if isinstance(key, int) else getattr(parent, key)
+
+            if isinstance(parent, ValueObject):
+                raise ValueError(f"Path `{path}` leads into a value object")
+
+            if isinstance(path[-1], int):
+                parent[path[-1]] = value
+            else:
+                setattr(parent, path[-1], value)
+
+        return self
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Fetch the state of this object, used while pickling the object.
+
+        Returns:
+            Dictionary containing the instance variables of the object, a copy - the
+            object is not modified through it.
+        """
+
+        return dict(self.__dict__)
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        # Assigning the values directly, the constructor is not run again.
+        self.__dict__.update(state)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return _restore, (type(self), self.__getstate__())
+
+    @staticmethod
+    def _load(data: RawData) -> Dict[Any, Any]:
+        """
+        Parse the data passed in to `initialize` into a dictionary.
+
+        Notes:
+            Bytes are handed to the backend as-is, without decoding them into a
+            string first. A memoryview is read in place by `orjson` only - every other
+            backend parses a string decoded from it, a full copy of the data.
+
+        Args:
+            data: JSON data as a string, bytes, bytearray or memoryview. Or, a
+            dictionary that will be returned as-is.
+
+        Returns:
+            Dictionary containing the parsed data.
+        """
+
+        if isinstance(data, dict):
+            return data
+        elif isinstance(data, (str, bytes, bytearray, memoryview)):
+            # Can result in a ValueError if the data does not contain valid JSON
+            return codec.loads(data)  # type: ignore
+
+        raise TypeError
+
     @staticmethod
     @abstractmethod
-    def initialize(data: Union[str, Dict[Any, Any]]) -> Any:
+    def initialize(data: RawData) -> Any:
         """
         Static method to instantiate an object of this class using a JSON string, or a
         dictionary containing the required key-value pairs.
 
         Args:
-            data: Can be a string containing JSON data to populate an instance of the
-            child class. Or, a dictionary containing key-value pairs with the
-            appropriate data.
+            data: Can be a string (or bytes, bytearray, memoryview) containing JSON data
+            to populate an instance of the child class. Or, a dictionary containing
+            key-value pairs with the appropriate data.
 
         Returns:
             An object of the child class, populated with the data passed in to this
@@ -104,3 +356,38 @@ class BaseObject(ABC):
         """
 
         raise NotImplementedError("Direct call to abstract method")
+
+
+class ValueObject(BaseObject, ABC):
+    """
+    Base for objects that are a plain collection of values - such as a date, or the
+    title of a media. Two instances holding the same values are equal, and hash the
+    same - these objects can be used as keys in a dictionary, or in a set.
+
+    Notes:
+        Value objects are mutable, like every other object. The hash is computed once,
+        and cached in the object - the cache is only dropped when an instance variable
+        is assigned through `__setattr__`, and is never pickled (the hash of a string
+        differs between processes). An object in use as a key must not be modified,
+        replace it with a new object instead.
+
+        All instance variables of a child class must be hashable.
+    """
+
+    def __hash__(self) -> int:
+        try:
+            return self.__dict__["_hash"]  # type: ignore
+        except KeyError:
+            # Fields are hashed as a set, mapping the same values to the same hash
+            # irrespective of the order in which they were assigned.
+            value = hash((type(self), frozenset(self._fields().items())))
+            self.__dict__["_hash"] = value
+            return value
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        # Any modification invalidates the cached hash.
+        self.__dict__.pop("_hash", None)
+        super().__setattr__(key, value)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {key: value for key, value in self.__dict__.items() if key != "_hash"}
@@ -0,0 +1,255 @@
+"""
+Bulk crawler - crawls a large range of media ids across multiple processes.
+
+A single process is bound by the time spent decoding the responses, well before it
+reaches the limits of the network. The ids are split into batches (a single `id_in`
+query each), and the batches are dealt out to the worker processes. Every worker runs
+its own client and crawl pipeline, with all the workers sharing a single rate limit
+through shared memory. The objects built by the workers are merged into a single sink
+in the parent process.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, cast
+
+import asyncio
+import multiprocessing
+import pickle
+from queue import Empty
+from time import perf_counter
+
+from .anilist_client import API_URL, Anilist
+from .executor import INLINE, DecodeExecutor
+from .rate_limit import TokenBucket
+
+# Kinds of messages sent by the workers.
+_ITEMS = 0
+_DONE = 1
+_ERROR = 2
+
+
+class SharedTokenBucket(TokenBucket):
+    def __init__(self, rate: float = 1.5, capacity: float = 90, context: Any = None):
+        """
+        Token bucket whose state is held in shared memory - shared by every process it
+        is passed to, while starting the process.
+
+        Notes:
+            The state is read and updated under a lock shared by all the processes.
+            Counters for the tokens handed out are kept per process.
+
+        Args:
+            rate: Number of tokens added to the bucket per second.
+            capacity: Maximum number of tokens the bucket can hold.
+            context: The multiprocessing context used to allocate the shared memory.
+        """
+
+        # Tokens, time of the last update, and the end of the pause (if any).
+        self._state = (context or multiprocessing).Array("d", 3)
+        self._lock = self._state.get_lock()
+
+        super().__init__(rate, capacity)
+
+    @property
+    def _tokens(self) -> float:
+        return cast(float, self._state[0])
+
+    @_tokens.setter
+    def _tokens(self, value: float) -> None:
+        self._state[0] = value
+
+    @property
+    def _updated(self) -> float:
+        return cast(float, self._state[1])
+
+    @_updated.setter
+    def _updated(self, value: float) -> None:
+        self._state[1] = value
+
+    @property
+    def _paused_until(self) -> float:
+        return cast(float, self._state[2])
+
+    @_paused_until.setter
+    def _paused_until(self, value: float) -> None:
+        self._state[2] = value
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            return super().available
+
+    def delay(self) -> float:
+        with self._lock:
+            return super().delay()
+
+    def reserve(self) -> float:
+        with self._lock:
+            return super().reserve()
+
+    def refund(self) -> None:
+        with self._lock:
+            super().refund()
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            super().pause(seconds)
+
+
+def _work(
+    shards: List[Sequence[int]],
+    url: str,
+    bucket: SharedTokenBucket,
+    queue: Any,
+    options: Dict[str, Any],
+) -> None:
+    # Entry point of a worker process - crawls its share of the batches, and sends
+    # every page of objects back to the parent.
+    async def main() -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+
+        async def sink(items: List[Any]) -> None:
+            # The queue is bounded, a slow parent holds back the workers.
+            await loop.run_in_executor(None, queue.put, (_ITEMS, items))
+
+        executor = DecodeExecutor(INLINE)
+        async with Anilist(url, executor=executor, limiter=bucket) as client:
+            sources = (x for shard in shards for x in shard)
+            metrics = await client.crawl(sources, sink, **options)
+
+        return cast(Dict[str, Any], metrics.snapshot())
+
+    try:
+        queue.put((_DONE, asyncio.run(main())))
+    except BaseException as error:
+        try:
+            # The queue pickles its items in a separate thread, unpicklable errors
+            # have to be caught here.
+            pickle.dumps(error)
+        except Exception:
+            error = RuntimeError(repr(error))
+
+        queue.put((_ERROR, error))
+
+
+def bulk_crawl(
+    ids: Sequence[int],
+    sink: Callable[[List[Any]], Any],
+    workers: int = 4,
+    url: str = API_URL,
+    rate: float = 1.5,
+    capacity: float = 90,
+    batch: int = 50,
+    concurrency: int = 4,
+    queue_size: int = 16,
+) -> Dict[str, Any]:
+    """
+    Crawl media by their ids, across multiple worker processes.
+
+    Notes:
+        Batches of ids are dealt out to the workers in turns (the first batch to the
+        first worker, the second to the second, and so on), spreading dense and sparse
+        regions of the id-space evenly. A `range` is never expanded in memory.
+
+        Blocks till the crawl is complete. The first error in any worker stops all
+        the workers, and is raised again.
+
+    Args:
+        ids: Sequence of media ids to be crawled, usually a `range`.
+        sink: Called in the parent process with the list of objects in every page, in
+            the order in which the pages arrive.
+        workers: Number of worker processes.
+        url: URL of the GraphQL endpoint.
+        rate: Rate limit shared by all the workers, in requests per second.
+        capacity: Burst allowed by the shared rate limit.
+        batch: Number of ids per request, the API allows up to 50.
+        concurrency: Number of requests in-flight per worker.
+        queue_size: Maximum number of pages waiting to be passed to the sink.
+
+    Returns:
+        Dictionary containing the totals for the crawl, along with the metrics of the
+        crawl in each worker.
+    """
+
+    if not isinstance(ids, Sequence) or not callable(sink):
+        raise TypeError
+
+    if not all(isinstance(x, int) for x in (workers, batch, concurrency, queue_size)):
+        raise TypeError
+
+    if workers < 1 or not 1 <= batch <= 50:
+        raise ValueError("Invalid limits for the crawl")
+
+    # Spawning, as opposed to forking, keeps the workers clear of the threads (and the
+    # event loops) of the parent.
+    context = multiprocessing.get_context("spawn")
+    bucket = SharedTokenBucket(rate, capacity, context)
+    queue = context.Queue(maxsize=queue_size)
+
+    batches = [ids[x : x + batch] for x in range(0, len(ids), batch)]
+    options = {"concurrency": concurrency, "per_page": batch}
+
+    processes = [
+        context.Process(
+            target=_work,
+            args=(batches[index::workers], url, bucket, queue, options),
+            daemon=True,
+        )
+        for index in range(min(workers, len(batches)))
+    ]
+
+    start = perf_counter()
+    for process in processes:
+        process.start()
+
+    reports: List[Dict[str, Any]] = []
+    items = 0
+    error: Optional[BaseException] = None
+    completed = False
+
+    try:
+        while len(reports) < len(processes):
+            try:
+                kind, payload = queue.get(timeout=0.5)
+            except Empty:
+                alive = [x.is_alive() for x in processes]
+                if not all(alive) and queue.empty():
+                    # A worker died without reporting back - a failed worker stops
+                    # the crawl right away. Once every worker has exited, the missing
+                    # reports never arrive, whatever the exit codes.
+                    dead = [x.exitcode for x in processes if not x.is_alive()]
+                    if any(x != 0 for x in dead) or not any(alive):
+                        raise RuntimeError(
+                            f"Worker exited with code(s) {dead} without reporting back"
+                        )
+
+                continue
+
+            if kind == _ITEMS:
+                items += len(payload)
+                sink(payload)
+            elif kind == _DONE:
+                reports.append(payload)
+            else:
+                error = payload
+                break
+
+        completed = error is None
+    finally:
+        for process in processes:
+            if not completed:
+                process.terminate()
+
+            process.join(5)
+
+        queue.close()
+
+    if error is not None:
+        raise error
+
+    elapsed = perf_counter() - start
+    return {
+        "elapsed": elapsed,
+        "items": items,
+        "throughput": items / elapsed if elapsed else 0.0,
+        "workers": reports,
+    }
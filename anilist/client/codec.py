@@ -0,0 +1,494 @@
+"""
+Single entry-point for all the JSON work done by the package - parsing the responses
+received from the API, as well as converting objects back into JSON.
+
+The actual work is delegated to a backend - `orjson`, `ujson` (installed through the
+extras of the same name) or the `json` module from the standard library. Parsed data is
+the same with every backend, JSON is parsed by the fastest backend that is installed.
+Output is not, JSON is generated by the standard library till a caller switches the
+backend through `use` - the output of `dumps` then follows the conventions of the
+backend.
+
+Large object graphs can be written out incrementally through `iterencode`, `dump` and
+`adump` - the JSON is produced in chunks, never as a single string.
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import json as _json
+from importlib import import_module
+from inspect import isawaitable
+from json.encoder import encode_basestring_ascii
+
+# Backends in the order of preference.
+BACKENDS = ("orjson", "ujson", "json")
+
+# Backend generating JSON.
+_name: str = "json"
+_module: Any = _json
+
+# Backend parsing JSON, selected once the list of backends is available.
+_parser: str = "json"
+_parser_module: Any = _json
+
+
+def available() -> List[str]:
+    """
+    Fetch the backends that can be used.
+
+    Returns:
+        List containing names of the installed backends, in the order of preference.
+    """
+
+    result = []
+    for name in BACKENDS:
+        try:
+            import_module(name)
+        except ImportError:
+            continue
+
+        result.append(name)
+
+    return result
+
+
+def backend() -> str:
+    """
+    Fetch the backend currently used to generate JSON.
+
+    Returns:
+        String containing the name of the backend.
+    """
+
+    return _name
+
+
+def parser() -> str:
+    """
+    Fetch the backend currently used to parse JSON.
+
+    Returns:
+        String containing the name of the backend.
+    """
+
+    return _parser
+
+
+def use(name: Optional[str] = None, parse_only: bool = False) -> str:
+    """
+    Switch the backend used to parse and generate JSON.
+
+    Notes:
+        Parsed data is the same with every backend, the output of `dumps` is not -
+        compact output of `orjson` and `ujson` has no whitespace, and non-ASCII
+        characters are written as-is instead of being escaped. The fastest backend
+        that is installed parses JSON from the start, the backend generating JSON is
+        never switched automatically - output only changes once a caller opts in.
+
+    Args:
+        name: Name of the backend - one of `orjson`, `ujson` or `json`. If `None`, the
+            fastest backend that is installed will be used.
+        parse_only: Boolean indicating if the backend is only used to parse JSON,
+            leaving the backend generating JSON as-is.
+
+    Raises:
+        ValueError: Raised if the name does not belong to a known backend.
+        ImportError: Raised if the backend is not installed.
+
+    Returns:
+        String containing the name of the backend that is now in use.
+    """
+
+    global _name, _module, _parser, _parser_module
+
+    if name is None:
+        name = available()[0]
+
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend `{name}`")
+
+    _parser_module = import_module(name)
+    _parser = name
+
+    if not parse_only:
+        _module = _parser_module
+        _name = name
+
+    return name
+
+
+def loads(data: Any) -> Any:
+    """
+    Parse JSON data.
+
+    Notes:
+        Parsed by the backend returned by `parser`. A memoryview is only parsed in
+        place by `orjson`, other backends parse a string decoded from it - a full copy
+        of the data.
+
+    Args:
+        data: JSON data as a string, bytes, bytearray or memoryview.
+
+    Returns:
+        The parsed data.
+    """
+
+    if isinstance(data, memoryview) and _parser != "orjson":
+        # Only `orjson` reads a memoryview directly. The remaining backends take a
+        # copy of the buffer, decoded into a string - a single copy, the standard
+        # library would decode `bytes` into a string as well.
+        data = str(data, "utf-8")
+
+    return _parser_module.loads(data)
+
+
+def dumps(
+    obj: Any,
+    indent: Optional[int] = None,
+    sort_keys: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+) -> str:
+    """
+    Convert an object into a JSON string.
+
+    Notes:
+        `orjson` only supports an indent of two spaces, any other indent is handled
+        through the standard library. Compact output of `orjson` and `ujson` does not
+        contain any whitespace.
+
+        `ujson` drops the contents of dictionaries returned by the `default` hook if
+        the keys are to be sorted, sorted output is handled through the standard
+        library as well.
+
+        Enums are serialized by their value by `orjson`, the `default` hook has to
+        convert them before they reach the backend.
+
+    Args:
+        obj: The object to be converted.
+        indent: Number of spaces used to indent the output, `None` for a single line.
+        sort_keys: Boolean indicating if the keys of dictionaries should be sorted.
+        default: Called for objects that can't be serialized otherwise, should return
+            a serializable version of the object.
+
+    Returns:
+        String containing the JSON data.
+    """
+
+    if _name == "orjson" and indent in (None, 2):
+        option = 0
+        if indent is not None:
+            option |= _module.OPT_INDENT_2
+        if sort_keys:
+            option |= _module.OPT_SORT_KEYS
+
+        return str(_module.dumps(obj, default=default, option=option), "utf-8")
+    elif _name == "ujson" and not sort_keys:
+        return str(
+            _module.dumps(obj, indent=indent or 0, default=default, ensure_ascii=False)
+        )
+
+    return _json.dumps(obj, indent=indent, sort_keys=sort_keys, default=default)
+
+
+# Parsing through the fastest backend available on import, output stays the same.
+use(parse_only=True)
+
+
+# Size (in characters) of the chunks produced while encoding incrementally.
+CHUNK_SIZE = 64 * 1024
+
+
+class _Encoder:
+    def __init__(
+        self,
+        indent: Optional[int],
+        sort_keys: bool,
+        default: Optional[Callable[[Any], Any]],
+        chunk_size: int,
+    ):
+        """
+        Incremental encoder - walks through the object graph, buffering the encoded
+        parts till a chunk is complete.
+
+        Notes:
+            The output matches the one generated by the standard library, the backends
+            only produce complete strings.
+
+        Args:
+            indent: Number of spaces used to indent the output, `None` for a single line.
+            sort_keys: Boolean indicating if the keys of dictionaries should be sorted.
+            default: Called for objects that can't be serialized otherwise.
+            chunk_size: Minimum size of a chunk, in characters.
+        """
+
+        self.indent = indent
+        self.sort_keys = sort_keys
+        self.default = default
+        self.chunk_size = chunk_size
+
+        # Same separators as the standard library.
+        self.separator = ", " if indent is None else ","
+
+        self._parts: List[str] = []
+        self._size = 0
+        self._markers: Set[int] = set()
+
+    def _append(self, part: str) -> None:
+        self._parts.append(part)
+        self._size += len(part)
+
+    def _flush(self) -> str:
+        chunk = "".join(self._parts)
+        self._parts = []
+        self._size = 0
+
+        return chunk
+
+    def _scalar(self, o: Any) -> Optional[str]:
+        # Encodes primitive values, `None` for anything else.
+        if isinstance(o, str):
+            return encode_basestring_ascii(o)
+        elif o is None:
+            return "null"
+        elif o is True:
+            return "true"
+        elif o is False:
+            return "false"
+        elif isinstance(o, int):
+            return int.__repr__(o)
+        elif isinstance(o, float):
+            if o != o:
+                return "NaN"
+            elif o in (float("inf"), float("-inf")):
+                return "Infinity" if o > 0 else "-Infinity"
+
+            return float.__repr__(o)
+
+        return None
+
+    def _key(self, key: Any) -> str:
+        # Keys are always strings in JSON, same conversions as the standard library.
+        if isinstance(key, str):
+            return key
+
+        if isinstance(key, (bool, int, float)) or key is None:
+            return self._scalar(key)  # type: ignore
+
+        raise TypeError(f"Keys must be str, int, float, bool or None, not `{key}`")
+
+    def encode(self, o: Any, level: int = 0) -> Iterator[str]:
+        """
+        Encode a value, yielding every chunk that is complete.
+
+        Args:
+            o: The value to be encoded.
+            level: Depth of the value, used for the indent.
+        """
+
+        scalar = self._scalar(o)
+        if scalar is not None:
+            self._append(scalar)
+            return
+
+        if not isinstance(o, (dict, list, tuple)):
+            if self.default is None:
+                raise TypeError(f"Object of type `{type(o)}` is not JSON serializable")
+
+            yield from self._nested(o, self.default(o), level)
+            return
+
+        yield from self._nested(o, o, level)
+
+    def _nested(self, o: Any, value: Any, level: int) -> Iterator[str]:
+        # Guarding against cycles through the identity of the original object.
+        marker = id(o)
+        if marker in self._markers:
+            raise ValueError("Circular reference detected")
+
+        self._markers.add(marker)
+
+        if isinstance(value, dict):
+            yield from self._object(value, level)
+        elif isinstance(value, (list, tuple)):
+            yield from self._array(value, level)
+        else:
+            yield from self.encode(value, level)
+
+        self._markers.discard(marker)
+
+    def _object(self, o: Dict[Any, Any], level: int) -> Iterator[str]:
+        if not o:
+            self._append("{}")
+            return
+
+        items = [(self._key(k), v) for k, v in o.items()]
+        if self.sort_keys:
+            items.sort(key=lambda x: x[0])
+
+        opening, separator, closing = self._layout(level)
+
+        self._append("{")
+        for index, (key, value) in enumerate(items):
+            self._append(separator if index else opening)
+            self._append(encode_basestring_ascii(key))
+            self._append(": ")
+
+            # Primitive values are appended right away, skipping the generator.
+            scalar = self._scalar(value)
+            if scalar is None:
+                yield from self.encode(value, level + 1)
+            else:
+                self._append(scalar)
+
+            if self._size >= self.chunk_size:
+                yield self._flush()
+
+        self._append(closing)
+        self._append("}")
+
+    def _array(self, o: Any, level: int) -> Iterator[str]:
+        if not o:
+            self._append("[]")
+            return
+
+        opening, separator, closing = self._layout(level)
+
+        self._append("[")
+        for index, value in enumerate(o):
+            self._append(separator if index else opening)
+
+            scalar = self._scalar(value)
+            if scalar is None:
+                yield from self.encode(value, level + 1)
+            else:
+                self._append(scalar)
+
+            if self._size >= self.chunk_size:
+                yield self._flush()
+
+        self._append(closing)
+        self._append("]")
+
+    def _layout(self, level: int) -> Tuple[str, str, str]:
+        # Whitespace after the opening bracket, between items and before the closing
+        # bracket of a container.
+        if self.indent is None:
+            return "", self.separator, ""
+
+        inner = "\n" + " " * self.indent * (level + 1)
+        return inner, self.separator + inner, "\n" + " " * self.indent * level
+
+    def iterencode(self, o: Any) -> Iterator[str]:
+        yield from self.encode(o)
+
+        if self._parts:
+            yield self._flush()
+
+
+def iterencode(
+    obj: Any,
+    indent: Optional[int] = None,
+    sort_keys: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[str]:
+    """
+    Convert an object into JSON incrementally.
+
+    Notes:
+        Joining the chunks gives the same output as `json.dumps` from the standard
+        library - non-ASCII characters are escaped, and the output is the same with
+        every backend. Only a single chunk is held in memory at a time, along with the
+        path from the root to the value being encoded.
+
+    Args:
+        obj: The object to be converted.
+        indent: Number of spaces used to indent the output, `None` for a single line.
+        sort_keys: Boolean indicating if the keys of dictionaries should be sorted.
+        default: Called for objects that can't be serialized otherwise, should return
+            a serializable version of the object.
+        chunk_size: Minimum size of a chunk, in characters - apart from the last chunk.
+
+    Returns:
+        Iterator yielding the chunks of the JSON data, as strings.
+    """
+
+    if indent is not None and not isinstance(indent, int):
+        raise TypeError
+
+    if not isinstance(chunk_size, int):
+        raise TypeError
+
+    return _Encoder(indent, sort_keys, default, chunk_size).iterencode(obj)
+
+
+def _prepare(target: Any, chunk: str) -> Any:
+    # Text files (anything with an encoding) take strings, everything else bytes.
+    return chunk if hasattr(target, "encoding") else chunk.encode("utf-8")
+
+
+def dump(
+    obj: Any,
+    fp: Any,
+    indent: Optional[int] = None,
+    sort_keys: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> None:
+    """
+    Write an object as JSON to a file, incrementally. See `iterencode`.
+
+    Args:
+        obj: The object to be converted.
+        fp: File-like object with a `write` method. Files opened in text mode receive
+            strings, binary files receive UTF-8 encoded bytes.
+        indent: Number of spaces used to indent the output, `None` for a single line.
+        sort_keys: Boolean indicating if the keys of dictionaries should be sorted.
+        default: Called for objects that can't be serialized otherwise.
+        chunk_size: Minimum size of a chunk written to the file, in characters.
+    """
+
+    if not hasattr(fp, "write"):
+        raise TypeError
+
+    for chunk in iterencode(obj, indent, sort_keys, default, chunk_size):
+        fp.write(_prepare(fp, chunk))
+
+
+async def adump(
+    obj: Any,
+    writer: Any,
+    indent: Optional[int] = None,
+    sort_keys: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> None:
+    """
+    Write an object as JSON to an asynchronous writer, incrementally. See `iterencode`.
+
+    Notes:
+        Writers with a `write` coroutine (for example, files opened through
+        `aiofiles`) are awaited. Writers with a `drain` coroutine (for example,
+        `asyncio.StreamWriter`) are drained after every chunk - a slow reader holds
+        back the encoder.
+
+    Args:
+        obj: The object to be converted.
+        writer: Object with a `write` method, returning a coroutine or not. Writers with
+            an `encoding` receive strings, others receive UTF-8 encoded bytes.
+        indent: Number of spaces used to indent the output, `None` for a single line.
+        sort_keys: Boolean indicating if the keys of dictionaries should be sorted.
+        default: Called for objects that can't be serialized otherwise.
+        chunk_size: Minimum size of a chunk written to the writer, in characters.
+    """
+
+    if not hasattr(writer, "write"):
+        raise TypeError
+
+    drain = getattr(writer, "drain", None)
+    for chunk in iterencode(obj, indent, sort_keys, default, chunk_size):
+        result = writer.write(_prepare(writer, chunk))
+        if isawaitable(result):
+            await result
+        elif drain is not None:
+            await drain()
@@ -0,0 +1,270 @@
+"""
+Crawl pipeline - fetches, decodes and stores media in stages.
+
+Each stage runs as its own set of workers, connected to the next stage through a bounded
+queue. A stage that falls behind fills up its queue, which blocks the stage before it;
+a slow sink slows down the fetching instead of letting the responses pile up in memory.
+
+    sources -> [jobs] -> fetch (x concurrency) -> [responses] -> decode -> [results]
+        -> sink
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import asyncio
+from inspect import isawaitable
+from time import perf_counter
+
+from .anilist_client import Anilist, _process
+
+
+class StageMetrics:
+    def __init__(self, name: str):
+        """
+        Counters for a single stage of the pipeline.
+
+        Args:
+            name: Name of the stage.
+        """
+
+        self.name = name
+        self.items = 0
+        self.busy_seconds = 0.0
+
+        # Largest number of entries waiting in the queue feeding this stage.
+        self.peak_queue = 0
+
+    def record(self, items: int, seconds: float) -> None:
+        """
+        Record a unit of work done by the stage.
+
+        Args:
+            items: Number of items processed.
+            seconds: Time spent on processing the items.
+        """
+
+        self.items += items
+        self.busy_seconds += seconds
+
+
+class CrawlMetrics:
+    def __init__(self):
+        """
+        Counters for the complete pipeline, updated while the crawl is running.
+
+        Notes:
+            The fetch stage counts responses, while the decode and sink stages count
+            objects.
+        """
+
+        self.fetch = StageMetrics("fetch")
+        self.decode = StageMetrics("decode")
+        self.sink = StageMetrics("sink")
+
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        """
+        Number of seconds for which the crawl has been running.
+        """
+
+        if self._started is None:
+            return 0.0
+
+        return (self._finished or perf_counter()) - self._started
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Fetch the current value of all the counters, along with the throughput of
+        every stage.
+
+        Returns:
+            Dictionary containing the time elapsed, and the counters for each stage.
+        """
+
+        elapsed = self.elapsed
+        result: Dict[str, Any] = {"elapsed": elapsed}
+
+        for stage in (self.fetch, self.decode, self.sink):
+            result[stage.name] = {
+                "items": stage.items,
+                "busy_seconds": stage.busy_seconds,
+                "peak_queue": stage.peak_queue,
+                "throughput": stage.items / elapsed if elapsed else 0.0,
+            }
+
+        return result
+
+
+async def _put(queue: "asyncio.Queue[Any]", item: Any, stage: StageMetrics) -> None:
+    await queue.put(item)
+    stage.peak_queue = max(stage.peak_queue, queue.qsize())
+
+
+async def crawl(
+    client: Anilist,
+    sources: Iterable[Any],
+    sink: Callable[[List[Any]], Any],
+    concurrency: int = 4,
+    queue_size: int = 8,
+    decoders: int = 1,
+    per_page: int = 50,
+    metrics: Optional[CrawlMetrics] = None,
+    lane: Optional[str] = None,
+) -> CrawlMetrics:
+    """
+    Crawl media through a pipeline of bounded stages.
+
+    Notes:
+        Sources are consumed lazily, a generator can be used to crawl an id-space
+        without holding it in memory. Media ids are grouped into batches of `per_page`
+        (a single `id_in` query each), queries are followed through all their pages.
+
+        The first error raised by any stage stops the crawl, and is raised again.
+
+    Args:
+        client: The client used to make the requests, its rate limiter spaces out the
+            requests and its executor decodes the responses.
+        sources: Iterable yielding media ids, or instances of `MediaQuery`.
+        sink: Called with the list of objects in every page, in the order in which
+            the pages are decoded. Can be a coroutine function.
+        concurrency: Number of requests that can be in-flight at a time.
+        queue_size: Maximum number of responses (and decoded pages) held between the
+            stages.
+        decoders: Number of responses that can be decoded at a time, useful with an
+            executor running a thread, or process pool.
+        per_page: Number of media requested per page, the API allows up to 50.
+        metrics: Existing metrics to be updated, allowing the crawl to be monitored
+            while it is running.
+        lane: Name of the lane used for the requests, with a client using a
+            scheduler - usually a background lane.
+
+    Returns:
+        Metrics for the crawl.
+    """
+
+    from ..queries import MediaQuery
+    from ..types import decode_page
+
+    if not isinstance(client, Anilist) or not callable(sink):
+        raise TypeError
+
+    if not all(isinstance(x, int) for x in (concurrency, queue_size, decoders)):
+        raise TypeError
+
+    if min(concurrency, queue_size, decoders) < 1 or not 1 <= per_page <= 50:
+        raise ValueError("Invalid limits for the crawl")
+
+    metrics = metrics or CrawlMetrics()
+    metrics._started = perf_counter()
+    loop = asyncio.get_running_loop()
+
+    # Queues are annotated through strings, `asyncio.Queue` can't be subscripted on
+    # Python 3.7. `None` marks the end of the items for a worker.
+    jobs: "asyncio.Queue[Optional[Tuple[MediaQuery, bool]]]" = asyncio.Queue(
+        maxsize=concurrency
+    )
+    responses: (
+        "asyncio.Queue[Optional[Tuple[bytes, int, Optional[asyncio.Future[bool]]]]]"
+    ) = asyncio.Queue(maxsize=queue_size)
+    results: "asyncio.Queue[Optional[List[Any]]]" = asyncio.Queue(maxsize=queue_size)
+
+    async def produce() -> None:
+        batch: List[int] = []
+
+        for source in sources:
+            if isinstance(source, MediaQuery):
+                await jobs.put((source, True))
+            elif isinstance(source, int) and not isinstance(source, bool):
+                batch.append(source)
+
+                if len(batch) == per_page:
+                    await jobs.put((MediaQuery(id_in=batch), False))
+                    batch = []
+            else:
+                raise TypeError(f"Unknown source for the crawl `{source}`")
+
+        if batch:
+            await jobs.put((MediaQuery(id_in=batch), False))
+
+        for _ in range(concurrency):
+            await jobs.put(None)
+
+    async def fetch() -> None:
+        while True:
+            job = await jobs.get()
+            if job is None:
+                return
+
+            query, paginate = job
+            text, page = query.query, 1
+
+            while True:
+                start = perf_counter()
+                body, status = await client.request(
+                    text, query.variables(page, per_page), lane
+                )
+                metrics.fetch.record(1, perf_counter() - start)
+
+                # Whether there is a next page is only known once the response has been
+                # decoded - batches of ids always fit in a single page.
+                next_page = loop.create_future() if paginate else None
+                await _put(responses, (body, status, next_page), metrics.decode)
+
+                if next_page is None or not await next_page:
+                    break
+
+                page += 1
+
+    async def decode() -> None:
+        while True:
+            entry = await responses.get()
+            if entry is None:
+                return
+
+            body, status, next_page = entry
+
+            start = perf_counter()
+            items, info = await client.executor.run(_process, body, status, decode_page)
+            metrics.decode.record(len(items), perf_counter() - start)
+
+            if next_page is not None:
+                next_page.set_result(bool(info.get("hasNextPage", False)))
+
+            await _put(results, items, metrics.sink)
+
+    async def store() -> None:
+        while True:
+            items = await results.get()
+            if items is None:
+                return
+
+            start = perf_counter()
+            result = sink(items)
+            if isawaitable(result):
+                await result
+
+            metrics.sink.record(len(items), perf_counter() - start)
+
+    async def fetch_stage() -> None:
+        await asyncio.gather(produce(), *(fetch() for _ in range(concurrency)))
+        for _ in range(decoders):
+            await responses.put(None)
+
+    async def decode_stage() -> None:
+        await asyncio.gather(*(decode() for _ in range(decoders)))
+        await results.put(None)
+
+    tasks = [asyncio.ensure_future(x) for x in (fetch_stage(), decode_stage(), store())]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+        metrics._finished = perf_counter()
+
+    return metrics
@@ -0,0 +1,136 @@
+"""
+Pool of credentials (API tokens) shared by a client.
+
+The rate limit is imposed per token - every token in the pool gets its own token bucket,
+and requests are spread across the tokens. The throughput of the client scales with the
+number of tokens in the pool.
+"""
+
+from typing import Any, Dict, Optional, Sequence, Union
+
+from .rate_limit import TokenBucket
+
+
+class Credential:
+    def __init__(self, name: str, token: str, bucket: TokenBucket):
+        """
+        A single token in the pool, along with its rate limit.
+
+        Args:
+            name: Name used to pin requests to the token, for example the name of the
+                user the token belongs to.
+            token: The access token, sent as a bearer token.
+            bucket: Token bucket tracking the rate limit of this token.
+        """
+
+        self.name = name
+        self.token = token
+        self.bucket = bucket
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """
+        Headers used to authenticate a request with this token.
+        """
+
+        return {"Authorization": f"Bearer {self.token}"}
+
+    def __repr__(self) -> str:
+        # Keeping the token itself out of logs.
+        return f"{self.__class__.__name__}({self.name!r})"
+
+
+class CredentialPool:
+    def __init__(
+        self,
+        tokens: Union[Sequence[str], Dict[str, str]],
+        rate: float = 1.5,
+        capacity: float = 90,
+    ):
+        """
+        Spreads requests across multiple access tokens.
+
+        Notes:
+            Requests that are not pinned go to the token with the most budget left -
+            tokens that were rate limited by the API are skipped till their pause is
+            over.
+
+        Args:
+            tokens: Access tokens, or a dictionary mapping names to access tokens.
+                Tokens passed without names are named by their position, as
+                `token-0`, `token-1` and so on - the token itself never shows up in
+                names, snapshots or errors.
+            rate: Rate limit for each token, in requests per second.
+            capacity: Burst allowed for each token.
+        """
+
+        if isinstance(tokens, str) or not isinstance(tokens, (list, tuple, dict)):
+            raise TypeError
+
+        named = (
+            tokens
+            if isinstance(tokens, dict)
+            else {f"token-{x}": y for x, y in enumerate(tokens)}
+        )
+        if not all(isinstance(k, str) and isinstance(v, str) for k, v in named.items()):
+            raise TypeError
+
+        if not named:
+            raise ValueError("Credential pool needs at least one token")
+
+        self.credentials: Dict[str, Credential] = {
+            name: Credential(name, token, TokenBucket(rate, capacity))
+            for name, token in named.items()
+        }
+
+    def pick(self, name: Optional[str] = None) -> Credential:
+        """
+        Choose the token for a request, without waiting on its rate limit.
+
+        Args:
+            name: Name of the token the request is pinned to, if any.
+
+        Raises:
+            ValueError: Raised if there is no token with the name.
+
+        Returns:
+            The credential to be used.
+        """
+
+        if name is None:
+            return max(self.credentials.values(), key=lambda x: x.bucket.available)
+
+        credential = self.credentials.get(name, None)
+        if credential is None:
+            raise ValueError(f"Unknown credential `{name}`")
+
+        return credential
+
+    async def acquire(self, name: Optional[str] = None) -> Credential:
+        """
+        Choose the token for a request, and wait on its rate limit.
+
+        Args:
+            name: Name of the token the request is pinned to, if any.
+
+        Returns:
+            The credential to be used.
+        """
+
+        credential = self.pick(name)
+        await credential.bucket.acquire()
+
+        return credential
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Fetch the state of the rate limit of every token.
+
+        Returns:
+            Dictionary mapping the name of every token to the state of its bucket.
+        """
+
+        return {k: v.bucket.snapshot() for k, v in self.credentials.items()}
+
+    def __len__(self) -> int:
+        return len(self.credentials)
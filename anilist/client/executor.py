@@ -0,0 +1,158 @@
+"""
+Offloads decoding of responses from the event loop.
+
+Parsing a response and building objects out of it is pure CPU work, while it runs the
+event loop is blocked - every other request in-flight has to wait. Small responses are
+still decoded on the loop itself (handing them off costs more than decoding them), any
+response above a size threshold is decoded in a thread, or a process pool.
+"""
+
+from typing import Any, Callable, Dict, Optional
+
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from time import perf_counter
+
+# Modes in which the executor can run.
+INLINE = "inline"
+THREAD = "thread"
+PROCESS = "process"
+
+
+class DecodeMetrics:
+    def __init__(self):
+        """
+        Counters describing the work done by a `DecodeExecutor`.
+
+        Notes:
+            Inline counters only cover the time spent decoding on the event loop, they
+            are not a measure of the lag of the loop - work offloaded to the pool (or
+            any other work on the loop) is not accounted for. Offloaded time is the
+            time waited for the pool, including time spent queued. Comparing the time
+            per byte for both the modes helps in tuning the size threshold.
+        """
+
+        self.inline_calls = 0
+        self.inline_bytes = 0
+        self.inline_seconds = 0.0
+        self.max_inline_seconds = 0.0
+
+        self.offloaded_calls = 0
+        self.offloaded_bytes = 0
+        self.offloaded_seconds = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Fetch the current value of all the counters.
+
+        Returns:
+            Dictionary mapping the name of each counter to its value.
+        """
+
+        return dict(self.__dict__)
+
+
+class DecodeExecutor:
+    def __init__(
+        self,
+        mode: str = THREAD,
+        threshold: int = 64 * 1024,
+        max_workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ):
+        """
+        Decides where a response is to be decoded - inline on the event loop, or in an
+        executor.
+
+        Notes:
+            In the process mode, the method and its arguments are pickled and sent to
+            the worker process - the method has to be defined at the module level.
+
+        Args:
+            mode: One of `inline`, `thread` or `process`. In the inline mode, every
+                response is decoded on the event loop.
+            threshold: Size of the response (in bytes) above which it is offloaded to
+                the executor. Smaller responses are decoded inline.
+            max_workers: Maximum number of workers in the pool, created on first use.
+            executor: Existing executor to offload to, instead of creating a new pool.
+                Not shut down along with this object.
+        """
+
+        if mode not in (INLINE, THREAD, PROCESS):
+            raise ValueError(f"Unknown mode `{mode}`")
+
+        if not isinstance(threshold, int) or (
+            max_workers is not None and not isinstance(max_workers, int)
+        ):
+            raise TypeError
+
+        if executor is not None and not isinstance(executor, Executor):
+            raise TypeError
+
+        self.mode = mode
+        self.threshold = threshold
+        self.metrics = DecodeMetrics()
+
+        self._max_workers = max_workers
+        self._executor = executor
+        self._owns_executor = executor is None
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            kind = ProcessPoolExecutor if self.mode == PROCESS else ThreadPoolExecutor
+            self._executor = kind(max_workers=self._max_workers)
+
+        return self._executor
+
+    async def run(self, method: Callable[..., Any], body: Any, *args: Any) -> Any:
+        """
+        Decode a response.
+
+        Args:
+            method: Method used to decode the response, called with the response as
+                the first argument, followed by `args`.
+            body: The response, in bytes - its size decides where it is decoded.
+            args: Any additional arguments to be passed to the method.
+
+        Returns:
+            The value returned by the method.
+        """
+
+        size = len(body)
+        metrics = self.metrics
+
+        if self.mode == INLINE or size < self.threshold:
+            start = perf_counter()
+            try:
+                return method(body, *args)
+            finally:
+                elapsed = perf_counter() - start
+
+                metrics.inline_calls += 1
+                metrics.inline_bytes += size
+                metrics.inline_seconds += elapsed
+                metrics.max_inline_seconds = max(metrics.max_inline_seconds, elapsed)
+
+        start = perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._pool(), partial(method, body, *args)
+            )
+        finally:
+            metrics.offloaded_calls += 1
+            metrics.offloaded_bytes += size
+            metrics.offloaded_seconds += perf_counter() - start
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut down the pool created by this object, if any.
+
+        Args:
+            wait: Boolean indicating if the call should wait for pending work.
+        """
+
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -0,0 +1,471 @@
+"""
+Streaming export of media - one record at a time, to NDJSON, CSV or Parquet.
+
+Records are written as they arrive, nothing apart from the record being written (or a
+single row group, for Parquet) is held in memory - the memory used stays the same
+regardless of the number of media exported. Exporters can be passed directly to a
+crawl as the sink.
+
+Nested objects are flattened into columns named after the path to the field, for
+example `title_romaji` or `startDate_year`. Lists of objects (tags, rankings, and so
+on) become a list per field - `tags_name` holds the names of all the tags.
+"""
+
+from typing import (
+    IO,
+    Any,
+    AsyncIterable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
+
+import bz2
+import csv
+import gzip
+import io
+import lzma
+import os
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from . import BaseObject, codec
+from .base_object import _encode
+from ..types import MediaData
+from ..types.decoder import _ENUM, _LIST, _OBJECT, _SPECS
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+# Compression formats, mapped to the method opening a compressed file.
+COMPRESSION: Dict[str, Callable[..., Any]] = {
+    "gzip": gzip.open,
+    "bz2": bz2.open,
+    "xz": lzma.open,
+}
+_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+# Fields holding integers and booleans - every other scalar field holds a string.
+_INTEGERS = frozenset(
+    (
+        "id",
+        "idMal",
+        "seasonYear",
+        "episodes",
+        "duration",
+        "chapters",
+        "volumes",
+        "updatedAt",
+        "averageScore",
+        "meanScore",
+        "popularity",
+        "favourites",
+        "trending",
+        "rank",
+        "year",
+        "month",
+        "day",
+        "airingAt",
+        "timeUntilAiring",
+        "episode",
+        "mediaId",
+        "score",
+        "amount",
+    )
+)
+_BOOLEANS = frozenset(
+    ("isAdult", "isGeneralSpoiler", "isMediaSpoiler", "allTime", "isLocked")
+)
+
+# Fields holding a list of strings.
+_LISTS = frozenset(("genres", "synonyms"))
+
+# Columns holding strings, despite the name of the field - trailers are identified
+# through the id of the video on the site hosting it.
+_STRINGS = frozenset(("trailer_id",))
+
+# Type of a column - the kind of value held, and whether it is a list of values.
+Column = Tuple[str, str, bool]
+
+
+@lru_cache(maxsize=None)
+def _schema(
+    cls: Type[BaseObject], prefix: str, in_list: bool, path: Tuple[type, ...]
+) -> List[Column]:
+    spec = _SPECS[cls]
+    result: List[Column] = []
+
+    for key in list(spec.defaults) + list(spec.lists):
+        column = f"{prefix}{key}"
+        rule = spec.nested.get(key, None)
+
+        if rule is None:
+            kind = "int" if key in _INTEGERS else "bool" if key in _BOOLEANS else "str"
+            kind = "str" if column in _STRINGS else kind
+            result.append((column, kind, in_list or key in _LISTS))
+        elif rule[0] == _ENUM:
+            result.append((column, "str", in_list))
+        elif rule[1] not in path:
+            # Skipping cycles - the media of an airing schedule is the media itself.
+            result.extend(
+                _schema(
+                    rule[1],
+                    f"{column}_",
+                    in_list or rule[0] == _LIST,
+                    path + (rule[1],),
+                )
+            )
+
+    return result
+
+
+def schema(cls: Type[BaseObject] = MediaData) -> List[Column]:
+    """
+    Fetch the columns produced by flattening objects of a class.
+
+    Args:
+        cls: The class of the objects, must be present in the type map of the decoder.
+
+    Returns:
+        List of columns, in order - each column is a tuple of its name, the kind of
+        value held (`int`, `bool` or `str`), and a boolean indicating if the column
+        holds a list of values.
+    """
+
+    if cls not in _SPECS:
+        raise TypeError(f"No entry in the type map for `{cls}`")
+
+    return list(_schema(cls, "", False, (cls,)))
+
+
+def _flatten(
+    obj: Any,
+    cls: Type[BaseObject],
+    prefix: str,
+    out: Dict[str, Any],
+    path: Tuple[type, ...],
+) -> None:
+    spec = _SPECS[cls]
+
+    for key in list(spec.defaults) + list(spec.lists):
+        column = f"{prefix}{key}"
+        value = None if obj is None else obj.__dict__.get(key, None)
+        rule = spec.nested.get(key, None)
+
+        if rule is None:
+            out[column] = list(value) if isinstance(value, (list, tuple)) else value
+            continue
+
+        kind, target = rule
+        if kind == _ENUM:
+            out[column] = None if value is None else value.translate
+        elif target in path:
+            continue
+        elif kind == _OBJECT:
+            _flatten(value, target, f"{column}_", out, path + (target,))
+        else:
+            # One list per field of the nested objects.
+            rows = []
+            for item in value or []:
+                row: Dict[str, Any] = {}
+                _flatten(item, target, f"{column}_", row, path + (target,))
+                rows.append(row)
+
+            for name, _, _ in _schema(target, f"{column}_", True, path + (target,)):
+                out[name] = [x[name] for x in rows]
+
+
+def flatten(obj: BaseObject) -> Dict[str, Any]:
+    """
+    Flatten an object, along with its nested objects, into a single record.
+
+    Args:
+        obj: The object to be flattened, its class must be present in the type map of
+            the decoder.
+
+    Returns:
+        Dictionary mapping the name of every column (see `schema`) to its value. Enums
+        are replaced with their value in the API.
+    """
+
+    cls = type(obj)
+    if cls not in _SPECS:
+        raise TypeError(f"No entry in the type map for `{cls}`")
+
+    result: Dict[str, Any] = {}
+    _flatten(obj, cls, "", result, (cls,))
+
+    return result
+
+
+def _open(
+    target: Union[str, "os.PathLike[str]", IO[bytes]], compression: Optional[str]
+) -> Tuple[IO[bytes], bool]:
+    # Opens the target for writing bytes, along with a boolean indicating if the file
+    # was opened here (and should be closed along with the exporter).
+    if isinstance(target, (str, os.PathLike)):
+        if compression is None:
+            compression = _SUFFIXES.get(os.path.splitext(target)[1], None)
+
+        if compression is None:
+            return open(target, "wb"), True
+
+        return _compressed(target, compression), True
+
+    if not hasattr(target, "write"):
+        raise TypeError
+
+    if compression is not None:
+        return _compressed(target, compression), True
+
+    return target, False
+
+
+def _compressed(target: Any, compression: str) -> IO[bytes]:
+    # Opens a compressed file over a path, or a file object - the compressed files are
+    # binary file objects, though not typed as `IO`.
+    if compression not in COMPRESSION:
+        raise ValueError(f"Unknown compression `{compression}`")
+
+    return cast(IO[bytes], COMPRESSION[compression](target, "wb"))
+
+
+class Exporter(ABC):
+    def __init__(self, cls: Type[BaseObject] = MediaData):
+        """
+        Base class for exporters, writes objects one at a time.
+
+        Notes:
+            Calling an exporter with a list of objects writes all of them - allowing it
+            to be used as the sink for a crawl. Exporters are context managers, closing
+            the file once the block is complete.
+
+        Args:
+            cls: The class of the objects being exported.
+        """
+
+        if cls not in _SPECS:
+            raise TypeError(f"No entry in the type map for `{cls}`")
+
+        self.cls = cls
+        self.count = 0
+
+    @abstractmethod
+    def write(self, obj: BaseObject) -> None:
+        """
+        Write a single object.
+
+        Args:
+            obj: The object to be written.
+        """
+
+        pass
+
+    def __call__(self, objects: Iterable[BaseObject]) -> None:
+        for obj in objects:
+            self.write(obj)
+
+    async def consume(self, objects: AsyncIterable[BaseObject]) -> int:
+        """
+        Write every object yielded by an asynchronous iterator, for example the one
+        returned by `aiter_objects`.
+
+        Args:
+            objects: Asynchronous iterable yielding the objects.
+
+        Returns:
+            Number of objects written by the exporter so far.
+        """
+
+        async for obj in objects:
+            self.write(obj)
+
+        return self.count
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Flush everything that has been written, and close the file.
+        """
+
+        pass
+
+    def __enter__(self) -> "Exporter":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class NDJSONExporter(Exporter):
+    def __init__(
+        self,
+        target: Union[str, "os.PathLike[str]", IO[bytes]],
+        compression: Optional[str] = None,
+        flat: bool = True,
+        cls: Type[BaseObject] = MediaData,
+    ):
+        """
+        Writes objects as newline delimited JSON - a single object per line.
+
+        Args:
+            target: Path to the file, or a file opened in binary mode.
+            compression: One of `gzip`, `bz2` or `xz`. Inferred from the extension
+                of the path if not specified.
+            flat: Boolean indicating if the objects are flattened into columns, as
+                opposed to being written with their nested structure.
+            cls: The class of the objects being exported.
+        """
+
+        super().__init__(cls)
+
+        self.flat = flat
+        self._file, self._owned = _open(target, compression)
+
+    def write(self, obj: BaseObject) -> None:
+        if not isinstance(obj, self.cls):
+            raise TypeError
+
+        if self.flat:
+            line = codec.dumps(flatten(obj))
+        else:
+            line = codec.dumps(_encode(obj), default=_encode)
+
+        self._file.write(line.encode("utf-8"))
+        self._file.write(b"\n")
+        self.count += 1
+
+    def close(self) -> None:
+        if self._owned:
+            self._file.close()
+        else:
+            self._file.flush()
+
+
+class CSVExporter(Exporter):
+    def __init__(
+        self,
+        target: Union[str, "os.PathLike[str]", IO[bytes]],
+        compression: Optional[str] = None,
+        cls: Type[BaseObject] = MediaData,
+    ):
+        """
+        Writes flattened objects as CSV, with a header containing the names of the
+        columns.
+
+        Notes:
+            Columns holding lists are written as JSON arrays.
+
+        Args:
+            target: Path to the file, or a file opened in binary mode.
+            compression: One of `gzip`, `bz2` or `xz`. Inferred from the extension
+                of the path if not specified.
+            cls: The class of the objects being exported.
+        """
+
+        super().__init__(cls)
+
+        self._file, self._owned = _open(target, compression)
+        self._text = io.TextIOWrapper(self._file, encoding="utf-8", newline="")
+
+        self._columns = schema(cls)
+        self._writer = csv.writer(self._text)
+        self._writer.writerow([x[0] for x in self._columns])
+
+    def write(self, obj: BaseObject) -> None:
+        if not isinstance(obj, self.cls):
+            raise TypeError
+
+        record = flatten(obj)
+        self._writer.writerow(
+            [
+                codec.dumps(record[name]) if is_list else record[name]
+                for name, _, is_list in self._columns
+            ]
+        )
+        self.count += 1
+
+    def close(self) -> None:
+        self._text.flush()
+        if self._owned:
+            self._text.close()
+        else:
+            # Leaving the file open for the caller.
+            self._text.detach()
+
+
+class ParquetExporter(Exporter):
+    def __init__(
+        self,
+        target: Union[str, "os.PathLike[str]", IO[bytes]],
+        row_group: int = 1000,
+        cls: Type[BaseObject] = MediaData,
+    ):
+        """
+        Writes flattened objects as Parquet - a columnar format. Requires `pyarrow`.
+
+        Notes:
+            Objects are buffered till a row group is complete, memory used is bound by
+            the size of the row group.
+
+        Args:
+            target: Path to the file, or a file opened in binary mode.
+            row_group: Number of objects in a row group.
+            cls: The class of the objects being exported.
+
+        Raises:
+            ImportError: Raised if `pyarrow` is not installed.
+        """
+
+        if pyarrow is None:
+            raise ImportError("Parquet export requires `pyarrow` to be installed")
+
+        if not isinstance(row_group, int):
+            raise TypeError
+
+        super().__init__(cls)
+
+        kinds = {
+            "int": pyarrow.int64(),
+            "bool": pyarrow.bool_(),
+            "str": pyarrow.string(),
+        }
+        self._schema = pyarrow.schema(
+            [
+                (name, pyarrow.list_(kinds[kind]) if is_list else kinds[kind])
+                for name, kind, is_list in schema(cls)
+            ]
+        )
+
+        self.row_group = row_group
+        self._rows: List[Dict[str, Any]] = []
+        self._writer = pyarrow.parquet.ParquetWriter(target, self._schema)
+
+    def write(self, obj: BaseObject) -> None:
+        if not isinstance(obj, self.cls):
+            raise TypeError
+
+        self._rows.append(flatten(obj))
+        self.count += 1
+
+        if len(self._rows) >= self.row_group:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._rows:
+            table = pyarrow.Table.from_pylist(self._rows, schema=self._schema)
+            self._writer.write_table(table)
+            self._rows = []
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
@@ -0,0 +1,546 @@
+"""
+Client-side rate limiting.
+
+The API allows 90 requests per minute, exceeding the limit gets the client blocked
+for a minute (the response contains the `Retry-After` header). Requests are spaced
+out on the side of the client to stay within the limit, and the number of requests
+in-flight can be adapted to the health of the API. Requests of differing priority can
+share the same limit through lanes.
+"""
+
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from time import monotonic
+
+
+class TokenBucket:
+    def __init__(self, rate: float = 1.5, capacity: float = 90):
+        """
+        Token bucket - every request takes a token from the bucket, tokens are added
+        back at a fixed rate up to the capacity of the bucket.
+
+        Notes:
+            Tokens are reserved in the order in which they are requested - the bucket
+            can go into debt, every waiting request sleeps till its own token is
+            available. Waiting requests are served first-come first-served, without the
+            need for a lock.
+
+        Args:
+            rate: Number of tokens added to the bucket per second, defaults to 90 per
+                minute.
+            capacity: Maximum number of tokens the bucket can hold - the largest burst
+                of requests allowed.
+        """
+
+        if not isinstance(rate, (int, float)) or not isinstance(capacity, (int, float)):
+            raise TypeError
+
+        if rate <= 0 or capacity < 1:
+            raise ValueError("Rate should be positive, and capacity at least 1")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+
+        self._tokens = self.capacity
+        self._updated = monotonic()
+        self._paused_until = 0.0
+
+        self.acquired = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self) -> float:
+        now = monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+        return now
+
+    @property
+    def available(self) -> float:
+        """
+        Number of tokens currently present in the bucket, negative if waiting requests
+        have already reserved tokens yet to be added.
+        """
+
+        now = self._refill()
+        if now < self._paused_until:
+            return min(self._tokens, 0.0)
+
+        return self._tokens
+
+    def delay(self) -> float:
+        """
+        Number of seconds till the next token is available, without taking it out of
+        the bucket.
+        """
+
+        now = self._refill()
+        return max((1 - self._tokens) / self.rate, self._paused_until - now, 0.0)
+
+    def reserve(self) -> float:
+        """
+        Take a token out of the bucket, without waiting for it.
+
+        Returns:
+            Number of seconds to wait for before the token can be used.
+        """
+
+        now = self._refill()
+        self._tokens -= 1
+        self.acquired += 1
+
+        delay = max(-self._tokens / self.rate, self._paused_until - now, 0.0)
+        self.wait_seconds += delay
+
+        return delay
+
+    def refund(self) -> None:
+        """
+        Return a reserved token that was never used.
+        """
+
+        self._tokens = min(self.capacity, self._tokens + 1)
+        self.acquired -= 1
+
+    async def acquire(self) -> None:
+        """
+        Wait till a token is available, and take it out of the bucket.
+        """
+
+        delay = self.reserve()
+
+        try:
+            while delay > 0:
+                await asyncio.sleep(delay)
+
+                # The bucket might have been paused while waiting.
+                delay = self._paused_until - monotonic()
+        except asyncio.CancelledError:
+            self.refund()
+            raise
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for a while - used when the API responds with the
+        `Retry-After` header.
+
+        Args:
+            seconds: Number of seconds for which the bucket is paused.
+        """
+
+        self._paused_until = max(self._paused_until, monotonic() + seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Fetch the current state of the bucket.
+
+        Returns:
+            Dictionary containing the tokens available, the number of tokens handed
+            out, and the total time spent waiting for them.
+        """
+
+        return {
+            "available": self.available,
+            "acquired": self.acquired,
+            "wait_seconds": self.wait_seconds,
+        }
+
+
+class AdaptiveLimiter:
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 64,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_factor: float = 2.0,
+        smoothing: float = 0.1,
+    ):
+        """
+        Limits the number of requests in-flight, adapting the limit through additive
+        increase, multiplicative decrease (AIMD).
+
+        Notes:
+            Every healthy response raises the limit by `increase / limit` - roughly
+            `increase` for every full window of requests. Failures (`429` and `5xx`
+            responses, or errors) and latency spikes cut the limit by the factor
+            `decrease`, at most once per round-trip - a burst of failures from the same
+            window only counts once.
+
+            A latency spike is a response slower than `latency_factor` times the
+            baseline, where the baseline is a moving average of the latency of
+            successful responses - spikes included, the baseline follows a lasting
+            change in the latency.
+
+            Can be used on its own through `slot`, or by the client alongside the
+            token bucket - the bucket limits the rate, while this limits the
+            concurrency.
+
+        Args:
+            initial: Initial limit for the requests in-flight.
+            minimum: The limit never falls below this value.
+            maximum: The limit never rises above this value.
+            increase: Additive increase for every full window of healthy responses.
+            decrease: Multiplicative decrease on a failure, between 0 and 1.
+            latency_factor: Ratio of the latency to the baseline treated as a spike.
+            smoothing: Weight of a new sample in the moving average of the latency.
+        """
+
+        if not all(isinstance(x, int) for x in (initial, minimum, maximum)):
+            raise TypeError
+
+        if not all(
+            isinstance(x, (int, float))
+            for x in (increase, decrease, latency_factor, smoothing)
+        ):
+            raise TypeError
+
+        if not 1 <= minimum <= initial <= maximum or not 0 < decrease < 1:
+            raise ValueError("Invalid limits for the adaptive limiter")
+
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = float(increase)
+        self.decrease = float(decrease)
+        self.latency_factor = float(latency_factor)
+        self.smoothing = float(smoothing)
+
+        self.limit = float(initial)
+        self.in_flight = 0
+        self.baseline: Optional[float] = None
+
+        self.increases = 0
+        self.decreases = 0
+
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+        self._last_decrease = float("-inf")
+
+    @property
+    def capacity(self) -> int:
+        """
+        Number of requests currently allowed to be in-flight.
+        """
+
+        return max(self.minimum, int(self.limit))
+
+    def _wake(self) -> None:
+        # Hands over free slots to the waiting requests, in order.
+        while self._waiters and self.in_flight < self.capacity:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    async def acquire(self) -> None:
+        """
+        Wait till the number of requests in-flight is below the limit, and take a slot.
+        """
+
+        if self.in_flight < self.capacity and not self._waiters:
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancellation.
+                self.in_flight -= 1
+                self._wake()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+            raise
+
+    def release(self, latency: float, ok: bool = True) -> None:
+        """
+        Free a slot, and adapt the limit using the outcome of the request.
+
+        Args:
+            latency: Number of seconds the request took.
+            ok: Boolean indicating if the request was successful - should be false for
+                rate limited, or failed requests.
+        """
+
+        self.in_flight -= 1
+
+        spike = (
+            self.baseline is not None and latency > self.baseline * self.latency_factor
+        )
+
+        # Spikes are averaged in as well - a lasting rise in the latency becomes the
+        # new baseline, instead of every response after it counting as a spike.
+        if ok:
+            self.baseline = (
+                latency
+                if self.baseline is None
+                else self.baseline + (latency - self.baseline) * self.smoothing
+            )
+
+        if ok and not spike:
+            self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+            self.increases += 1
+        else:
+            now = monotonic()
+            if now - self._last_decrease >= (self.baseline or 0.0):
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self.decreases += 1
+                self._last_decrease = now
+
+        self._wake()
+
+    def discard(self) -> None:
+        """
+        Free a slot without adapting the limit - for requests that were never sent.
+        """
+
+        self.in_flight -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[Dict[str, bool]]:
+        """
+        Hold a slot for the duration of the block, the latency is measured
+        automatically.
+
+        Notes:
+            The block can mark the request as failed by setting `ok` to false in the
+            dictionary it receives. The request is marked as failed if an exception is
+            raised.
+
+        Returns:
+            Asynchronous context manager yielding a dictionary with the key `ok`.
+        """
+
+        await self.acquire()
+
+        outcome = {"ok": True}
+        start = monotonic()
+        try:
+            yield outcome
+        except BaseException:
+            outcome["ok"] = False
+            raise
+        finally:
+            self.release(monotonic() - start, outcome["ok"])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Fetch the current state of the limiter.
+
+        Returns:
+            Dictionary containing the current limit, the requests in-flight and waiting,
+            the latency baseline, and the number of times the limit was changed.
+        """
+
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "baseline": self.baseline,
+            "increases": self.increases,
+            "decreases": self.decreases,
+        }
+
+
+class Lane:
+    def __init__(self, name: str, share: float):
+        """
+        A queue of requests waiting for tokens, along with its metrics.
+
+        Args:
+            name: Name of the lane.
+            share: Minimum fraction of the tokens handed to this lane while it has
+                requests waiting.
+        """
+
+        self.name = name
+        self.share = share
+        # Requests waiting for a token, along with the time at which they arrived.
+        self.waiters: Deque[Tuple["asyncio.Future[None]", float]] = deque()
+
+        # Tokens owed to the lane, to meet its minimum share.
+        self.credit = 0.0
+
+        self.granted = 0
+        self.peak_depth = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Fetch the current state of the lane.
+
+        Returns:
+            Dictionary containing the requests currently waiting, the most requests
+            ever waiting, the tokens handed out, and the time spent waiting for them.
+        """
+
+        return {
+            "depth": sum(not x.done() for x, _ in self.waiters),
+            "peak_depth": self.peak_depth,
+            "granted": self.granted,
+            "wait_seconds": self.wait_seconds,
+            "max_wait_seconds": self.max_wait_seconds,
+        }
+
+
+class LaneScheduler:
+    def __init__(
+        self,
+        bucket: Optional[TokenBucket] = None,
+        lanes: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Hands out tokens from a single token bucket to requests from multiple lanes.
+
+        Notes:
+            Lanes are served in the order of their priority - the first lane is served
+            first. To keep the lower lanes from starving, every lane gets at least its
+            share of the tokens handed out while it has requests waiting; a lane owed a
+            token is served before the lanes above it.
+
+            Tokens are handed out by a dispatcher task, started whenever a request has
+            to wait, and finished once the lanes are empty.
+
+        Args:
+            bucket: The shared token bucket, defaults to the limit imposed by the API.
+            lanes: Names of the lanes mapped to their minimum share of the tokens (from
+                0 to 1), in the order of their priority. By default, an `interactive`
+                lane, followed by a `background` lane guaranteed a fifth of the tokens.
+        """
+
+        lanes = {"interactive": 0.0, "background": 0.2} if lanes is None else lanes
+
+        if (bucket is not None and not isinstance(bucket, TokenBucket)) or (
+            not isinstance(lanes, dict)
+        ):
+            raise TypeError
+
+        if (
+            not lanes
+            or not all(isinstance(x, str) for x in lanes)
+            or not all(isinstance(x, (int, float)) for x in lanes.values())
+        ):
+            raise TypeError
+
+        if not all(0 <= x <= 1 for x in lanes.values()) or sum(lanes.values()) > 1:
+            raise ValueError("Shares of the lanes should add up to at most 1")
+
+        self.bucket = bucket or TokenBucket()
+        self.lanes: Dict[str, Lane] = {k: Lane(k, v) for k, v in lanes.items()}
+        self.default = next(iter(self.lanes))
+
+        self._task: Optional["asyncio.Future[None]"] = None
+
+    def _pick(self) -> Optional[Lane]:
+        waiting: List[Lane] = []
+        for lane in self.lanes.values():
+            while lane.waiters and lane.waiters[0][0].done():
+                # Dropping requests that were cancelled while waiting.
+                lane.waiters.popleft()
+
+            if lane.waiters:
+                waiting.append(lane)
+
+        if not waiting:
+            return None
+
+        owed = [x for x in waiting if x.credit >= 1]
+        chosen = owed[0] if owed else waiting[0]
+        if owed:
+            chosen.credit -= 1
+
+        # Lanes only earn credit while they have requests waiting.
+        for lane in waiting:
+            lane.credit = min(lane.credit + lane.share, 1.0)
+
+        return chosen
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            delay = self.bucket.delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            # Picking the lane only once a token is available - a request arriving
+            # while the dispatcher sleeps can still be served first.
+            lane = self._pick()
+            if lane is None:
+                return
+
+            waiter, queued = lane.waiters.popleft()
+            self.bucket.reserve()
+
+            waited = loop.time() - queued
+            lane.granted += 1
+            lane.wait_seconds += waited
+            lane.max_wait_seconds = max(lane.max_wait_seconds, waited)
+
+            waiter.set_result(None)
+
+    async def acquire(self, lane: Optional[str] = None) -> None:
+        """
+        Wait till a token is handed to the lane, and take it.
+
+        Args:
+            lane: Name of the lane, defaults to the lane with the highest priority.
+
+        Raises:
+            ValueError: Raised if there is no lane with the name.
+        """
+
+        target = self.lanes.get(lane or self.default, None)
+        if target is None:
+            raise ValueError(f"Unknown lane `{lane}`")
+
+        # Skipping the queue only if no request is waiting, and a token is available.
+        idle = self._task is None or self._task.done()
+        if idle and self.bucket.delay() <= 0:
+            self.bucket.reserve()
+            target.granted += 1
+            return
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+
+        target.waiters.append((waiter, loop.time()))
+        target.peak_depth = max(target.peak_depth, len(target.waiters))
+
+        if idle:
+            self._task = asyncio.ensure_future(self._dispatch())
+
+        await waiter
+
+    def pause(self, seconds: float) -> None:
+        """
+        Pause the shared token bucket, see `TokenBucket.pause`.
+        """
+
+        self.bucket.pause(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Fetch the current state of the shared bucket, and every lane.
+
+        Returns:
+            Dictionary containing the state of the bucket, and of each lane under its
+            name.
+        """
+
+        return {
+            "bucket": self.bucket.snapshot(),
+            **{k: v.snapshot() for k, v in self.lanes.items()},
+        }
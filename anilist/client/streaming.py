@@ -0,0 +1,259 @@
+"""
+Incremental parsing of large responses.
+
+The response is parsed as it arrives, one chunk at a time. Entries of a single array
+in the response (by default, the media present in a `Page` query) are handed out as
+soon as they are complete - only the entry currently being received is held in memory,
+as opposed to the complete response.
+"""
+
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Type,
+)
+
+import re
+
+from . import BaseObject, codec
+
+# Matches a single token - a structural character, a complete string, or a literal
+# (number, true, false or null). Leading whitespace is skipped.
+_TOKEN = re.compile(
+    rb'\s*(?:([{}\[\]:,])|("[^"\\]*(?:\\.[^"\\]*)*")|([^\s{}\[\]:,"]+))'
+)
+_WHITESPACE = re.compile(rb"\s*")
+
+# Path to the media in the response of a `Page` query.
+PAGE_MEDIA = ("data", "Page", "media")
+
+
+class _Container:
+    __slots__ = ("is_object", "key")
+
+    def __init__(self, is_object: bool):
+        # Key of the value currently being parsed, objects only.
+        self.is_object = is_object
+        self.key: Optional[str] = None
+
+
+class StreamingParser:
+    def __init__(self, path: Sequence[str] = PAGE_MEDIA):
+        """
+        Incremental JSON parser, extracts the entries of an array from a response that
+        is received in chunks.
+
+        Notes:
+            The array is located through the keys of the objects leading up to it, it
+            can't be nested inside another array.
+
+        Args:
+            path: Keys leading to the array, starting from the root of the response.
+        """
+
+        if isinstance(path, str) or not all(isinstance(x, str) for x in path):
+            raise TypeError
+
+        self._path = tuple(path)
+        self._buffer = bytearray()
+        self._pos = 0
+        self._stack: List[_Container] = []
+        self._expect_key = False
+
+        # Depth of the array once it is found, and the position in the buffer at which
+        # the entry currently being received begins.
+        self._target: Optional[int] = None
+        self._start: Optional[int] = None
+
+        self.found = False
+        self.done = False
+
+    def feed(self, chunk: Any) -> List[bytes]:
+        """
+        Parse the next chunk of the response.
+
+        Args:
+            chunk: Bytes (or a bytes-like object) containing the next chunk.
+
+        Returns:
+            List containing the raw JSON of every entry completed by this chunk.
+        """
+
+        if not isinstance(chunk, (bytes, bytearray, memoryview)):
+            raise TypeError
+
+        self._buffer += chunk
+        return self._parse(final=False)
+
+    def close(self) -> List[bytes]:
+        """
+        Signal the end of the response.
+
+        Raises:
+            ValueError: Raised if the response ended abruptly.
+
+        Returns:
+            List containing the raw JSON of any entry that was still pending.
+        """
+
+        result = self._parse(final=True)
+
+        if self._stack or _WHITESPACE.fullmatch(self._buffer, self._pos) is None:
+            raise ValueError("Incomplete JSON response")
+
+        return result
+
+    def _parse(self, final: bool) -> List[bytes]:
+        result: List[bytes] = []
+        buffer = self._buffer
+        stack = self._stack
+        path = self._path
+        size = len(buffer)
+        pos = self._pos
+
+        while True:
+            match = _TOKEN.match(buffer, pos)
+            if match is None:
+                # Either whitespace till the end, or a string that is yet to be
+                # closed - waiting for the next chunk either way.
+                break
+
+            literal = match.group(3)
+            if literal is not None and match.end() == size and not final:
+                # The literal might continue in the next chunk.
+                break
+
+            begin = match.start(1) if literal is None else match.start(3)
+            end = match.end()
+            pos = end
+
+            char = match.group(1)
+            if char is None:
+                token = match.group(2) or literal
+
+                if self._expect_key:
+                    # Keys are only relevant up to the depth of the array.
+                    if len(stack) <= len(path):
+                        stack[-1].key = codec.loads(token)
+
+                    self._expect_key = False
+                elif self._target is not None and len(stack) == self._target:
+                    # A primitive entry in the array.
+                    result.append(bytes(token))
+            elif char in b"{[":
+                if (
+                    self._target is not None
+                    and len(stack) == self._target
+                    and self._start is None
+                ):
+                    self._start = begin
+                elif (
+                    char == b"["
+                    and self._target is None
+                    and not self.found
+                    and len(stack) == len(path)
+                    and all(x.is_object and x.key == k for x, k in zip(stack, path))
+                ):
+                    self._target = len(stack) + 1
+                    self.found = True
+
+                stack.append(_Container(char == b"{"))
+                self._expect_key = char == b"{"
+            elif char in b"}]":
+                if not stack:
+                    raise ValueError("Unexpected end of a container in JSON response")
+
+                stack.pop()
+                self._expect_key = False
+
+                if self._target is not None:
+                    if len(stack) == self._target and self._start is not None:
+                        result.append(bytes(buffer[self._start : end]))
+                        self._start = None
+                    elif len(stack) < self._target:
+                        self._target = None
+                        self.done = True
+            elif char == b",":
+                self._expect_key = bool(stack) and stack[-1].is_object
+            # A colon does not change the state - the key has already been recorded.
+
+        # Dropping everything that has been parsed, apart from the entry that is still
+        # being received.
+        keep = pos if self._start is None else self._start
+        del buffer[:keep]
+        if self._start is not None:
+            self._start = 0
+
+        self._pos = pos - keep
+        return result
+
+
+def iter_objects(
+    chunks: Iterable[Any],
+    cls: Optional[Type[BaseObject]] = None,
+    path: Sequence[str] = PAGE_MEDIA,
+) -> Iterator[Any]:
+    """
+    Build objects from a response received in chunks, one entry of the array at a
+    time.
+
+    Args:
+        chunks: Iterable yielding the response in chunks of bytes.
+        cls: Class of the objects present in the array, defaults to `MediaData`.
+        path: Keys leading to the array, starting from the root of the response.
+
+    Returns:
+        Iterator yielding an object as soon as its entry has been received.
+    """
+
+    from ..types import MediaData, decode
+
+    cls = cls or MediaData
+    parser = StreamingParser(path)
+
+    for chunk in chunks:
+        for raw in parser.feed(chunk):
+            yield decode(raw, cls)
+
+    for raw in parser.close():
+        yield decode(raw, cls)
+
+
+async def aiter_objects(
+    chunks: AsyncIterable[Any],
+    cls: Optional[Type[BaseObject]] = None,
+    path: Sequence[str] = PAGE_MEDIA,
+) -> AsyncIterator[Any]:
+    """
+    Asynchronous version of `iter_objects`.
+
+    Notes:
+        Can be used directly with the body of an `aiohttp` response - for example,
+        `aiter_objects(response.content.iter_any())`.
+
+    Args:
+        chunks: Asynchronous iterable yielding the response in chunks of bytes.
+        cls: Class of the objects present in the array, defaults to `MediaData`.
+        path: Keys leading to the array, starting from the root of the response.
+
+    Returns:
+        Asynchronous iterator yielding an object as soon as its entry is received.
+    """
+
+    from ..types import MediaData, decode
+
+    cls = cls or MediaData
+    parser = StreamingParser(path)
+
+    async for chunk in chunks:
+        for raw in parser.feed(chunk):
+            yield decode(raw, cls)
+
+    for raw in parser.close():
+        yield decode(raw, cls)
@@ -0,0 +1,166 @@
+"""
+Synchronous facade over the asynchronous client.
+
+A single event loop runs in a background (daemon) thread, shared by every synchronous
+client. Calls are handed over to this loop, the calling thread blocks till the result
+is available - the connection pool of the asynchronous client is reused across calls,
+and across threads, as opposed to creating a new loop and session for every call.
+"""
+
+from typing import Any, Callable, Coroutine, Dict, Iterable, List, Optional, TypeVar
+
+import asyncio
+import concurrent.futures
+from threading import Lock, Thread, get_ident
+
+from .anilist_client import Anilist
+
+_lock = Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[Thread] = None
+
+T = TypeVar("T")
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    # Starts the background loop on the first call, the lock ensures that threads
+    # racing on the first call don't end up with separate loops.
+    global _loop, _thread
+
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = Thread(
+                target=loop.run_forever, name="anilist-event-loop", daemon=True
+            )
+            thread.start()
+
+            _loop, _thread = loop, thread
+
+    return _loop
+
+
+class SyncAnilist:
+    def __init__(self, *args: Any, **kwargs: Any):
+        """
+        Synchronous client for the API, can be shared between threads.
+
+        Notes:
+            The arguments are passed on to the asynchronous client - `Anilist`.
+
+        Args:
+            args: Positional arguments for `Anilist`.
+            kwargs: Keyword arguments for `Anilist`.
+        """
+
+        self.client = Anilist(*args, **kwargs)
+
+    def run(
+        self, coroutine: Coroutine[Any, Any, T], timeout: Optional[float] = None
+    ) -> T:
+        """
+        Run a coroutine on the background loop, and wait for its result.
+
+        Args:
+            coroutine: The coroutine to be run, usually a method of the asynchronous
+                client.
+            timeout: Maximum number of seconds to wait for, no limit by default.
+
+        Raises:
+            RuntimeError: Raised if called from the background loop itself, waiting
+                from within the loop would block it forever.
+
+        Returns:
+            The value returned by the coroutine.
+        """
+
+        loop = _get_loop()
+
+        if _thread is not None and _thread.ident == get_ident():
+            coroutine.close()
+            raise RuntimeError("Synchronous client can't be used from its own loop")
+
+        future: "concurrent.futures.Future[T]" = asyncio.run_coroutine_threadsafe(
+            coroutine, loop
+        )
+
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # The coroutine keeps running on the loop otherwise.
+            future.cancel()
+            raise
+
+    def execute(
+        self,
+        query: str,
+        variables: Optional[Dict[str, Any]] = None,
+        decoder: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        timeout: Optional[float] = None,
+        lane: Optional[str] = None,
+        credential: Optional[str] = None,
+    ) -> Any:
+        """
+        Run a query against the API, blocks till the response has been decoded.
+
+        Notes:
+            Synchronous version of `Anilist.execute`.
+
+        Args:
+            query: String containing the GraphQL query.
+            variables: Values for the variables used in the query.
+            decoder: Method used to build objects out of the parsed response.
+            timeout: Maximum number of seconds to wait for, no limit by default.
+            lane: Name of the lane the request belongs to, used with a scheduler.
+            credential: Name of the access token the request is pinned to, used with a
+                credential pool.
+
+        Returns:
+            The value returned by the decoder, or the parsed response if there is no
+            decoder.
+        """
+
+        return self.run(
+            self.client.execute(query, variables, decoder, lane, credential), timeout
+        )
+
+    def crawl(
+        self,
+        sources: Iterable[Any],
+        sink: Callable[[List[Any]], Any],
+        concurrency: int = 4,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Crawl media through a pipeline of bounded stages, blocks till the crawl is
+        complete.
+
+        Notes:
+            Synchronous version of `Anilist.crawl` - the sink is called from the
+            background loop.
+
+        Args:
+            sources: Iterable yielding media ids, or instances of `MediaQuery`.
+            sink: Called with the list of objects in every page.
+            concurrency: Number of requests that can be in-flight at a time.
+            kwargs: Additional arguments for the crawl.
+
+        Returns:
+            Metrics for the crawl, containing the throughput of every stage.
+        """
+
+        return self.run(self.client.crawl(sources, sink, concurrency, **kwargs))
+
+    def close(self) -> None:
+        """
+        Close the asynchronous client. The background loop keeps running, it is shared
+        with the other clients.
+        """
+
+        self.run(self.client.close())
+
+    def __enter__(self) -> "SyncAnilist":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
@@ -0,0 +1,3 @@
+# Reveal only the necessary sections
+
+from .media_query import MediaQuery
@@ -1,7 +1,8 @@
 # Defines classes used to perform media queries.
 
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Union
 
+from anilist.client import BaseEnum
 from anilist.types import (
     FuzzyDate,
     MediaSeason,
@@ -11,9 +12,117 @@ from anilist.types import (
     MediaSource,
     MediaSort,
 )
+from anilist.types.QueryObject import BaseQuery
 
+# Arguments named differently in the API.
+_RENAMED = {
+    "title": "search",
+    "media_id": "id",
+    "media_type": "type",
+    "country_origin": "countryOfOrigin",
+    "media_format": "format",
+}
 
-class MediaQuery:
+# GraphQL types for arguments that can't be derived from the type hints.
+_GRAPHQL_TYPES = {
+    "countryOfOrigin": "CountryCode",
+    "minimumTagRank": "Int",
+    "startDate_like": "String",
+    "endDate_like": "String",
+}
+
+# Fields requested for every media - the same fields are used by the decoder.
+MEDIA_FIELDS = """
+      id
+      idMal
+      title { romaji english native userPreferred }
+      type
+      format
+      status
+      description
+      startDate { year month day }
+      endDate { year month day }
+      season
+      seasonYear
+      episodes
+      duration
+      chapters
+      volumes
+      countryOfOrigin
+      source
+      trailer { id site thumbnail }
+      updatedAt
+      coverImage { extraLarge large medium color }
+      bannerImage
+      genres
+      synonyms
+      averageScore
+      meanScore
+      popularity
+      favourites
+      trending
+      tags {
+        id name description category rank isGeneralSpoiler isMediaSpoiler isAdult
+      }
+      nextAiringEpisode { id airingAt timeUntilAiring episode mediaId }
+      externalLinks { id url site }
+      streamingEpisodes { title thumbnail url site }
+      rankings { id rank type format year season allTime context }
+      stats {
+        scoreDistribution { score amount }
+        statusDistribution { status amount }
+      }
+      isAdult
+      siteUrl"""
+
+# Information requested for every page.
+PAGE_INFO = "pageInfo { total perPage currentPage lastPage hasNextPage }"
+
+
+def _graphql_type(hint: Any) -> str:
+    # Maps the type hint of an argument to its GraphQL type.
+    if getattr(hint, "__origin__", None) is Union:
+        hint = [x for x in hint.__args__ if x is not type(None)][0]
+
+    if getattr(hint, "__origin__", None) in (list, List):
+        return f"[{_graphql_type(hint.__args__[0])}]"
+
+    if hint is FuzzyDate:
+        return "FuzzyDateInt"
+
+    return {int: "Int", str: "String", bool: "Boolean"}.get(hint, None) or hint.__name__
+
+
+def _matches(value: Any, hint: Any) -> bool:
+    # Checks a value against the type hint of an argument - lists are checked along
+    # with every item in them.
+    origin = getattr(hint, "__origin__", None)
+    if origin is Union:
+        return any(_matches(value, x) for x in hint.__args__)
+
+    if origin in (list, List):
+        return isinstance(value, (list, tuple)) and all(
+            _matches(x, hint.__args__[0]) for x in value
+        )
+
+    return isinstance(value, hint)
+
+
+def _serialize(value: Any) -> Any:
+    # Converts a value to the form in which it is sent to the API.
+    if isinstance(value, BaseEnum):
+        return value.translate
+
+    if isinstance(value, FuzzyDate):
+        return value.packed
+
+    if isinstance(value, (list, tuple)):
+        return [_serialize(x) for x in value]
+
+    return value
+
+
+class MediaQuery(BaseQuery):
     def __init__(
         self,
         title: Optional[str] = None,
@@ -166,7 +275,8 @@ class MediaQuery:
 
             minimumTagRank: Apply tags filter argument to tags above this rank.
             onList: Filter by the media on an authenticated user's list. Works with
-            authentication. Not implemented yet.
+                authentication - the request should be pinned to the token of the
+                user, through a client with a credential pool.
 
             tagCategory: Filter by the media's tags in the tag category.
             tagCategory_in: Filter by the media's tags in the tag category.
@@ -196,4 +306,80 @@ class MediaQuery:
             licensedBy_in: Filter media by sites with online streaming/reading license
             sort: The order in which the results are to be returned.
         """
-        pass
+
+        arguments = dict(locals())
+        del arguments["self"]
+
+        hints = MediaQuery.__init__.__annotations__
+        if not all(
+            _matches(value, hints[key])
+            for key, value in arguments.items()
+            if value is not None
+        ):
+            raise TypeError
+
+        # Arguments that were filled, mapped to their name in the API.
+        self.arguments: Dict[str, Any] = {
+            _RENAMED.get(key, key): _serialize(value)
+            for key, value in arguments.items()
+            if value is not None
+        }
+
+    @property
+    def query(self) -> str:
+        """
+        The GraphQL query for a page of media matching the arguments.
+
+        Notes:
+            The query uses the variables `page` and `perPage` to select the page,
+            along with a variable for every argument that was filled.
+
+        Returns:
+            String containing the query.
+        """
+
+        hints = MediaQuery.__init__.__annotations__
+        names = {_RENAMED.get(x, x): x for x in hints if x != "return"}
+
+        declared = ["$page: Int", "$perPage: Int"]
+        used = []
+        for key in self.arguments:
+            kind = _GRAPHQL_TYPES.get(key, None) or _graphql_type(hints[names[key]])
+
+            declared.append(f"${key}: {kind}")
+            used.append(f"{key}: ${key}")
+
+        media = f"media({', '.join(used)})" if used else "media"
+
+        return (
+            f"query ({', '.join(declared)}) {{\n"
+            f"  Page(page: $page, perPage: $perPage) {{\n"
+            f"    {PAGE_INFO}\n"
+            f"    {media} {{{MEDIA_FIELDS}\n"
+            f"    }}\n"
+            f"  }}\n"
+            f"}}"
+        )
+
+    @query.setter
+    def query(self, args: Any) -> None:
+        # Same as the base query - the query is built from the arguments, it should
+        # not be modifiable externally.
+        raise NotImplementedError
+
+    def variables(self, page: int = 1, per_page: int = 50) -> Dict[str, Any]:
+        """
+        Variables to be sent along with the query, for a single page of results.
+
+        Args:
+            page: Number of the page, starting from 1.
+            per_page: Number of media in a page, the API allows up to 50.
+
+        Returns:
+            Dictionary containing the variables.
+        """
+
+        if not isinstance(page, int) or not isinstance(per_page, int):
+            raise TypeError
+
+        return {"page": page, "perPage": per_page, **self.arguments}
@@ -1,9 +1,11 @@
 from .enums import (MediaSeason, MediaFormat, MediaStatus, MediaSource,
                     MediaSort, MediaType, MediaRankType, MediaListStatus)
 from .miscellaneous import (FuzzyDate, AiringSchedule, ScoreDistribution,
-                            StatusDistribution)
+                            StatusDistribution, DateRangeIndex, pack_dates,
+                            filter_dates)
 from .media_objects import (MediaTitle, MediaTrailer, MediaPoster, MediaTag,
                             MediaExternalLink, MediaStreamingEpisode, MediaRank,
                             MediaStats)
 from .media_data import MediaData
 from .user_data import UserAvatar
+from .decoder import decode, decode_page
@@ -0,0 +1,354 @@
+"""
+Table-driven decoder, builds the objects for a complete response in a single pass.
+
+As opposed to `initialize`, where every object initializes its nested objects by
+calling their `initialize` method, the decoder walks the response iteratively through
+an explicit stack - the depth of the response has no effect on the call-stack. Fields
+are copied directly into the objects through a type map, the constructors are not run.
+
+Notes:
+    The decoder is meant for data received from the API. Apart from mapping enums, it
+    does not type-check the values - use `initialize` for data that has to be
+    validated. Values normalized by the constructors (such as two digit years in a
+    date) are normalized through the hooks in the type map, the objects are the same
+    as the ones built through `initialize`.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+
+from . import (
+    AiringSchedule,
+    FuzzyDate,
+    MediaData,
+    MediaExternalLink,
+    MediaFormat,
+    MediaListStatus,
+    MediaPoster,
+    MediaRank,
+    MediaRankType,
+    MediaSeason,
+    MediaSource,
+    MediaStats,
+    MediaStatus,
+    MediaStreamingEpisode,
+    MediaTag,
+    MediaTitle,
+    MediaTrailer,
+    MediaType,
+    ScoreDistribution,
+    StatusDistribution,
+    UserAvatar,
+)
+from ..client import BaseEnum, BaseObject, RawData
+
+# Kind of a nested field.
+_ENUM = 0
+_OBJECT = 1
+_LIST = 2
+
+# Normalizes the instance variables of an object, once they are populated.
+Normalizer = Callable[[Dict[str, Any]], None]
+
+
+class _Spec:
+    __slots__ = ("cls", "defaults", "lists", "nested", "normalize")
+
+    def __init__(
+        self,
+        cls: Type[BaseObject],
+        fields: Dict[str, Any],
+        nested: Dict[str, Any],
+        normalize: Optional[Normalizer] = None,
+    ):
+        """
+        Describes how a class is populated from the API response.
+
+        Args:
+            cls: The class being described.
+            fields: Names of all the instance variables of the class, along with their
+                default values. A list as the default value is replaced with a new
+                (empty) list for every object.
+            nested: Fields containing enums or nested objects, mapped to the enum, the
+                class of the object, or a list containing the class for a list of
+                objects.
+            normalize: Called with the instance variables of every object once they
+                are populated, applies the normalization done by the constructor.
+        """
+
+        self.cls = cls
+        self.normalize = normalize
+        self.defaults = {k: v for k, v in fields.items() if not isinstance(v, list)}
+        self.lists = tuple(k for k, v in fields.items() if isinstance(v, list))
+        self.nested: Dict[str, Tuple[int, Any]] = {}
+
+        for key, target in nested.items():
+            if isinstance(target, list):
+                self.nested[key] = (_LIST, target[0])
+            elif issubclass(target, BaseEnum):
+                # Pre-computing the reverse mapping for the enum, as opposed to
+                # scanning the enum for every value.
+                self.nested[key] = (
+                    _ENUM,
+                    {x.translate: x for x in target.__members__.values()},
+                )
+            else:
+                self.nested[key] = (_OBJECT, target)
+
+
+# The type map - instance variables are named after the fields in the API response.
+_SPECS: Dict[Type[BaseObject], _Spec] = {}
+
+
+def register(
+    cls: Type[BaseObject],
+    fields: Dict[str, Any],
+    nested: Optional[Dict[str, Any]] = None,
+    normalize: Optional[Normalizer] = None,
+) -> None:
+    """
+    Add (or replace) the description of a class in the type map.
+
+    Args:
+        cls: The class being described, should derive from `BaseObject`.
+        fields: Names of all the instance variables of the class, along with their
+            default values.
+        nested: Fields containing enums or nested objects, mapped to the enum, the
+            class of the object, or a list containing the class for a list of objects.
+        normalize: Called with the instance variables of every object once they are
+            populated - for values the constructor of the class normalizes.
+    """
+
+    if not isinstance(cls, type) or not issubclass(cls, BaseObject):
+        raise TypeError
+
+    if not isinstance(fields, dict) or not (nested is None or isinstance(nested, dict)):
+        raise TypeError
+
+    if normalize is not None and not callable(normalize):
+        raise TypeError
+
+    _SPECS[cls] = _Spec(cls, fields, nested or {}, normalize)
+
+
+def _date(fields: Dict[str, Any]) -> None:
+    # Two digit years are mapped the same way as the constructor of the date.
+    fields["year"] = FuzzyDate.full_year(fields["year"])
+
+
+register(FuzzyDate, {"day": 0, "month": 0, "year": 0}, normalize=_date)
+register(MediaTitle, dict.fromkeys(("romaji", "english", "native", "userPreferred")))
+register(MediaTrailer, dict.fromkeys(("id", "site", "thumbnail")))
+register(MediaPoster, dict.fromkeys(("extraLarge", "large", "medium", "color")))
+register(MediaExternalLink, dict.fromkeys(("id", "url", "site")))
+register(MediaStreamingEpisode, dict.fromkeys(("title", "thumbnail", "url", "site")))
+register(UserAvatar, dict.fromkeys(("large", "medium")))
+register(ScoreDistribution, dict.fromkeys(("score", "amount")))
+register(
+    StatusDistribution, dict.fromkeys(("status", "amount")), {"status": MediaListStatus}
+)
+register(
+    MediaTag,
+    dict.fromkeys(
+        (
+            "id",
+            "name",
+            "description",
+            "category",
+            "rank",
+            "isGeneralSpoiler",
+            "isMediaSpoiler",
+            "isAdult",
+        )
+    ),
+)
+register(
+    MediaRank,
+    dict.fromkeys(
+        ("id", "rank", "type", "format", "year", "season", "allTime", "context")
+    ),
+    {"type": MediaRankType, "format": MediaFormat, "season": MediaSeason},
+)
+register(
+    MediaStats,
+    {"scoreDistribution": [], "statusDistribution": []},
+    {
+        "scoreDistribution": [ScoreDistribution],
+        "statusDistribution": [StatusDistribution],
+    },
+)
+register(
+    AiringSchedule,
+    dict.fromkeys(("id", "airingAt", "timeUntilAiring", "episode", "mediaId", "media")),
+    {"media": MediaData},
+)
+register(
+    MediaData,
+    dict.fromkeys(
+        (
+            "id",
+            "idMal",
+            "title",
+            "type",
+            "format",
+            "status",
+            "description",
+            "startDate",
+            "endDate",
+            "season",
+            "seasonYear",
+            "episodes",
+            "duration",
+            "chapters",
+            "volumes",
+            "countryOfOrigin",
+            "source",
+            "trailer",
+            "updatedAt",
+            "coverImage",
+            "bannerImage",
+            "genres",
+            "synonyms",
+            "averageScore",
+            "meanScore",
+            "popularity",
+            "favourites",
+            "trending",
+            "tags",
+            "nextAiringEpisode",
+            "externalLinks",
+            "streamingEpisodes",
+            "rankings",
+            "stats",
+            "isAdult",
+            "siteUrl",
+        )
+    ),
+    {
+        "title": MediaTitle,
+        "type": MediaType,
+        "format": MediaFormat,
+        "status": MediaStatus,
+        "startDate": FuzzyDate,
+        "endDate": FuzzyDate,
+        "season": MediaSeason,
+        "source": MediaSource,
+        "trailer": MediaTrailer,
+        "coverImage": MediaPoster,
+        "tags": [MediaTag],
+        "nextAiringEpisode": AiringSchedule,
+        "externalLinks": [MediaExternalLink],
+        "streamingEpisodes": [MediaStreamingEpisode],
+        "rankings": [MediaRank],
+        "stats": MediaStats,
+    },
+)
+
+
+def decode(data: Union[RawData, List[Any]], cls: Type[BaseObject]) -> Any:
+    """
+    Build an object, along with all of its nested objects, from the API response.
+
+    Notes:
+        Fields missing from the data are set to their default value (`None` for most
+        of the fields), and fields that are not a part of the type map are ignored.
+
+    Args:
+        data: Data for a single object, or a list of objects. Can be raw JSON (string,
+            bytes, bytearray or memoryview), or the parsed data.
+        cls: The class of the object(s) to be built, must be present in the type map.
+
+    Raises:
+        ValueError: Raised if an enum in the data can't be mapped.
+
+    Returns:
+        The object built from the data, or a list of objects if the data was a list.
+    """
+
+    specs = _SPECS
+    if cls not in specs:
+        raise TypeError(f"No entry in the type map for `{cls}`")
+
+    if not isinstance(data, (dict, list)):
+        data = BaseObject._load(data)
+
+    # Objects are created up-front, and populated as the stack is unwound. Each entry
+    # in the stack holds the instance variables of the object, its description, and
+    # the data it is to be populated with.
+    new = object.__new__
+    roots = [new(cls) for _ in data] if isinstance(data, list) else [new(cls)]
+    stack: List[Tuple[Dict[str, Any], _Spec, Dict[str, Any]]] = [
+        (obj.__dict__, specs[cls], item)
+        for obj, item in zip(roots, data if isinstance(data, list) else [data])
+    ]
+
+    while stack:
+        fields, spec, source = stack.pop()
+
+        if not isinstance(source, dict):
+            raise TypeError(f"Expected an object for `{spec.cls.__name__}`")
+
+        fields.update(spec.defaults)
+        for key in spec.lists:
+            fields[key] = []
+
+        nested = spec.nested
+        for key, value in source.items():
+            # Skipping fields that are not a part of the object, and `null` values -
+            # these are left at their default value.
+            if value is None or key not in fields:
+                continue
+
+            rule = nested.get(key, None)
+            if rule is None:
+                fields[key] = value
+                continue
+
+            kind, target = rule
+            if kind == _ENUM:
+                try:
+                    fields[key] = target[value]
+                except KeyError:
+                    raise ValueError(
+                        f"Attempt to map value `{value}` for the field `{key}`"
+                    ) from None
+            elif kind == _OBJECT:
+                child = new(target)
+                fields[key] = child
+                stack.append((child.__dict__, specs[target], value))
+            else:
+                child_spec = specs[target]
+                children = []
+                for item in value:
+                    child = new(target)
+                    children.append(child)
+                    stack.append((child.__dict__, child_spec, item))
+
+                fields[key] = children
+
+        if spec.normalize is not None:
+            spec.normalize(fields)
+
+    return roots if isinstance(data, list) else roots[0]
+
+
+def decode_page(
+    data: RawData, cls: Type[BaseObject] = MediaData, field: str = "media"
+) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    Build the objects present in the response of a `Page` query.
+
+    Args:
+        data: The complete response of the query, raw JSON or the parsed data.
+        cls: The class of the objects present in the page.
+        field: Name of the field in the page containing the objects.
+
+    Returns:
+        Tuple containing the list of objects, and the page info (an empty dictionary
+        if the page info was not requested).
+    """
+
+    page = BaseObject._load(data)["data"]["Page"]
+
+    return decode(page.get(field, None) or [], cls), page.get("pageInfo", None) or {}
@@ -139,6 +139,11 @@ class MediaSort(BaseEnum):
     def stringify(self) -> None:
         raise NotImplementedError("Attempt to stringify an API parameter")
 
+    @property
+    def translate(self) -> str:
+        # The API spells romaji without the `n`.
+        return str(self.name).replace("ROMANJI", "ROMAJI")
+
 
 class MediaType(BaseEnum):
     """
@@ -1,10 +1,25 @@
 from __future__ import annotations
 
-from json import loads as json_load
-from typing import Union, Dict, Any, Optional
+from typing import Any, Optional, List
 
-from . import MediaType, MediaTitle, MediaFormat
-from ..client import BaseObject
+from . import (
+    AiringSchedule,
+    FuzzyDate,
+    MediaExternalLink,
+    MediaFormat,
+    MediaPoster,
+    MediaRank,
+    MediaSeason,
+    MediaSource,
+    MediaStats,
+    MediaStatus,
+    MediaStreamingEpisode,
+    MediaTag,
+    MediaTitle,
+    MediaTrailer,
+    MediaType,
+)
+from ..client import BaseObject, RawData
 
 
 class MediaData(BaseObject):
@@ -15,18 +30,233 @@ class MediaData(BaseObject):
         title: Optional[MediaTitle] = None,
         media_type: Optional[MediaType] = None,
         media_format: Optional[MediaFormat] = None,
+        status: Optional[MediaStatus] = None,
+        description: Optional[str] = None,
+        start_date: Optional[FuzzyDate] = None,
+        end_date: Optional[FuzzyDate] = None,
+        season: Optional[MediaSeason] = None,
+        season_year: Optional[int] = None,
+        episodes: Optional[int] = None,
+        duration: Optional[int] = None,
+        chapters: Optional[int] = None,
+        volumes: Optional[int] = None,
+        country_origin: Optional[str] = None,
+        source: Optional[MediaSource] = None,
+        trailer: Optional[MediaTrailer] = None,
+        updated_at: Optional[int] = None,
+        cover_image: Optional[MediaPoster] = None,
+        banner_image: Optional[str] = None,
+        genres: Optional[List[str]] = None,
+        synonyms: Optional[List[str]] = None,
+        average_score: Optional[int] = None,
+        mean_score: Optional[int] = None,
+        popularity: Optional[int] = None,
+        favourites: Optional[int] = None,
+        trending: Optional[int] = None,
+        tags: Optional[List[MediaTag]] = None,
+        next_airing: Optional[AiringSchedule] = None,
+        external_links: Optional[List[MediaExternalLink]] = None,
+        streaming_episodes: Optional[List[MediaStreamingEpisode]] = None,
+        rankings: Optional[List[MediaRank]] = None,
+        stats: Optional[MediaStats] = None,
+        is_adult: Optional[bool] = None,
+        site_url: Optional[str] = None,
     ):
+        """
+        Anime or Manga, the central object of the API. Every other media object is
+        attached to an instance of this class.
 
-        pass
+        Notes:
+            Apart from the id, every field is optional - the API only returns the
+            fields that were requested in the query, the remaining fields will be
+            `None`.
 
-    @staticmethod
-    def initialize(data: Union[str, Dict[Any, Any]]) -> Any:
-        if not isinstance(data, (str, dict)):
+        Args:
+            media_id: The id of the media.
+            mal_id: The MyAnimeList id of the media.
+            title: The official titles of the media in various languages.
+            media_type: The type of the media; anime or manga.
+            media_format: The format the media was released in.
+            status: The current releasing status of the media.
+            description: Short description of the media's story and characters.
+            start_date: The first official release date of the media.
+            end_date: The last official release date of the media.
+            season: The season the media was initially released in.
+            season_year: The season year the media was initially released in.
+            episodes: The amount of episodes the anime has when complete.
+            duration: The general length of each anime episode in minutes.
+            chapters: The amount of chapters the manga has when complete.
+            volumes: The amount of volumes the manga has when complete.
+            country_origin: Where the media was created. (ISO 3166-1 alpha-2)
+            source: Source type the media was adapted from.
+            trailer: Media trailer or advertisement.
+            updated_at: When the media's data was last updated - Unix timestamp.
+            cover_image: The cover images of the media.
+            banner_image: The banner image of the media.
+            genres: The genres of the media.
+            synonyms: Alternative titles of the media.
+            average_score: A weighted average score of all the user's scores.
+            mean_score: Mean score of all the user's scores.
+            popularity: The number of users with the media on their list.
+            favourites: The amount of user's who have favourited the media.
+            trending: The amount of related activity in the past hour.
+            tags: List of tags that describes elements and themes of the media.
+            next_airing: The media's next episode airing schedule.
+            external_links: External links to another site related to the media.
+            streaming_episodes: Data and links to legal streaming episodes.
+            rankings: The ranking of the media in a particular time span and format.
+            stats: Statistics about the media.
+            is_adult: If the media is intended only for 18+ adult audiences.
+            site_url: The url for the media page on the AniList website.
+        """
+
+        # Type-check
+        if (
+            not isinstance(media_id, int)
+            or not all(
+                x is None or isinstance(x, int)
+                for x in (
+                    mal_id,
+                    season_year,
+                    episodes,
+                    duration,
+                    chapters,
+                    volumes,
+                    updated_at,
+                    average_score,
+                    mean_score,
+                    popularity,
+                    favourites,
+                    trending,
+                )
+            )
+            or not all(
+                x is None or isinstance(x, str)
+                for x in (description, country_origin, banner_image, site_url)
+            )
+            or not all(
+                x is None or isinstance(x, kind)
+                for x, kind in (
+                    (title, MediaTitle),
+                    (media_type, MediaType),
+                    (media_format, MediaFormat),
+                    (status, MediaStatus),
+                    (start_date, FuzzyDate),
+                    (end_date, FuzzyDate),
+                    (season, MediaSeason),
+                    (source, MediaSource),
+                    (trailer, MediaTrailer),
+                    (cover_image, MediaPoster),
+                    (next_airing, AiringSchedule),
+                    (stats, MediaStats),
+                    (is_adult, bool),
+                )
+            )
+            or not all(
+                x is None or isinstance(x, list)
+                for x in (
+                    genres,
+                    synonyms,
+                    tags,
+                    external_links,
+                    streaming_episodes,
+                    rankings,
+                )
+            )
+        ):
             raise TypeError
 
-        if isinstance(data, str):
-            final_data = json_load(data)
-        else:
-            final_data = data
+        # Instance variables are named after the fields in the API - ensuring that the
+        # result of `stringify` can be fed back into `initialize`.
+        self.id = media_id
+        self.idMal = mal_id
+        self.title = title
+        self.type = media_type
+        self.format = media_format
+        self.status = status
+        self.description = description
+        self.startDate = start_date
+        self.endDate = end_date
+        self.season = season
+        self.seasonYear = season_year
+        self.episodes = episodes
+        self.duration = duration
+        self.chapters = chapters
+        self.volumes = volumes
+        self.countryOfOrigin = country_origin
+        self.source = source
+        self.trailer = trailer
+        self.updatedAt = updated_at
+        self.coverImage = cover_image
+        self.bannerImage = banner_image
+        self.genres = genres
+        self.synonyms = synonyms
+        self.averageScore = average_score
+        self.meanScore = mean_score
+        self.popularity = popularity
+        self.favourites = favourites
+        self.trending = trending
+        self.tags = tags
+        self.nextAiringEpisode = next_airing
+        self.externalLinks = external_links
+        self.streamingEpisodes = streaming_episodes
+        self.rankings = rankings
+        self.stats = stats
+        self.isAdult = is_adult
+        self.siteUrl = site_url
+
+    @staticmethod
+    def initialize(data: RawData) -> MediaData:
+        final_data = BaseObject._load(data)
+
+        def _optional(key: str, method: Any) -> Any:
+            # Nested objects are only present if they were requested in the query.
+            value = final_data.get(key, None)
+            return None if value is None else method(value)
+
+        def _optional_list(key: str, method: Any) -> Any:
+            value = final_data.get(key, None)
+            return None if value is None else [method(x) for x in value]
 
-        return MediaData(final_data.get("param", None))
+        return MediaData(
+            media_id=final_data["id"],
+            mal_id=final_data.get("idMal", None),
+            title=_optional("title", MediaTitle.initialize),
+            media_type=_optional("type", lambda x: MediaType.map(MediaType, x)),
+            media_format=_optional("format", lambda x: MediaFormat.map(MediaFormat, x)),
+            status=_optional("status", lambda x: MediaStatus.map(MediaStatus, x)),
+            description=final_data.get("description", None),
+            start_date=_optional("startDate", FuzzyDate.initialize),
+            end_date=_optional("endDate", FuzzyDate.initialize),
+            season=_optional("season", lambda x: MediaSeason.map(MediaSeason, x)),
+            season_year=final_data.get("seasonYear", None),
+            episodes=final_data.get("episodes", None),
+            duration=final_data.get("duration", None),
+            chapters=final_data.get("chapters", None),
+            volumes=final_data.get("volumes", None),
+            country_origin=final_data.get("countryOfOrigin", None),
+            source=_optional("source", lambda x: MediaSource.map(MediaSource, x)),
+            trailer=_optional("trailer", MediaTrailer.initialize),
+            updated_at=final_data.get("updatedAt", None),
+            cover_image=_optional("coverImage", MediaPoster.initialize),
+            banner_image=final_data.get("bannerImage", None),
+            genres=final_data.get("genres", None),
+            synonyms=final_data.get("synonyms", None),
+            average_score=final_data.get("averageScore", None),
+            mean_score=final_data.get("meanScore", None),
+            popularity=final_data.get("popularity", None),
+            favourites=final_data.get("favourites", None),
+            trending=final_data.get("trending", None),
+            tags=_optional_list("tags", MediaTag.initialize),
+            next_airing=_optional("nextAiringEpisode", AiringSchedule.initialize),
+            external_links=_optional_list(
+                "externalLinks", MediaExternalLink.initialize
+            ),
+            streaming_episodes=_optional_list(
+                "streamingEpisodes", MediaStreamingEpisode.initialize
+            ),
+            rankings=_optional_list("rankings", MediaRank.initialize),
+            stats=_optional("stats", MediaStats.initialize),
+            is_adult=final_data.get("isAdult", None),
+            site_url=final_data.get("siteUrl", None),
+        )
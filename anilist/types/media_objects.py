@@ -9,8 +9,7 @@ handled and used.
 
 from __future__ import annotations
 
-from json import loads as json_load
-from typing import Union, Dict, List, Any, Optional
+from typing import List, Any, Optional
 
 from . import (
     ScoreDistribution,
@@ -19,10 +18,10 @@ from . import (
     MediaFormat,
     MediaSeason,
 )
-from ..client import BaseObject
+from ..client import BaseObject, RawData, ValueObject
 
 
-class MediaTitle(BaseObject):
+class MediaTitle(ValueObject):
     def __init__(self, romaji: str, english: str, native: str, user_preferred: str):
         """
         The official titles of the media in various languages.
@@ -49,15 +48,8 @@ class MediaTitle(BaseObject):
         self.userPreferred = user_preferred
 
     @staticmethod
-    def initialize(data: Union[str, Dict[Any, Any]]) -> MediaTitle:
-        if not isinstance(data, (str, dict)):
-            # Type-check
-            raise TypeError
-
-        if isinstance(data, str):
-            final_data = json_load(data)
-        else:
-            final_data = data
+    def initialize(data: RawData) -> MediaTitle:
+        final_data = BaseObject._load(data)
 
         return MediaTitle(
             romaji=final_data["romaji"],
@@ -67,7 +59,7 @@ class MediaTitle(BaseObject):
         )
 
 
-class MediaTrailer(BaseObject):
+class MediaTrailer(ValueObject):
     def __init__(self, trailer_id: str, site: str, thumbnail: str):
         """
         Media trailer, or advertisement
@@ -86,14 +78,8 @@ class MediaTrailer(BaseObject):
         self.thumbnail = thumbnail
 
     @staticmethod
-    def initialize(data: Union[str, Dict[Any, Any]]) -> MediaTrailer:
-        if not isinstance(data, (str, dict)):
-            raise TypeError
-
-        if isinstance(data, str):
-            final_data = json_load(data)
-        else:
-            final_data = data
+    def initialize(data: RawData) -> MediaTrailer:
+        final_data = BaseObject._load(data)
 
         return MediaTrailer(
             trailer_id=final_data["id"],
@@ -102,7 +88,7 @@ class MediaTrailer(BaseObject):
         )
 
 
-class MediaPoster(BaseObject):
+class MediaPoster(ValueObject):
     def __init__(
         self, large: str, medium: str, color: str, extra_large: Optional[str] = None
     ):
@@ -130,14 +116,8 @@ class MediaPoster(BaseObject):
         self.color = color
 
     @staticmethod
-    def initialize(data: Union[str, Dict[Any, Any]]) -> Any:
-        if not isinstance(data, (str, dict)):
-            raise TypeError
-
-        if isinstance(data, str):
-            final_data = json_load(data)
-        else:
-            final_data = data
+    def initialize(data: RawData) -> Any:
+        final_data = BaseObject._load(data)
 
         return MediaPoster(
             extra_large=final_data.get("extraLarge", None),
@@ -147,7 +127,7 @@ class MediaPoster(BaseObject):
         )
 
 
-class MediaTag(BaseObject):
+class MediaTag(ValueObject):
     def __init__(
         self,
         media_id: int,
@@ -193,14 +173,8 @@ class MediaTag(BaseObject):
         self.isAdult = adult
 
     @staticmethod
-    def initialize(data: Union[str, Dict[Any, Any]]) -> MediaTag:
-        if not isinstance(data, (str, dict)):
-            raise TypeError
-
-        if isinstance(data, str):
-            final_data = json_load(data)
-        else:
-            final_data = data
+    def initialize(data: RawData) -> MediaTag:
+        final_data = BaseObject._load(data)
 
         return MediaTag(
             media_id=final_data["id"],
@@ -214,7 +188,7 @@ class MediaTag(BaseObject):
         )
 
 
-class MediaExternalLink(BaseObject):
+class MediaExternalLink(ValueObject):
     def __init__(self, link_id: int, url: str, site: str):
         """
         External link to another site related to the media.
@@ -236,21 +210,15 @@ class MediaExternalLink(BaseObject):
         self.site = site
 
     @staticmethod
-    def initialize(data: Union[str, Dict[Any, Any]]) -> MediaExternalLink:
-        if not isinstance(data, (str, dict)):
-            raise TypeError
-
-        if isinstance(data, str):
-            final_data = json_load(data)
-        else:
-            final_data = data
+    def initialize(data: RawData) -> MediaExternalLink:
+        final_data = BaseObject._load(data)
 
         return MediaExternalLink(
             link_id=final_data["id"], url=final_data["url"], site=final_data["site"]
         )
 
 
-class MediaStreamingEpisode(BaseObject):
+class MediaStreamingEpisode(ValueObject):
     def __init__(self, title: str, thumbnail: str, url: str, site: str):
         """
         Data and links to legal streaming episodes on external sites.s
@@ -271,14 +239,8 @@ class MediaStreamingEpisode(BaseObject):
         self.site = site
 
     @staticmethod
-    def initialize(data: Union[str, Dict[Any, Any]]) -> MediaStreamingEpisode:
-        if not isinstance(data, (str, dict)):
-            raise TypeError
-
-        if isinstance(data, str):
-            final_data = json_load(data)
-        else:
-            final_data = data
+    def initialize(data: RawData) -> MediaStreamingEpisode:
+        final_data = BaseObject._load(data)
 
         return MediaStreamingEpisode(
             title=final_data["title"],
@@ -288,7 +250,7 @@ class MediaStreamingEpisode(BaseObject):
         )
 
 
-class MediaRank(BaseObject):
+class MediaRank(ValueObject):
     def __init__(
         self,
         rank_id: int,
@@ -335,14 +297,8 @@ class MediaRank(BaseObject):
         self.context = context
 
     @staticmethod
-    def initialize(data: Union[str, Dict[Any, Any]]) -> MediaRank:
-        if not isinstance(data, (str, dict)):
-            raise TypeError
-
-        if isinstance(data, str):
-            final_data = json_load(data)
-        else:
-            final_data = data
+    def initialize(data: RawData) -> MediaRank:
+        final_data = BaseObject._load(data)
 
         return MediaRank(
             rank_id=final_data["id"],
@@ -379,14 +335,8 @@ class MediaStats(BaseObject):
         self.statusDistribution = status_distribution
 
     @staticmethod
-    def initialize(data: Union[str, Dict[Any, Any]]) -> Any:
-        if not isinstance(data, (str, dict)):
-            raise TypeError
-
-        if isinstance(data, str):
-            final_data = json_load(data)
-        else:
-            final_data = data
+    def initialize(data: RawData) -> Any:
+        final_data = BaseObject._load(data)
 
         return MediaStats(
             score_distribution=[
@@ -1,14 +1,16 @@
 # Defines objects that can't really be grouped on the basis of similarities.
 from __future__ import annotations
 
-from json import loads as json_load
-from typing import Union, Dict, Any, Optional
+from array import array
+from bisect import bisect_left, bisect_right
+from sys import maxsize
+from typing import Union, Any, Optional, Iterable, List, Sequence
 
 from . import MediaListStatus
-from ..client.base_object import BaseObject
+from ..client.base_object import BaseObject, RawData, ValueObject
 
 
-class FuzzyDate(BaseObject):
+class FuzzyDate(ValueObject):
     def __init__(
         self,
         day: int = 0,
@@ -34,23 +36,75 @@ class FuzzyDate(BaseObject):
 
         self.day = day
         self.month = month
-        self.year = year if year > 100 or year == 0 else 2000 + year
+        self.year = FuzzyDate.full_year(year)
 
     @staticmethod
-    def initialize(data: Union[str, Dict[Any, Any]]) -> FuzzyDate:
-        if not isinstance(data, (dict, str)):
-            raise TypeError
+    def full_year(year: int) -> int:
+        """
+        Map a two digit year to a year between 2000 - 2100, used for every date.
+
+        Args:
+            year: Integer containing the year, zero if unknown.
+
+        Returns:
+            Integer containing the full year.
+        """
 
-        # Convert string into JSON-parsable dictionary.
-        if isinstance(data, str):
-            final_data = json_load(data)
-        else:
-            final_data = data
+        return year if year > 100 or year == 0 else 2000 + year
 
+    @staticmethod
+    def initialize(data: RawData) -> FuzzyDate:
+        final_data = BaseObject._load(data)
+
+        # The API returns `null` for unknown components, mapping them to zero.
         return FuzzyDate(
-            day=final_data["day"], month=final_data["month"], year=final_data["year"]
+            day=final_data["day"] or 0,
+            month=final_data["month"] or 0,
+            year=final_data["year"] or 0,
         )
 
+    @staticmethod
+    def from_packed(packed: int) -> FuzzyDate:
+        """
+        Create a date from its packed representation.
+
+        Notes:
+            Fast-path, the packed integer is split directly into its components, and
+            the constructor is skipped.
+
+        Args:
+            packed: Integer containing the date in `YYYYMMDD` format.
+
+        Returns:
+            FuzzyDate representing the packed integer.
+        """
+
+        if not isinstance(packed, int) or isinstance(packed, bool):
+            raise TypeError
+
+        if packed < 0:
+            raise ValueError
+
+        date = FuzzyDate.__new__(FuzzyDate)
+        year, rest = divmod(packed, 10000)
+        month, day = divmod(rest, 100)
+        date.__dict__.update(day=day, month=month, year=year)
+
+        return date
+
+    @property
+    def packed(self) -> int:
+        """
+        Packs the date into a single integer, the same representation used by the API
+        for the `FuzzyDateInt` type.
+
+        Returns:
+            Integer containing the date in `YYYYMMDD` format. Unknown components are
+            zero.
+        """
+
+        return self.year * 10000 + self.month * 100 + self.day
+
     @property
     def fuzz(self) -> str:
         """
@@ -61,10 +115,34 @@ class FuzzyDate(BaseObject):
             String containing the date represented by this object in `YYYYMMDD` format.
         """
 
-        return (
-            f"{str(self.year).zfill(4)}{str(self.month).zfill(2)}"
-            f"{str(self.day).zfill(2)}"
-        )
+        return f"{self.packed:08d}"
+
+    # Dates are ordered by their packed value, the same way the API compares them - an
+    # unknown component is zero, making a partial date such as `2020-??-??` fall before
+    # every complete date in the same year.
+    def __lt__(self, other: Any) -> bool:
+        if not isinstance(other, FuzzyDate):
+            return NotImplemented
+
+        return self.packed < other.packed
+
+    def __le__(self, other: Any) -> bool:
+        if not isinstance(other, FuzzyDate):
+            return NotImplemented
+
+        return self.packed <= other.packed
+
+    def __gt__(self, other: Any) -> bool:
+        if not isinstance(other, FuzzyDate):
+            return NotImplemented
+
+        return self.packed > other.packed
+
+    def __ge__(self, other: Any) -> bool:
+        if not isinstance(other, FuzzyDate):
+            return NotImplemented
+
+        return self.packed >= other.packed
 
 
 class AiringSchedule(BaseObject):
@@ -104,17 +182,11 @@ class AiringSchedule(BaseObject):
         self.media = media
 
     @staticmethod
-    def initialize(data: Union[str, Dict[Any, Any]]) -> AiringSchedule:
-        if not isinstance(data, (str, dict)):
-            raise TypeError
-
+    def initialize(data: RawData) -> AiringSchedule:
         # Internal import to avoid circular dependency.
         from . import MediaData
 
-        if isinstance(data, str):
-            final_data = json_load(data)
-        else:
-            final_data = data
+        final_data = BaseObject._load(data)
 
         return AiringSchedule(
             airing_id=final_data["id"],
@@ -122,11 +194,15 @@ class AiringSchedule(BaseObject):
             time_left=final_data["timeUntilAiring"],
             episode=final_data["episode"],
             media_id=final_data["mediaId"],
-            media=MediaData.initialize(final_data["media"]),
+            media=(
+                None
+                if final_data.get("media", None) is None
+                else MediaData.initialize(final_data["media"])
+            ),
         )
 
 
-class ScoreDistribution(BaseObject):
+class ScoreDistribution(ValueObject):
     def __init__(self, score: int, amount: int):
         """
 
@@ -144,19 +220,13 @@ class ScoreDistribution(BaseObject):
         self.amount = amount
 
     @staticmethod
-    def initialize(data: Union[str, Dict[Any, Any]]) -> Any:
-        if not isinstance(data, (dict, str)):
-            raise TypeError
-
-        if isinstance(data, str):
-            final_data = json_load(data)
-        else:
-            final_data = data
+    def initialize(data: RawData) -> Any:
+        final_data = BaseObject._load(data)
 
         return ScoreDistribution(score=final_data["score"], amount=final_data["amount"])
 
 
-class StatusDistribution(BaseObject):
+class StatusDistribution(ValueObject):
     def __init__(self, media_status: MediaListStatus, amount: int):
         """
         Distribution of the watching/reading status of media or a users list.
@@ -177,16 +247,106 @@ class StatusDistribution(BaseObject):
         self.amount = amount
 
     @staticmethod
-    def initialize(data: Union[str, Dict[Any, Any]]) -> Any:
-        if not isinstance(data, (str, dict)):
-            raise TypeError
-
-        if isinstance(data, str):
-            final_data = json_load(data)
-        else:
-            final_data = data
+    def initialize(data: RawData) -> Any:
+        final_data = BaseObject._load(data)
 
         return StatusDistribution(
             media_status=MediaListStatus.map(MediaListStatus, final_data["status"]),
             amount=final_data["amount"],
         )
+
+
+def _bound(date: Union[FuzzyDate, int, None], default: int) -> int:
+    # Maps a range boundary to its packed value.
+    if date is None:
+        return default
+    elif isinstance(date, FuzzyDate):
+        return date.packed
+    elif isinstance(date, int) and not isinstance(date, bool):
+        return date
+
+    raise TypeError
+
+
+def pack_dates(dates: Iterable[Optional[FuzzyDate]]) -> "array[int]":
+    """
+    Pack a sequence of dates into a compact array of integers.
+
+    Args:
+        dates: Iterable containing the dates, a missing date is allowed to be `None`.
+
+    Returns:
+        Array containing the packed value of every date, missing dates are zero.
+    """
+
+    return array("q", (0 if x is None else x.packed for x in dates))
+
+
+def filter_dates(
+    packed: Sequence[int],
+    greater: Union[FuzzyDate, int, None] = None,
+    lesser: Union[FuzzyDate, int, None] = None,
+) -> List[int]:
+    """
+    Filter packed dates using the same semantics as the `startDate_greater` and
+    `startDate_lesser` (or `endDate_*`) arguments of a media query.
+
+    Notes:
+        Both boundaries are exclusive. Unknown dates (zero) never match.
+
+    Args:
+        packed: Sequence of packed dates, as returned by `pack_dates`.
+        greater: Only dates after this date are selected.
+        lesser: Only dates before this date are selected.
+
+    Returns:
+        List containing the position of every matching date.
+    """
+
+    low = _bound(greater, 0)
+    high = _bound(lesser, maxsize)
+
+    # Integer comparisons only, no object is created for any date.
+    return [index for index, date in enumerate(packed) if low < date < high]
+
+
+class DateRangeIndex:
+    def __init__(self, packed: Iterable[int]):
+        """
+        Sorted index over packed dates, answers range queries through a binary search
+        as opposed to scanning all the dates.
+
+        Args:
+            packed: Iterable containing the packed dates, the position of a date in
+            this iterable is returned by the range queries.
+        """
+
+        pairs = sorted((date, index) for index, date in enumerate(packed) if date)
+
+        self._dates = array("q", (date for date, _ in pairs))
+        self._positions = array("q", (index for _, index in pairs))
+
+    def __len__(self) -> int:
+        return len(self._dates)
+
+    def range(
+        self,
+        greater: Union[FuzzyDate, int, None] = None,
+        lesser: Union[FuzzyDate, int, None] = None,
+    ) -> List[int]:
+        """
+        Fetch all dates within the (exclusive) range.
+
+        Args:
+            greater: Only dates after this date are selected.
+            lesser: Only dates before this date are selected.
+
+        Returns:
+            List containing the position of every matching date, in chronological
+            order.
+        """
+
+        start = bisect_right(self._dates, _bound(greater, 0))
+        end = bisect_left(self._dates, _bound(lesser, maxsize))
+
+        return self._positions[start:end].tolist()
@@ -2,14 +2,10 @@
 
 from __future__ import annotations
 
-from json import loads as json_load
-from typing import Any
-from typing import Dict, Union
+from ..client import BaseObject, RawData, ValueObject
 
-from ..client import BaseObject
 
-
-class UserAvatar(BaseObject):
+class UserAvatar(ValueObject):
     def __init__(self, large_avatar: str, medium_avatar: str):
         """
         Container to hold url to a users profile picture.
@@ -31,15 +27,8 @@ class UserAvatar(BaseObject):
         self.medium = medium_avatar
 
     @staticmethod
-    def initialize(data: Union[str, Dict[Any, Any]]) -> UserAvatar:
-        if not isinstance(data, (dict, str)):
-            raise TypeError
-
-        if isinstance(data, str):
-            # Can result in JSONDecode error if the string does not contain valid JSON
-            final_data: Dict[Any, Any] = json_load(data)
-        else:
-            final_data = data
+    def initialize(data: RawData) -> UserAvatar:
+        final_data = BaseObject._load(data)
 
         return UserAvatar(
             large_avatar=final_data["large"], medium_avatar=final_data["medium"]
@@ -0,0 +1,59 @@
+# Compares the JSON backends supported by the codec.
+#
+# Usage:
+#   python -m benchmarks.bench_codec [response.json ...]
+#
+# Responses recorded from the API can be passed in as arguments, a generated page of
+# media is used otherwise.
+
+import sys
+from timeit import repeat
+from typing import List, Tuple
+
+from anilist.client import codec
+from anilist.types import MediaData
+
+from .payloads import page
+
+
+def _payloads(paths: List[str]) -> List[Tuple[str, bytes]]:
+    if not paths:
+        return [("generated page (50 media)", codec.dumps(page(50)).encode("utf-8"))]
+
+    result = []
+    for path in paths:
+        with open(path, "rb") as file:
+            result.append((path, file.read()))
+
+    return result
+
+
+def _decode(raw: bytes) -> List[MediaData]:
+    # Parsing the response, and creating the objects out of it.
+    data = codec.loads(raw).get("data", {}).get("Page", {})
+    return [MediaData.initialize(x) for x in data.get("media", [])]
+
+
+def main(paths: List[str], number: int = 20) -> None:
+    original = codec.backend()
+
+    for label, raw in _payloads(paths):
+        print(f"{label}: {len(raw)} bytes")
+
+        for name in codec.available():
+            codec.use(name)
+            parsed = codec.loads(raw)
+
+            for step, statement in (
+                ("loads", lambda: codec.loads(raw)),
+                ("dumps", lambda: codec.dumps(parsed)),
+                ("decode", lambda: _decode(raw)),
+            ):
+                best = min(repeat(statement, number=number, repeat=5)) / number
+                print(f"{name:>8} {step:>11}: {best * 1000:8.3f} ms")
+
+    codec.use(original)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
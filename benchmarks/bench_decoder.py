@@ -0,0 +1,26 @@
+# Compares building a page of media through `initialize` against the table-driven
+# decoder.
+
+from timeit import repeat
+
+from anilist.client import codec
+from anilist.types import MediaData, decode
+
+from .payloads import page
+
+
+def main(number: int = 5) -> None:
+    for size in (50, 1000):
+        media = codec.loads(codec.dumps(page(size)))["data"]["Page"]["media"]
+        print(f"Page of {size} media:")
+
+        for name, statement in (
+            ("initialize", lambda: [MediaData.initialize(x) for x in media]),
+            ("decode", lambda: decode(media, MediaData)),
+        ):
+            best = min(repeat(statement, number=number, repeat=5)) / number
+            print(f"{name:>12}: {best * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
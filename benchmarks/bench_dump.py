@@ -0,0 +1,57 @@
+# Compares building the JSON for a large collection of media in memory against writing
+# it out incrementally - peak memory, along with the time taken.
+#
+# Usage:
+#   python -m benchmarks.bench_dump [number of media]
+
+import io
+import sys
+import tracemalloc
+from time import perf_counter
+from typing import Any, Callable, List, Tuple
+
+from anilist.client import codec
+from anilist.client.base_object import _encode
+from anilist.types import MediaData
+
+from .payloads import page
+
+
+class _Sink(io.RawIOBase):
+    # Discards everything written to it, only the encoder is measured.
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        return len(data)
+
+
+def _measure(statement: Callable[[], Any]) -> Tuple[float, int]:
+    tracemalloc.start()
+    start = perf_counter()
+    statement()
+    elapsed = perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def main(size: int = 5000) -> None:
+    media: List[MediaData] = []
+    for start in range(1, size + 1, 50):
+        raw = page(min(50, size - start + 1), seed=start, start=start)
+        media.extend(MediaData.initialize(x) for x in raw["data"]["Page"]["media"])
+
+    print(f"Collection of {len(media)} media")
+
+    for name, statement in (
+        ("dumps", lambda: _Sink().write(codec.dumps(media, 4, True, _encode))),
+        ("dump", lambda: codec.dump(media, _Sink(), 4, True, _encode)),
+    ):
+        elapsed, peak = _measure(statement)
+        print(f"{name:>6}: {elapsed * 1000:9.1f} ms, peak {peak / 2 ** 20:8.2f} MiB")
+
+
+if __name__ == "__main__":
+    main(*(int(x) for x in sys.argv[1:]))
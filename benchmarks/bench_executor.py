@@ -0,0 +1,62 @@
+# Measures how long the event loop is blocked while pages are decoded, for every mode
+# of the decode executor.
+#
+# A ticker sleeping for 1 ms runs alongside the decoding - the worst delay in waking it
+# up is the longest the loop was blocked for.
+
+import asyncio
+from time import perf_counter
+
+from anilist.client import codec
+from anilist.client.anilist_client import _process
+from anilist.client.executor import DecodeExecutor
+from anilist.types import decode_page
+
+from .payloads import page
+
+
+async def _ticker(stop: asyncio.Event) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        start = perf_counter()
+        await asyncio.sleep(0.001)
+        worst = max(worst, perf_counter() - start - 0.001)
+
+    return worst
+
+
+async def _measure(executor: DecodeExecutor, body: bytes, count: int) -> tuple:
+    stop = asyncio.Event()
+    ticker = asyncio.ensure_future(_ticker(stop))
+
+    start = perf_counter()
+    await asyncio.gather(
+        *(executor.run(_process, body, 200, decode_page) for _ in range(count))
+    )
+    elapsed = perf_counter() - start
+
+    stop.set()
+    return elapsed, await ticker
+
+
+def main(count: int = 8) -> None:
+    for size in (50, 500):
+        body = codec.dumps(page(size)).encode("utf-8")
+        print(f"Page of {size} media ({len(body)} bytes), {count} responses:")
+
+        for mode in ("inline", "thread", "process"):
+            executor = DecodeExecutor(mode, threshold=0)
+            # Warming up the pool, creating the workers is not a part of the test.
+            asyncio.run(_measure(executor, body, 1))
+
+            elapsed, lag = asyncio.run(_measure(executor, body, count))
+            executor.shutdown()
+
+            print(
+                f"{mode:>8}: {elapsed * 1000:8.2f} ms total, "
+                f"{lag * 1000:8.2f} ms worst loop lag"
+            )
+
+
+if __name__ == "__main__":
+    main()
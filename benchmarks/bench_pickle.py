@@ -0,0 +1,28 @@
+# Measures the cost of pickling a page of media, used while shipping decoded objects
+# between processes.
+
+import pickle
+from timeit import repeat
+
+from anilist.types import MediaData
+
+from .payloads import page
+
+
+def main(size: int = 50, number: int = 20) -> None:
+    media = [MediaData.initialize(x) for x in page(size)["data"]["Page"]["media"]]
+    blob = pickle.dumps(media, protocol=pickle.HIGHEST_PROTOCOL)
+
+    print(f"Page of {size} media; pickled size: {len(blob)} bytes")
+
+    for name, statement in (
+        ("pickle.dumps", lambda: pickle.dumps(media, pickle.HIGHEST_PROTOCOL)),
+        ("pickle.loads", lambda: pickle.loads(blob)),
+        ("stringify", lambda: [x.stringify(None) for x in media]),
+    ):
+        best = min(repeat(statement, number=number, repeat=5)) / number
+        print(f"{name:>14}: {best * 1000:8.3f} ms per page")
+
+
+if __name__ == "__main__":
+    main()
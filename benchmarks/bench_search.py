@@ -0,0 +1,72 @@
+# Measures the latency of title searches over the catalogue, for autocompletion.
+#
+# Usage:
+#   python -m benchmarks.bench_search [number of media]
+#
+# Titles are built out of random syllables and words - romaji, english and native
+# titles for every media.
+
+import sys
+from random import Random
+from time import perf_counter
+from timeit import repeat
+from typing import List
+
+from anilist.catalogue import TitleIndex
+from anilist.types import MediaData, MediaTitle
+
+_SYLLABLES = [
+    consonant + vowel
+    for consonant in ("", "k", "s", "t", "n", "h", "m", "y", "r", "w", "g", "z", "b")
+    for vowel in "aiueo"
+] + ["shi", "chi", "tsu", "n", "sou", "kyou", "ryuu", "shou"]
+_WORDS = (
+    "the of a in to and love sword academy world hero night blue red dragon king "
+    "queen demon girl boy school magic story tale war sky sea star moon sun dream "
+    "life death game online lord black white knight princess prince legend secret "
+    "garden city tower island journey return rebirth another summer winter spring "
+    "autumn heart soul spirit ghost angel devil beast hunter slayer witch wizard "
+    "kingdom empire chronicles saga days time memory promise song dance last first"
+).split()
+_KANA = "アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワン"
+
+
+def _media(count: int, seed: int = 0) -> List[MediaData]:
+    rng = Random(seed)
+    result = []
+
+    for media_id in range(1, count + 1):
+        romaji = " ".join(
+            "".join(rng.choices(_SYLLABLES, k=rng.randint(1, 4)))
+            for _ in range(rng.randint(1, 4))
+        )
+        english = " ".join(rng.choices(_WORDS, k=rng.randint(1, 5)))
+        native = "".join(rng.choices(_KANA, k=rng.randint(2, 8)))
+
+        title = MediaTitle(romaji, english, native, romaji)
+        result.append(MediaData(media_id, title=title))
+
+    return result
+
+
+def main(size: int = 20000, number: int = 200) -> None:
+    media = _media(size)
+
+    start = perf_counter()
+    index = TitleIndex(media)
+    print(f"Indexed {size} media in {perf_counter() - start:.2f} s")
+
+    sample = media[size // 2].title
+    for label, text in (
+        ("prefix", sample.romaji[:4]),
+        ("word", sample.english.split()[-1][:3]),
+        ("typo", sample.romaji[:2] + "x" + sample.romaji[3:8]),
+        ("native", sample.native[:2]),
+        ("single", "k"),
+    ):
+        best = min(repeat(lambda: index.search(text), number=number, repeat=5))
+        print(f"{label:>8} {text!r:>14}: {best / number * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main(*(int(x) for x in sys.argv[1:]))
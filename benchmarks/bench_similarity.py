@@ -0,0 +1,62 @@
+# Measures "similar media" queries over a large catalogue, with tags spread out the
+# way they are on the site - a few tags are held by a large part of the media, most of
+# them by a handful.
+#
+# Usage:
+#   python -m benchmarks.bench_similarity [number of media] [number of tags]
+
+import sys
+from random import Random
+from time import perf_counter
+
+from anilist.catalogue import MediaCatalogue, TagSimilarity
+from anilist.types import MediaData, MediaTag
+
+
+def _catalogue(size: int, tags: int, rng: Random) -> MediaCatalogue:
+    # Tag `n` is picked with a weight of 1 / n.
+    names = [f"Tag {x}" for x in range(tags)]
+    weights = [1 / (x + 1) for x in range(tags)]
+
+    media = []
+    for media_id in range(1, size + 1):
+        picked = set(rng.choices(names, weights, k=rng.randint(5, 20)))
+        media.append(
+            MediaData(
+                media_id,
+                tags=[
+                    MediaTag(
+                        1, x, "", "Theme", rng.randint(20, 100), False, False, False
+                    )
+                    for x in picked
+                ],
+            )
+        )
+
+    return MediaCatalogue(media)
+
+
+def main(size: int = 20000, tags: int = 400) -> None:
+    rng = Random(0)
+    catalogue = _catalogue(size, tags, rng)
+
+    start = perf_counter()
+    similarity = TagSimilarity(catalogue)
+    print(f"Indexed {len(similarity)} media in {perf_counter() - start:.2f} s")
+
+    seeds = rng.sample(range(1, size + 1), 200)
+    for limit in (10, 50):
+        start = perf_counter()
+        for seed in seeds:
+            similarity.similar(seed, limit)
+        elapsed = (perf_counter() - start) / len(seeds)
+        print(f"  similar, top {limit:>2}: {elapsed * 1000:7.2f} ms per seed")
+
+    start = perf_counter()
+    similarity.similar_many(seeds, 10)
+    elapsed = (perf_counter() - start) / len(seeds)
+    print(f"  similar_many, top 10: {elapsed * 1000:7.2f} ms per seed")
+
+
+if __name__ == "__main__":
+    main(*(int(x) for x in sys.argv[1:]))
@@ -0,0 +1,86 @@
+# Compares starting a worker by building the catalogue out of JSON against mapping a
+# snapshot of it - time to the first lookup, along with the cost of the lookups.
+#
+# Usage:
+#   python -m benchmarks.bench_snapshot [number of media]
+
+import os
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter
+from typing import List
+
+from anilist.catalogue import CatalogueSnapshot, MediaCatalogue, write_snapshot
+from anilist.client import codec
+from anilist.types import MediaData, MediaFormat, decode
+
+from .payloads import page
+
+
+def main(size: int = 20000) -> None:
+    media: List[MediaData] = []
+    for start in range(1, size + 1, 50):
+        raw = page(min(50, size - start + 1), seed=start, start=start)
+        media.extend(MediaData.initialize(x) for x in raw["data"]["Page"]["media"])
+
+    directory = tempfile.mkdtemp()
+    dump = os.path.join(directory, "catalogue.json")
+    snapshot = os.path.join(directory, "catalogue.snapshot")
+
+    with open(dump, "wb") as file:
+        file.write(b"[" + b",".join(x.stringify(None).encode() for x in media) + b"]")
+
+    start = perf_counter()
+    write_snapshot(MediaCatalogue(media), snapshot)
+    print(f"Wrote a snapshot of {size} media in {perf_counter() - start:.2f} s")
+    print(f"  JSON {os.path.getsize(dump) / 2 ** 20:.1f} MiB", end=", ")
+    print(f"snapshot {os.path.getsize(snapshot) / 2 ** 20:.1f} MiB")
+
+    def load() -> MediaCatalogue:
+        with open(dump, "rb") as file:
+            return MediaCatalogue(decode(codec.loads(file.read()), MediaData))
+
+    # Timed first, then measured again for the memory - tracing slows it down.
+    for name, statement in (
+        ("JSON", load),
+        ("snapshot", lambda: CatalogueSnapshot(snapshot)),
+    ):
+        start = perf_counter()
+        source = statement()
+        elapsed = perf_counter() - start
+
+        tracemalloc.start()
+        statement()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(
+            f"  {name:>9}: {elapsed * 1000:9.1f} ms to start, {peak / 2 ** 20:7.1f} MiB"
+        )
+        if name == "JSON":
+            catalogue = source
+        else:
+            mapped = source
+
+    for name, source in (("catalogue", catalogue), ("snapshot", mapped)):
+        start = perf_counter()
+        for x in range(1, 1001):
+            source.get(x)
+        lookup = (perf_counter() - start) / 1000
+
+        start = perf_counter()
+        for _ in range(100):
+            source.ids(media_format=MediaFormat.TV, genre="Action")
+        query = (perf_counter() - start) / 100
+
+        print(f"  {name:>9}: get {lookup * 1e6:6.1f} us, ids {query * 1e6:8.1f} us")
+
+    mapped.close()
+    os.remove(dump)
+    os.remove(snapshot)
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main(*(int(x) for x in sys.argv[1:]))
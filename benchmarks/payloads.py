@@ -0,0 +1,140 @@
+# Generates API-shaped payloads for the benchmarks.
+
+from typing import Any, Dict, List
+
+from random import Random
+
+_GENRES = ["Action", "Comedy", "Drama", "Fantasy", "Romance", "Sci-Fi", "Slice of Life"]
+_TAGS = ["Isekai", "Male Protagonist", "Magic", "School", "Mecha", "Time Skip", "Gore"]
+_SEASONS = ["WINTER", "SPRING", "SUMMER", "FALL"]
+_FORMATS = ["TV", "TV_SHORT", "MOVIE", "OVA", "ONA", "SPECIAL"]
+_STATUSES = ["FINISHED", "RELEASING", "NOT_YET_RELEASED", "HIATUS"]
+_SOURCES = ["ORIGINAL", "MANGA", "LIGHT_NOVEL", "VISUAL_NOVEL", "NOVEL"]
+_LIST_STATUSES = ["CURRENT", "PLANNING", "COMPLETED", "DROPPED", "PAUSED"]
+
+
+def media(media_id: int, rng: Random) -> Dict[str, Any]:
+    """
+    Generate the payload for a single media.
+
+    Args:
+        media_id: Id of the media.
+        rng: Random number generator used to fill in the values.
+
+    Returns:
+        Dictionary with the same structure as a media returned by the API.
+    """
+
+    year = rng.randint(1990, 2021)
+    title = f"Media {media_id}"
+
+    return {
+        "id": media_id,
+        "idMal": media_id + 100000,
+        "title": {
+            "romaji": f"{title} no Romaji",
+            "english": title,
+            "native": f"メディア {media_id}",
+            "userPreferred": f"{title} no Romaji",
+        },
+        "type": "ANIME",
+        "format": rng.choice(_FORMATS),
+        "status": rng.choice(_STATUSES),
+        "description": "Lorem ipsum dolor sit amet. " * rng.randint(5, 20),
+        "startDate": {
+            "day": rng.randint(1, 28),
+            "month": rng.randint(1, 12),
+            "year": year,
+        },
+        "endDate": {"day": 0, "month": 0, "year": 0},
+        "season": rng.choice(_SEASONS),
+        "seasonYear": year,
+        "episodes": rng.randint(1, 52),
+        "duration": 24,
+        "countryOfOrigin": "JP",
+        "source": rng.choice(_SOURCES),
+        "updatedAt": 1600000000 + media_id,
+        "coverImage": {
+            "extraLarge": f"https://img.anili.st/{media_id}/xl.png",
+            "large": f"https://img.anili.st/{media_id}/l.png",
+            "medium": f"https://img.anili.st/{media_id}/m.png",
+            "color": "#e4a15d",
+        },
+        "genres": rng.sample(_GENRES, 3),
+        "synonyms": [f"{title} alt"],
+        "averageScore": rng.randint(30, 95),
+        "meanScore": rng.randint(30, 95),
+        "popularity": rng.randint(100, 500000),
+        "favourites": rng.randint(0, 50000),
+        "trending": rng.randint(0, 500),
+        "tags": [
+            {
+                "id": index,
+                "name": name,
+                "description": f"Description of {name}",
+                "category": "Theme",
+                "rank": rng.randint(1, 100),
+                "isGeneralSpoiler": False,
+                "isMediaSpoiler": rng.random() < 0.1,
+                "isAdult": False,
+            }
+            for index, name in enumerate(rng.sample(_TAGS, 4))
+        ],
+        "rankings": [
+            {
+                "id": media_id * 10 + index,
+                "rank": rng.randint(1, 1000),
+                "type": rank_type,
+                "format": "TV",
+                "year": year,
+                "season": rng.choice(_SEASONS),
+                "allTime": False,
+                "context": f"most {rank_type.lower()} {year}",
+            }
+            for index, rank_type in enumerate(("RATED", "POPULAR"))
+        ],
+        "stats": {
+            "scoreDistribution": [
+                {"score": score, "amount": rng.randint(0, 5000)}
+                for score in range(10, 101, 10)
+            ],
+            "statusDistribution": [
+                {"status": status, "amount": rng.randint(0, 50000)}
+                for status in _LIST_STATUSES
+            ],
+        },
+        "isAdult": False,
+        "siteUrl": f"https://anilist.co/anime/{media_id}",
+    }
+
+
+def page(size: int = 50, seed: int = 0, start: int = 1) -> Dict[str, Any]:
+    """
+    Generate the payload for a page of media.
+
+    Args:
+        size: Number of media present in the page.
+        seed: Seed for the random number generator, keeps the payloads reproducible.
+        start: Id of the first media in the page.
+
+    Returns:
+        Dictionary with the same structure as the response of a `Page` query.
+    """
+
+    rng = Random(seed)
+    items: List[Dict[str, Any]] = [media(start + x, rng) for x in range(size)]
+
+    return {
+        "data": {
+            "Page": {
+                "pageInfo": {
+                    "total": size,
+                    "perPage": size,
+                    "currentPage": 1,
+                    "lastPage": 1,
+                    "hasNextPage": False,
+                },
+                "media": items,
+            }
+        }
+    }
@@ -1,10 +1,27 @@
 # Contains methods/variables shared between test cases.
 
-from typing import Any, List, Type, Union
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Type,
+    Union,
+)
 
+import asyncio
 from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from threading import Thread
 from json import loads as json_load
 
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
 from anilist.client import BaseObject
 from pytest import raises as _raises
 
@@ -88,4 +105,183 @@ def check_initialize(obj: BaseObject) -> bool:
         obj.stringify()
         == obj.initialize(obj.stringify()).stringify()
         == obj.initialize(json_load(obj.stringify())).stringify()
+    ) and obj == obj.initialize(obj.stringify())
+
+
+def build_media(media_id: int = 21, **fields: Any) -> Any:
+    """
+    Build a media populated with all the nested objects, shared between tests.
+
+    Args:
+        media_id: The id of the media, on Anilist and MyAnimeList - also used for
+            the media of its next episode.
+        fields: Arguments of the constructor of `MediaData` replacing the defaults,
+            for tests that need media with specific values.
+
+    Returns:
+        Instance of `MediaData`, a new instance is returned by every call.
+    """
+
+    from anilist.types import (
+        AiringSchedule,
+        FuzzyDate,
+        MediaData,
+        MediaFormat,
+        MediaListStatus,
+        MediaRank,
+        MediaRankType,
+        MediaSeason,
+        MediaStats,
+        MediaStatus,
+        MediaTag,
+        MediaTitle,
+        MediaType,
+        ScoreDistribution,
+        StatusDistribution,
     )
+
+    defaults = dict(
+        mal_id=media_id,
+        title=MediaTitle("One Piece", "One Piece", "ワンピース", "One Piece"),
+        media_type=MediaType.ANIME,
+        media_format=MediaFormat.TV,
+        status=MediaStatus.RELEASING,
+        start_date=FuzzyDate(20, 10, 1999),
+        season=MediaSeason.FALL,
+        season_year=1999,
+        genres=["Action", "Adventure"],
+        tags=[
+            MediaTag(1, "Pirates", "description", "Setting", 95, False, False, False)
+        ],
+        next_airing=AiringSchedule(1, 1600000000, 3600, 950, media_id),
+        rankings=[
+            MediaRank(
+                1,
+                3,
+                MediaRankType.POPULAR,
+                MediaFormat.TV,
+                1999,
+                MediaSeason.FALL,
+                False,
+                "most popular",
+            )
+        ],
+        stats=MediaStats(
+            [ScoreDistribution(100, 20)],
+            [StatusDistribution(MediaListStatus.CURRENT, 12)],
+        ),
+        is_adult=False,
+    )
+
+    return MediaData(media_id, **{**defaults, **fields})
+
+
+@asynccontextmanager
+async def stand_in(
+    handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
+) -> AsyncIterator[str]:
+    """
+    Run a local stand-in for the API, all the requests are answered by the handler.
+
+    Args:
+        handler: Coroutine receiving each request, returns the response.
+
+    Returns:
+        Asynchronous context manager yielding the URL of the server.
+    """
+
+    app = web.Application()
+    app.router.add_post("/", handler)
+
+    server = TestServer(app)
+    await server.start_server()
+
+    try:
+        yield str(server.make_url("/"))
+    finally:
+        await server.close()
+
+
+@contextmanager
+def stand_in_thread(
+    handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
+) -> Iterator[str]:
+    """
+    Run a local stand-in for the API on an event loop in a separate thread - for tests
+    that block the main thread.
+
+    Args:
+        handler: Coroutine receiving each request, returns the response.
+
+    Returns:
+        Context manager yielding the URL of the server.
+    """
+
+    loop = asyncio.new_event_loop()
+    thread = Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    server = stand_in(handler)
+    try:
+        yield asyncio.run_coroutine_threadsafe(server.__aenter__(), loop).result()
+    finally:
+        asyncio.run_coroutine_threadsafe(
+            server.__aexit__(None, None, None), loop
+        ).result()
+
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def media_handler(
+    total: int = 120, requests: Optional[List[Dict[str, Any]]] = None
+) -> Callable[[web.Request], Awaitable[web.Response]]:
+    """
+    Build a handler answering media queries, for use with `stand_in`.
+
+    Notes:
+        The stand-in holds media with ids from 1 to `total`. Queries with `id_in` get
+        the matching media, every other query pages through all the media.
+
+    Args:
+        total: Number of media held by the stand-in.
+        requests: List to which the variables of every request are appended.
+
+    Returns:
+        Coroutine handling the requests.
+    """
+
+    async def handler(request: web.Request) -> web.Response:
+        variables = (await request.json())["variables"]
+        if requests is not None:
+            requests.append(variables)
+
+        page, per_page = variables["page"], variables["perPage"]
+        if "id_in" in variables:
+            ids = [x for x in variables["id_in"] if 1 <= x <= total]
+        else:
+            ids = list(range(1, total + 1))[(page - 1) * per_page : page * per_page]
+
+        last = max(1, -(-total // per_page))
+        data = {
+            "data": {
+                "Page": {
+                    "pageInfo": {
+                        "total": total,
+                        "perPage": per_page,
+                        "currentPage": page,
+                        "lastPage": last,
+                        "hasNextPage": "id_in" not in variables and page < last,
+                    },
+                    "media": [
+                        {"id": x, "title": {"romaji": f"Media {x}"}, "type": "ANIME"}
+                        for x in ids
+                    ],
+                }
+            }
+        }
+
+        return web.json_response(data)
+
+    return handler
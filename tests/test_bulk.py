@@ -0,0 +1,70 @@
+# Tests the multi-process bulk crawler against a local stand-in for the API.
+
+from time import monotonic
+
+from aiohttp import web
+from pytest import raises
+from tests.commons import catch, media_handler, stand_in_thread
+
+from anilist.client.bulk import SharedTokenBucket, bulk_crawl
+from anilist.errors import APIError
+
+
+def test_shared_token_bucket():
+    bucket = SharedTokenBucket(rate=10, capacity=2)
+    assert [round(bucket.reserve(), 1) for _ in range(4)] == [0.0, 0.0, 0.1, 0.2]
+    assert bucket.available < 0 and bucket.delay() > 0.2
+
+    bucket.refund()
+    bucket.pause(1)
+    assert bucket.delay() > 0.9
+
+    catch(ValueError, SharedTokenBucket, 0)
+
+
+def test_bulk_crawl():
+    requests = []
+    arrivals = []
+    handler = media_handler(250, requests)
+
+    async def timed(request: web.Request) -> web.Response:
+        arrivals.append(monotonic())
+        return await handler(request)
+
+    pages = []
+    with stand_in_thread(timed) as url:
+        metrics = bulk_crawl(
+            range(1, 301),
+            lambda items: pages.append([x.id for x in items]),
+            workers=3,
+            url=url,
+            rate=40,
+            capacity=1,
+            batch=25,
+        )
+
+    # Results from all the workers are merged into the same sink.
+    assert sorted(sum(pages, [])) == list(range(1, 251))
+    assert metrics["items"] == 250 and len(metrics["workers"]) == 3
+    assert sum(x["fetch"]["items"] for x in metrics["workers"]) == 12
+
+    # Every batch is requested exactly once.
+    batches = sorted(x["id_in"][0] for x in requests)
+    assert batches == list(range(1, 301, 25))
+
+    # The workers share a single rate limit - 12 requests at 40 per second, with no
+    # burst allowed, take at least 11 / 40 seconds.
+    arrivals.sort()
+    assert arrivals[-1] - arrivals[0] >= 11 / 40 * 0.9
+
+
+def test_bulk_crawl_errors():
+    async def broken(request: web.Request) -> web.Response:
+        return web.Response(status=500, body=b"<html>Internal Server Error</html>")
+
+    with stand_in_thread(broken) as url:
+        with raises(APIError):
+            bulk_crawl(range(1, 101), print, workers=2, url=url, rate=1000)
+
+    catch(TypeError, bulk_crawl, iter([1]), print)
+    catch(ValueError, bulk_crawl, range(10), print, 0)
@@ -0,0 +1,318 @@
+# Tests the local media catalogue, and its indexes.
+
+from threading import Thread
+
+from asyncio import run
+
+from pytest import raises
+from tests.commons import build_media, catch, media_handler, stand_in
+
+from anilist import Anilist
+from anilist.catalogue import INDEXES, MediaCatalogue, QueryEngine
+from anilist.client.rate_limit import TokenBucket
+from anilist.queries import MediaQuery
+from anilist.types import (
+    FuzzyDate,
+    MediaData,
+    MediaExternalLink,
+    MediaFormat,
+    MediaSeason,
+    MediaSort,
+    MediaSource,
+    MediaStatus,
+    MediaTag,
+    MediaTitle,
+    MediaType,
+)
+
+
+def _tag(name: str, rank: int = 80) -> MediaTag:
+    return MediaTag(1, name, "", name.split()[0], rank, False, False, False)
+
+
+def _media(media_id: int) -> MediaData:
+    # Media cycling through the values of every indexed attribute.
+    return build_media(
+        media_id,
+        mal_id=media_id + 1000,
+        media_type=MediaType.ANIME,
+        media_format=[MediaFormat.TV, MediaFormat.MOVIE, MediaFormat.OVA][media_id % 3],
+        status=[MediaStatus.FINISHED, MediaStatus.RELEASING][media_id % 2],
+        season=list(MediaSeason)[media_id % 4],
+        season_year=2018 + media_id % 4,
+        source=[MediaSource.ORIGINAL, MediaSource.MANGA][media_id % 2],
+        genres=["Action", "Drama"][: 1 + media_id % 2],
+        tags=[_tag(f"Tag {media_id % 5}", media_id % 100), _tag("Common")],
+        title=MediaTitle(f"Title {media_id}", "", f"タイトル {media_id}", ""),
+        start_date=FuzzyDate(1, 1 + media_id % 12, 2000 + media_id % 20),
+        episodes=None if media_id % 7 == 0 else media_id % 26,
+        average_score=media_id % 90,
+        popularity=(media_id * 37) % 1000,
+        external_links=[
+            MediaExternalLink(1, "", ["Crunchyroll", "Netflix"][media_id % 2])
+        ],
+        rankings=None,
+    )
+
+
+def test_catalogue():
+    catalogue = MediaCatalogue(_media(x) for x in range(1, 121))
+    assert len(catalogue) == 120 and 5 in catalogue and 0 not in catalogue
+
+    assert catalogue.get(5).id == 5 and catalogue.get(500) is None
+    assert catalogue.get_mal(1005) is catalogue[5]
+    assert catalogue.get_mal(5) is None
+
+    # Every lookup matches a scan over the catalogue.
+    def scan(check):
+        return {x.id for x in catalogue if check(x)}
+
+    ids = catalogue.ids(
+        media_format=MediaFormat.TV, season=MediaSeason.FALL, year=2021, tag="Tag 3"
+    )
+    assert ids == scan(
+        lambda x: x.format == MediaFormat.TV
+        and x.season == MediaSeason.FALL
+        and x.seasonYear == 2021
+        and "Tag 3" in [y.name for y in x.tags]
+    )
+    assert ids and [x.id for x in catalogue.find(tag="Tag 3", year=2021)] == sorted(
+        scan(lambda x: x.seasonYear == 2021 and "Tag 3" in [y.name for y in x.tags])
+    )
+
+    assert catalogue.ids(genre=["Action", "Drama"]) == scan(
+        lambda x: len(x.genres) == 2
+    )
+    assert catalogue.ids(season=MediaSeason.WINTER) == scan(
+        lambda x: x.season == MediaSeason.WINTER
+    )
+    assert catalogue.ids(year=2019, status=MediaStatus.RELEASING) == scan(
+        lambda x: x.seasonYear == 2019 and x.status == MediaStatus.RELEASING
+    )
+    assert catalogue.ids(source=MediaSource.MANGA, tag="Unknown") == set()
+    assert len(catalogue.ids()) == 120
+    assert [x.id for x in catalogue.find(tag="Tag 0")] == list(range(5, 121, 5))
+
+    assert catalogue.values("format") == {
+        MediaFormat.TV: 40,
+        MediaFormat.MOVIE: 40,
+        MediaFormat.OVA: 40,
+    }
+    catch(ValueError, catalogue.values, "title")
+
+    catch(TypeError, catalogue.add, build_media().title)
+    catch(TypeError, catalogue.ids, MediaFormat.TV)
+    catch(TypeError, catalogue.ids, None, None, None, None, "2020")
+    catch(TypeError, catalogue.ids, None, None, None, None, None, None, 1)
+
+
+def test_catalogue_updates():
+    catalogue = MediaCatalogue()
+    catalogue([_media(x) for x in range(1, 11)])
+
+    # Replacing media moves it across the indexes.
+    updated = _media(3)
+    updated.format = MediaFormat.SPECIAL
+    updated.tags = []
+    updated.idMal = None
+    catalogue.add(updated)
+
+    assert catalogue.ids(media_format=MediaFormat.SPECIAL) == {3}
+    assert 3 not in catalogue.ids(media_format=MediaFormat.TV)
+    assert 3 not in catalogue.ids(tag="Common") and len(catalogue) == 10
+    assert catalogue.get_mal(1003) is None
+
+    removed = catalogue.remove(3)
+    assert removed is updated and 3 not in catalogue
+    assert MediaFormat.SPECIAL not in catalogue.values("format")
+
+    with raises(KeyError):
+        catalogue.remove(3)
+
+    # Media with nothing to index is still stored.
+    catalogue.add(MediaData(500))
+    assert catalogue[500].id == 500 and len(catalogue.ids()) == 10
+
+    # Exports hold the media ordered by its id, along with sorted postings.
+    media, mal, indexes = catalogue.export()
+    assert [x.id for x in media] == [1, 2, 4, 5, 6, 7, 8, 9, 10, 500]
+    assert mal[0] == (1001, 1) and len(mal) == 9
+    assert indexes["tag"]["Common"] == [1, 2, 4, 5, 6, 7, 8, 9, 10]
+    assert set(indexes) == set(INDEXES)
+
+
+def test_catalogue_threads():
+    catalogue = MediaCatalogue(_media(x) for x in range(1, 201))
+    errors = []
+
+    def write():
+        for x in range(201, 2001):
+            catalogue.add(_media(x))
+            catalogue.remove(x - 100)
+
+    def read():
+        try:
+            for _ in range(500):
+                catalogue.ids(media_format=MediaFormat.TV, tag="Common")
+                catalogue.ids(season=MediaSeason.FALL)
+                list(catalogue)
+
+                # Lookups within the block see the same state.
+                with catalogue.locked() as held:
+                    assert len(held.ids()) == len(held) == len(list(held))
+        except Exception as error:  # pragma: no cover - reported below
+            errors.append(error)
+
+    threads = [Thread(target=write)] + [Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors and len(catalogue) == 200
+    assert catalogue.ids(tag="Common") == set(range(1, 101)) | set(range(1901, 2001))
+
+
+def test_engine():
+    catalogue = MediaCatalogue(_media(x) for x in range(1, 301))
+    engine = QueryEngine(catalogue)
+    media = list(catalogue)
+
+    def check(query, expected, page=1, per_page=500):
+        items, info = engine.execute(query, page, per_page)
+        ids = [x.id for x in items]
+
+        assert ids == expected, query.arguments
+        return ids, info
+
+    def scan(condition):
+        return [x.id for x in media if condition(x)]
+
+    check(MediaQuery(media_id=5), [5])
+    check(MediaQuery(id_in=[9, 4, 1000], id_not=9), [4])
+    check(MediaQuery(idMal_in=[1003, 1004]), [3, 4])
+    check(
+        MediaQuery(
+            media_format=MediaFormat.TV,
+            season=MediaSeason.FALL,
+            seasonYear=2021,
+            tag="Tag 3",
+        ),
+        scan(
+            lambda x: x.format == MediaFormat.TV
+            and x.season == MediaSeason.FALL
+            and x.seasonYear == 2021
+            and x.id % 5 == 3
+        ),
+    )
+    check(
+        MediaQuery(format_in=[MediaFormat.MOVIE, MediaFormat.OVA], episodes_greater=20),
+        scan(lambda x: x.id % 3 != 0 and (x.episodes or 0) > 20),
+    )
+    check(
+        MediaQuery(status_not=MediaStatus.FINISHED, averageScore_lesser=10),
+        scan(lambda x: x.id % 2 == 1 and x.averageScore < 10),
+    )
+    check(
+        MediaQuery(genre_in=["Action", "Drama"], tag_not_in=["Tag 1", "Tag 2"]),
+        scan(lambda x: x.id % 2 == 1 and x.id % 5 not in (1, 2)),
+    )
+    check(
+        MediaQuery(
+            startDate_greater=FuzzyDate(1, 6, 2010),
+            startDate_lesser=FuzzyDate(1, 1, 2012),
+        ),
+        scan(lambda x: 20100601 < x.startDate.packed < 20120101),
+    )
+    check(
+        MediaQuery(startDate_like="2005%"),
+        scan(lambda x: x.startDate.year == 2005),
+    )
+    check(MediaQuery(title="title 12"), [12] + list(range(120, 130)))
+    check(MediaQuery(title="タイトル 29"), [29] + list(range(290, 300)))
+    check(
+        MediaQuery(licensedBy_in=["Netflix", "HIDIVE"], popularity_greater=900),
+        scan(lambda x: x.id % 2 == 1 and x.popularity > 900),
+    )
+
+    # Tags below the minimum rank are ignored.
+    check(
+        MediaQuery(tag="Tag 2", minimumTagRank="50"),
+        scan(lambda x: x.id % 5 == 2 and x.id % 100 >= 50),
+    )
+    check(
+        MediaQuery(tagCategory_in=["Tag", "Common"], minimumTagRank="80"),
+        scan(lambda x: x.id % 100 >= 80),
+    )
+
+    # Sorting, unknown values are always placed last.
+    ordered = sorted(media, key=lambda x: (-(x.episodes or -1), x.id))
+    ids, info = check(
+        MediaQuery(sort=[MediaSort.EPISODES_DESC]),
+        [x.id for x in ordered][50:60],
+        page=6,
+        per_page=10,
+    )
+    assert info == {
+        "total": 300,
+        "perPage": 10,
+        "currentPage": 6,
+        "lastPage": 30,
+        "hasNextPage": True,
+    }
+
+    items, _ = engine.execute(MediaQuery(sort=[MediaSort.EPISODES]), 30, 10)
+    assert all(x.episodes is None for x in items)
+
+    check(
+        MediaQuery(
+            media_format=MediaFormat.TV,
+            sort=[MediaSort.POPULARITY_DESC, MediaSort.ID],
+        ),
+        [
+            x.id
+            for x in sorted(media, key=lambda x: (-x.popularity, x.id))
+            if x.format == MediaFormat.TV
+        ],
+    )
+    check(
+        MediaQuery(title="title 2", sort=[MediaSort.SEARCH_MATCH]),
+        [2] + list(range(20, 30)) + list(range(200, 300)),
+        per_page=200,
+    )
+
+    assert engine.count(MediaQuery(media_type=MediaType.MANGA)) == 0
+    assert engine.execute(MediaQuery(), 100)[1]["hasNextPage"] is False
+
+    assert not engine.supports(MediaQuery(onList=True))
+    assert engine.supports(MediaQuery(title="x"))
+    catch(ValueError, engine.execute, MediaQuery(onList=True))
+    catch(ValueError, engine.execute, MediaQuery(), 0)
+    catch(TypeError, engine.execute, {"id": 1})
+    catch(TypeError, QueryEngine, [])
+
+
+def test_engine_fetch():
+    requests = []
+
+    async def main():
+        async with stand_in(media_handler(10, requests)) as url:
+            limiter = TokenBucket(1000, 1000)
+            async with Anilist(url, limiter=limiter) as client:
+                engine = QueryEngine(MediaCatalogue([_media(1)]), client)
+
+                local, _ = await engine.fetch(MediaQuery(id_in=[1]))
+                remote, info = await engine.fetch(MediaQuery(id_in=[4, 5]))
+                cached, _ = await engine.fetch(MediaQuery(id_in=[4, 5]))
+                missing, _ = await engine.fetch(MediaQuery(id_in=[50]), fallback=False)
+
+        with raises(ValueError):
+            await QueryEngine(MediaCatalogue()).fetch(MediaQuery(id_in=[1]))
+
+        return local, remote, cached, missing, engine
+
+    local, remote, cached, missing, engine = run(main())
+
+    assert [x.id for x in local] == [1] and missing == []
+    assert [x.id for x in remote] == [4, 5] == [x.id for x in cached]
+    assert len(requests) == 1 and len(engine.catalogue) == 3
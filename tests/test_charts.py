@@ -0,0 +1,132 @@
+# Tests the season charts, kept up to date along with the catalogue.
+
+from tests.commons import catch
+from tests.test_catalogue import _media
+
+from anilist.catalogue import ORDERS, MediaCatalogue, SeasonCharts
+from anilist.catalogue.charts import score
+from anilist.types import (
+    MediaData,
+    MediaFormat,
+    MediaRank,
+    MediaRankType,
+    MediaSeason,
+    MediaStats,
+    ScoreDistribution,
+)
+
+
+def _ranked(media_id: int, rank: int) -> MediaData:
+    media = _media(media_id)
+    media.rankings = [
+        MediaRank(
+            1, 1, MediaRankType.RATED, media.format, 2000, media.season, True, ""
+        ),
+        MediaRank(
+            2,
+            rank,
+            MediaRankType.RATED,
+            media.format,
+            media.seasonYear,
+            media.season,
+            False,
+            "",
+        ),
+    ]
+
+    return media
+
+
+def _expected(catalogue, season, year, media_format, order):
+    # Brute-force version of a chart.
+    def key(x):
+        rating = score(x)
+        ranks = [
+            y.rank for y in x.rankings or [] if not y.allTime and y.season == x.season
+        ]
+        return {
+            "score": (rating is None, -(rating or 0), x.id),
+            "popularity": (x.popularity is None, -(x.popularity or 0), x.id),
+            "rank": (
+                not ranks,
+                ranks[0] if ranks else 0,
+                rating is None,
+                -(rating or 0),
+                x.id,
+            ),
+        }[order]
+
+    media = [
+        x
+        for x in catalogue
+        if x.season == season
+        and x.seasonYear == year
+        and (media_format is None or x.format == media_format)
+    ]
+    return [x.id for x in sorted(media, key=key)]
+
+
+def _check(catalogue, charts):
+    for season in MediaSeason:
+        for year in range(2018, 2022):
+            for media_format in (None, MediaFormat.TV, MediaFormat.MOVIE):
+                for order in ORDERS:
+                    chart = charts.chart(
+                        season, year, media_format, order, per_page=500
+                    )
+                    expected = _expected(catalogue, season, year, media_format, order)
+                    assert [x.id for x in chart] == expected, (season, year, order)
+
+
+def test_charts():
+    catalogue = MediaCatalogue(_ranked(x, 1 + (x * 7) % 13) for x in range(1, 201))
+    charts = SeasonCharts(catalogue)
+    _check(catalogue, charts)
+
+    # Media without a season is not charted, media added later is.
+    catalogue.add(MediaData(1000))
+    catalogue.extend(_media(x) for x in range(201, 261))
+    _check(catalogue, charts)
+
+    season, year = MediaSeason.SPRING, 2019
+    assert charts.count(season, year) == 65
+    assert charts.count(season, year, MediaFormat.TV) == len(
+        _expected(catalogue, season, year, MediaFormat.TV, "score")
+    )
+    assert (season, year, MediaFormat.OVA) in charts.charts()
+
+    # Pages of the chart.
+    first = charts.chart(season, year, order="popularity", per_page=10)
+    second = charts.chart(season, year, order="popularity", page=2, per_page=10)
+    everything = charts.chart(season, year, order="popularity", per_page=100)
+    assert first + second == everything[:20]
+
+    # Scores and ranks updated in place, moved once added again.
+    for media_id in (5, 9, 13):
+        media = catalogue[media_id]
+        media.averageScore = None
+        media.stats = MediaStats(
+            [ScoreDistribution(90, 3), ScoreDistribution(60, 1)], []
+        )
+        media.rankings = media.rankings[:1]
+        catalogue.add(media)
+
+    assert score(catalogue[5]) == 82.5
+    _check(catalogue, charts)
+
+    # Media moving to another season, or removed.
+    moved = _media(13)
+    moved.season, moved.seasonYear = MediaSeason.WINTER, 2030
+    catalogue.add(moved)
+    catalogue.remove(9)
+    _check(catalogue, charts)
+    assert charts.chart(MediaSeason.WINTER, 2030) == [moved]
+
+    catalogue.remove(13)
+    assert charts.count(MediaSeason.WINTER, 2030) == 0
+    assert charts.chart(MediaSeason.WINTER, 2030) == []
+
+    catch(TypeError, SeasonCharts, [])
+    catch(TypeError, charts.chart, "SPRING", 2019)
+    catch(ValueError, charts.chart, MediaSeason.SPRING, 2019, None, "trending")
+    catch(ValueError, charts.chart, MediaSeason.SPRING, 2019, None, "score", 0)
@@ -0,0 +1,156 @@
+# Tests the client against a local stand-in for the API.
+
+from asyncio import gather, run, sleep
+from concurrent.futures import ThreadPoolExecutor
+from json import dumps
+
+from aiohttp import web
+from pytest import raises
+from tests.commons import catch, stand_in
+
+from anilist import Anilist, SyncAnilist
+from anilist.client.executor import DecodeExecutor
+from anilist.errors import APIError
+from anilist.types import decode_page
+
+
+def _page(size: int) -> dict:
+    media = [{"id": x, "description": "Lorem ipsum " * 10} for x in range(size)]
+    return {"data": {"Page": {"pageInfo": {"total": size}, "media": media}}}
+
+
+def _handler(body: bytes, status: int = 200):
+    async def handler(request: web.Request) -> web.Response:
+        payload = await request.json()
+        assert "query" in payload and isinstance(payload["variables"], dict)
+
+        return web.Response(body=body, status=status, content_type="application/json")
+
+    return handler
+
+
+def test_executor():
+    catch(ValueError, DecodeExecutor, "fiber")
+    catch(TypeError, DecodeExecutor, "thread", "1024")
+    catch(TypeError, DecodeExecutor, "thread", 1024, None, object())
+
+    async def main(executor: DecodeExecutor):
+        small = await executor.run(len, b"x" * 10)
+        large = await executor.run(len, b"x" * 100)
+        return small, large
+
+    for mode in ("inline", "thread", "process"):
+        executor = DecodeExecutor(mode, threshold=64, max_workers=1)
+        assert run(main(executor)) == (10, 100)
+        executor.shutdown()
+
+        metrics = executor.metrics.snapshot()
+        offloaded = 0 if mode == "inline" else 1
+
+        assert metrics["inline_calls"] == 2 - offloaded
+        assert metrics["offloaded_calls"] == offloaded
+        assert metrics["inline_bytes"] + metrics["offloaded_bytes"] == 110
+        assert metrics["max_inline_seconds"] <= metrics["inline_seconds"]
+
+
+def test_execute():
+    body = dumps(_page(20)).encode("utf-8")
+
+    async def main(mode: str):
+        async with stand_in(_handler(body)) as url:
+            executor = DecodeExecutor(mode, threshold=1024, max_workers=2)
+            async with Anilist(url, executor=executor) as client:
+                parsed = await client.execute("query { Page { media { id } } }")
+                items, info = await client.execute(
+                    "query { Page { media { id } } }", {"page": 1}, decode_page
+                )
+
+                # Other coroutines keep running while large responses are decoded.
+                ticks = []
+
+                async def tick():
+                    for _ in range(5):
+                        ticks.append(None)
+                        await sleep(0)
+
+                await gather(tick(), client.execute("query", None, decode_page))
+
+        return parsed, items, info, executor.metrics, len(ticks)
+
+    for mode in ("inline", "thread", "process"):
+        parsed, items, info, metrics, ticks = run(main(mode))
+
+        assert parsed == _page(20)
+        assert [x.id for x in items] == list(range(20))
+        assert info["total"] == 20 and ticks == 5
+
+        if mode == "inline":
+            assert metrics.inline_calls == 3 and metrics.offloaded_calls == 0
+        else:
+            assert metrics.inline_calls == 0 and metrics.offloaded_calls == 3
+
+
+def test_execute_errors():
+    error = {
+        "errors": [
+            {
+                "message": "Not Found.",
+                "status": 404,
+                "locations": [{"line": 2, "column": 3}],
+            }
+        ],
+        "data": {"Media": None},
+    }
+
+    async def main(body: bytes, status: int):
+        async with stand_in(_handler(body, status)) as url:
+            async with Anilist(url) as client:
+                await client.execute("query { Media { id } }")
+
+    with raises(APIError) as info:
+        run(main(dumps(error).encode("utf-8"), 404))
+
+    assert info.value.status == 404 and info.value.message == "Not Found."
+    assert info.value.locations == {"line": 2, "column": 3}
+
+    with raises(APIError) as info:
+        run(main(b"<html>Internal Server Error</html>", 500))
+
+    assert info.value.status == 500
+
+    catch(TypeError, Anilist, 10)
+    catch(TypeError, Anilist, "http://localhost", object())
+    catch(TypeError, Anilist, "http://localhost", None, object())
+
+
+def test_sync_client():
+    body = dumps(_page(5)).encode("utf-8")
+    peers = set()
+
+    async def handler(request: web.Request) -> web.Response:
+        # Connections are identified by the port on the side of the client.
+        peers.add(request.transport.get_extra_info("peername"))
+        return web.Response(body=body, content_type="application/json")
+
+    with SyncAnilist() as client:
+        server = stand_in(handler)
+        client.client.url = client.run(server.__aenter__())
+
+        def fetch(_):
+            items, _ = client.execute("query", {"page": 1}, decode_page)
+            return [x.id for x in items]
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(fetch, range(40)))
+
+        # Calling the client from within its own loop would deadlock.
+        async def nested():
+            coroutine = client.client.execute("query")
+            with raises(RuntimeError):
+                client.run(coroutine)
+
+        client.run(nested())
+        client.run(server.__aexit__(None, None, None))
+
+    assert results == [list(range(5))] * 40
+    assert 1 <= len(peers) <= 8
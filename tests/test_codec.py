@@ -0,0 +1,147 @@
+# Tests the pluggable JSON codec, against every backend that is installed.
+
+import asyncio
+import io
+import json
+
+from pytest import raises
+from tests.commons import build_media, catch
+
+from anilist.client import codec
+from anilist.client.base_object import _encode
+
+
+def test_codec():
+    # The standard library generates JSON till a caller opts in, output does not
+    # depend on the backends that happen to be installed. Parsing uses the fastest.
+    assert codec.backend() == "json"
+    assert codec.parser() == codec.available()[0]
+    assert codec.dumps({"a": ["ワ", 1]}) == '{"a": ["\\u30ef", 1]}'
+    assert "json" in codec.available()
+
+    catch(ValueError, codec.use, "simplejson")
+
+    for name in set(codec.BACKENDS) - set(codec.available()):
+        with raises(ImportError):
+            codec.use(name)
+
+    original, parser = codec.backend(), codec.parser()
+    try:
+        for name in codec.available():
+            assert codec.use("json") == codec.backend() == codec.parser()
+            assert codec.use(name, parse_only=True) == name == codec.parser()
+            assert codec.backend() == "json"
+
+            assert codec.use(name) == name == codec.backend() == codec.parser()
+
+            raw = b'{"b": [1, 2.5, null, true], "a": "\\u30ef"}'
+            expected = {"a": "ワ", "b": [1, 2.5, None, True]}
+            for data in (raw, bytearray(raw), memoryview(raw), str(raw, "utf-8")):
+                assert codec.loads(data) == expected
+
+            assert codec.loads(codec.dumps(expected)) == expected
+            assert codec.dumps({"b": 1, "a": 2}, sort_keys=True).index('"a"') == 1
+            assert "\n" in codec.dumps(expected, indent=2)
+            assert "\n" in codec.dumps(expected, indent=4)
+            assert codec.dumps(object(), default=lambda o: "x") == '"x"'
+
+            # Objects round-trip through every backend, enums are kept as strings.
+            media = build_media()
+            assert type(media).initialize(media.stringify(None)) == media
+            assert '"TV"' in media.stringify(None)
+            assert (
+                media.stringify()
+                == type(media).initialize(media.stringify()).stringify()
+            )
+    finally:
+        codec.use(original)
+        codec.use(parser, parse_only=True)
+
+
+def test_iterencode(tmp_path):
+    media = build_media()
+    original, parser = codec.backend(), codec.parser()
+
+    try:
+        # Joined chunks match the output of the standard library.
+        codec.use("json")
+        for indent in (None, 0, 2, 4):
+            assert "".join(media.iterencode(indent, 64)) == media.stringify(indent)
+    finally:
+        codec.use(original)
+        codec.use(parser, parse_only=True)
+
+    chunks = list(media.iterencode(chunk_size=256))
+    assert len(chunks) > 1 and all(len(x) >= 256 for x in chunks[:-1])
+
+    value = {"a": [1, 2.5, None, True, (), {}], 2: "ワ", None: float("inf")}
+    assert "".join(codec.iterencode(value, indent=2)) == json.dumps(value, indent=2)
+    value = {"b": value["a"], "a": {"d": "ワ", "c": -0.5}}
+    assert "".join(codec.iterencode(value, sort_keys=True, chunk_size=1)) == (
+        json.dumps(value, sort_keys=True)
+    )
+
+    catch(TypeError, lambda: list(codec.iterencode(object())))
+    catch(TypeError, lambda: list(codec.iterencode({(1,): 1})))
+    catch(TypeError, codec.iterencode, {}, "4")
+
+    cyclic: list = []
+    cyclic.append(cyclic)
+    catch(ValueError, lambda: list(codec.iterencode(cyclic)))
+
+    # Text and binary files, along with a collection of objects.
+    with open(tmp_path / "media.json", "w", encoding="utf-8") as file:
+        media.dump(file)
+
+    buffer = io.BytesIO()
+    codec.dump([media, media], buffer, default=_encode)
+
+    assert (tmp_path / "media.json").read_text("utf-8") == "".join(media.iterencode())
+    assert [type(media).initialize(x) for x in json.loads(buffer.getvalue())] == [
+        media,
+        media,
+    ]
+    catch(TypeError, codec.dump, media, "file")
+
+
+def test_adump():
+    media = build_media()
+
+    class Writer:
+        # Asynchronous writer, along the lines of a file opened through `aiofiles`.
+        def __init__(self):
+            self.chunks = []
+            self.encoding = "utf-8"
+
+        async def write(self, chunk):
+            self.chunks.append(chunk)
+
+    async def main():
+        writer = Writer()
+        await media.adump(writer, indent=None)
+
+        # Streams are drained after every chunk.
+        received = []
+
+        async def handle(reader, _):
+            received.append(await reader.read())
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        _, stream = await asyncio.open_connection("127.0.0.1", port)
+        await codec.adump([media] * 20, stream, default=_encode, chunk_size=128)
+        stream.close()
+        await stream.wait_closed()
+
+        while not received:
+            await asyncio.sleep(0.01)
+
+        server.close()
+        await server.wait_closed()
+
+        return "".join(writer.chunks), received[0]
+
+    text, raw = asyncio.run(main())
+    assert text == "".join(media.iterencode(None))
+    assert len(json.loads(raw)) == 20
@@ -0,0 +1,409 @@
+# Tests the crawl pipeline, the rate limiter and media queries.
+
+from asyncio import ensure_future, gather, run, sleep, wait_for
+from time import monotonic
+
+from aiohttp import web
+from pytest import raises
+from tests.commons import catch, media_handler, stand_in
+
+from anilist import Anilist
+from anilist.client.crawler import CrawlMetrics
+from anilist.client.credentials import CredentialPool
+from anilist.client.rate_limit import AdaptiveLimiter, LaneScheduler, TokenBucket
+from anilist.queries import MediaQuery
+from anilist.types import FuzzyDate, MediaSort, MediaStatus
+
+
+def test_media_query():
+    query = MediaQuery(
+        title="Cowboy",
+        id_in=[1, 2],
+        status_in=[MediaStatus.FINISHED],
+        startDate_greater=FuzzyDate(1, 4, 1998),
+        sort=[MediaSort.TITLE_ROMANJI, MediaSort.ID_DESC],
+    )
+
+    assert query.variables(2, 10) == {
+        "page": 2,
+        "perPage": 10,
+        "search": "Cowboy",
+        "id_in": [1, 2],
+        "startDate_greater": 19980401,
+        "status_in": ["FINISHED"],
+        "sort": ["TITLE_ROMAJI", "ID_DESC"],
+    }
+
+    text = query.query
+    for entry in (
+        "$search: String",
+        "$id_in: [Int]",
+        "$startDate_greater: FuzzyDateInt",
+        "$status_in: [MediaStatus]",
+        "$sort: [MediaSort]",
+        "Page(page: $page, perPage: $perPage)",
+        "hasNextPage",
+        "status_in: $status_in",
+    ):
+        assert entry in text
+
+    assert "media {" in MediaQuery().query
+    catch(TypeError, MediaQuery().variables, "1")
+
+    # Filters are checked against their type hints, along with the items of lists.
+    catch(TypeError, MediaQuery, 1)
+    catch(TypeError, MediaQuery, None, "1")
+    for filters in (
+        {"id_in": [1, "2"]},
+        {"status_in": ["FINISHED"]},
+        {"startDate": 19980401},
+    ):
+        with raises(TypeError):
+            MediaQuery(**filters)
+
+    assert MediaQuery(id_in=(1, 2)).variables()["id_in"] == [1, 2]
+
+
+def test_token_bucket():
+    catch(TypeError, TokenBucket, "1")
+    catch(ValueError, TokenBucket, 0)
+
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert [round(bucket.reserve(), 1) for _ in range(4)] == [0.0, 0.0, 0.1, 0.2]
+    assert bucket.available < 0
+
+    bucket.refund()
+    assert bucket.snapshot()["acquired"] == 3
+
+    bucket = TokenBucket(rate=1000, capacity=10)
+    bucket.pause(0.05)
+    assert bucket.available <= 0 and bucket.reserve() > 0.04
+
+    start = monotonic()
+    run(bucket.acquire())
+    assert monotonic() - start >= 0.04
+
+
+def test_adaptive_limiter():
+    catch(TypeError, AdaptiveLimiter, 1.5)
+    catch(ValueError, AdaptiveLimiter, 4, 8)
+    catch(ValueError, AdaptiveLimiter, 4, 1, 64, 1.0, 1.5)
+
+    limiter = AdaptiveLimiter(initial=4, maximum=6)
+
+    async def main():
+        # Additive increase - roughly one for every full window of healthy responses.
+        for _ in range(4):
+            await limiter.acquire()
+            limiter.release(0.1)
+
+        assert 4.9 < limiter.limit < 5.0 and limiter.baseline == 0.1
+
+        # A latency spike, and a burst of failures from the same window - the limit
+        # is only cut once.
+        for latency in (0.5, 0.1, 0.1):
+            await limiter.acquire()
+            limiter.release(latency, latency == 0.5)
+
+        assert 2.4 < limiter.limit < 2.6 and limiter.decreases == 1
+
+        # A lasting rise in the latency becomes the new baseline, the limit grows again.
+        shifted = AdaptiveLimiter(initial=4, maximum=6)
+        for _ in range(200):
+            await shifted.acquire()
+            shifted.release(0.05 if shifted.baseline is None else 0.2)
+
+        assert 0.19 < shifted.baseline < 0.21 and shifted.limit == 6
+        assert shifted.increases > 150 and shifted.in_flight == 0
+
+        # Requests beyond the limit wait for a free slot.
+        peak = []
+
+        async def request():
+            async with limiter.slot():
+                peak.append(limiter.in_flight)
+                await sleep(0.01)
+
+        await gather(*(request() for _ in range(6)))
+        assert max(peak) == 3 and limiter.in_flight == 0
+
+        # A waiting request that is cancelled gives up its place.
+        held = limiter.capacity
+        for _ in range(held):
+            await limiter.acquire()
+
+        with raises(Exception):
+            await wait_for(limiter.acquire(), 0.01)
+
+        for _ in range(held):
+            limiter.discard()
+        assert limiter.snapshot()["in_flight"] == 0
+        assert limiter.snapshot()["waiting"] == 0
+
+    run(main())
+
+
+def test_adaptive_client():
+    calls = []
+    handler = media_handler(10)
+
+    async def flaky(request: web.Request) -> web.Response:
+        calls.append(None)
+        if len(calls) % 2:
+            return web.Response(status=503)
+
+        return await handler(request)
+
+    async def main():
+        # Latency spikes are left out, only the responses adapt the limit.
+        adaptive = AdaptiveLimiter(initial=8, latency_factor=1000.0)
+        async with stand_in(flaky) as url:
+            limiter = TokenBucket(1000, 1000)
+            async with Anilist(url, limiter=limiter, adaptive=adaptive) as client:
+                for _ in range(4):
+                    await client.request("query", {"page": 1, "perPage": 5})
+
+        return adaptive
+
+    adaptive = run(main())
+    assert adaptive.decreases >= 1 and adaptive.limit < 8
+    assert adaptive.increases == 2 and adaptive.in_flight == 0
+
+
+def test_lane_scheduler():
+    catch(TypeError, LaneScheduler, object())
+    catch(TypeError, LaneScheduler, None, {"interactive": "1"})
+    catch(ValueError, LaneScheduler, None, {"a": 0.6, "b": 0.6})
+
+    class Gate(TokenBucket):
+        # Bucket holding back every token while closed, unlimited once open - tokens
+        # are handed out only once every request is waiting, independent of timing.
+        def __init__(self):
+            super().__init__()
+            self.open = True
+
+        def delay(self):
+            return 0.0 if self.open else 0.001
+
+        def reserve(self):
+            self.acquired += 1
+            return 0.0
+
+    bucket = Gate()
+    scheduler = LaneScheduler(bucket)
+    order = []
+
+    async def request(lane):
+        await scheduler.acquire(lane)
+        order.append(lane[0])
+
+    async def main():
+        await request("background")
+
+        # The background lane is flooded first, interactive requests still go ahead
+        # of it - apart from the share guaranteed to the background lane.
+        bucket.open = False
+        tasks = [ensure_future(request("background")) for _ in range(10)]
+        tasks += [ensure_future(request("interactive")) for _ in range(10)]
+        while sum(len(x.waiters) for x in scheduler.lanes.values()) < 20:
+            await sleep(0)
+
+        bucket.open = True
+        await gather(*tasks)
+
+        with raises(ValueError):
+            await scheduler.acquire("unknown")
+
+    run(main())
+
+    # The background lane earns a fifth of a token per token handed out, and is served
+    # once it is owed a whole token - one background request for every four
+    # interactive requests, after the credit is first built up.
+    assert "".join(order) == "b" + "iiiiib" + "iiiib" + "i" + "b" * 8
+
+    metrics = scheduler.snapshot()
+    assert metrics["background"]["granted"] == 11
+    assert metrics["background"]["peak_depth"] == 10
+    assert metrics["interactive"]["depth"] == 0
+    assert (
+        metrics["background"]["max_wait_seconds"]
+        > metrics["interactive"]["max_wait_seconds"]
+    )
+    assert metrics["bucket"]["acquired"] == 21
+
+
+def test_lanes_client():
+    requests = []
+
+    async def main():
+        scheduler = LaneScheduler(TokenBucket(rate=1000, capacity=1))
+        async with stand_in(media_handler(120, requests)) as url:
+            async with Anilist(url, scheduler=scheduler) as client:
+                query = MediaQuery(id_in=[1])
+
+                await gather(
+                    client.crawl(range(1, 121), list, lane="background"),
+                    client.execute(query.query, query.variables(), lane="interactive"),
+                )
+
+        return scheduler.snapshot()
+
+    metrics = run(main())
+    assert metrics["background"]["granted"] == 3
+    assert metrics["interactive"]["granted"] == 1
+
+    with raises(ValueError):
+        Anilist(limiter=TokenBucket(), scheduler=LaneScheduler())
+
+
+def test_credential_pool():
+    catch(TypeError, CredentialPool, "token")
+    catch(TypeError, CredentialPool, [1])
+    catch(ValueError, CredentialPool, [])
+
+    seen = []
+    handler = media_handler(10)
+
+    async def authenticated(request: web.Request) -> web.Response:
+        token = request.headers["Authorization"].split()[-1]
+        seen.append(token)
+
+        if token == "a" and seen.count("a") == 1:
+            return web.Response(status=429, headers={"Retry-After": "5"})
+
+        return await handler(request)
+
+    async def main(tokens, count, pinned=None, sequential=False):
+        pool = CredentialPool(tokens, rate=50, capacity=1)
+
+        async with stand_in(authenticated) as url:
+            async with Anilist(url, credentials=pool) as client:
+                query = MediaQuery(id_in=[1])
+                requests = [
+                    client.request(query.query, query.variables(), None, pinned)
+                    for _ in range(count)
+                ]
+
+                start = monotonic()
+                if sequential:
+                    for request in requests:
+                        await request
+                else:
+                    await gather(*requests)
+
+        return monotonic() - start, pool
+
+    # The first request on `a` is rate limited - `a` is paused, the retry (and every
+    # request after it) goes to the other tokens.
+    elapsed, pool = run(main({"a": "a", "b": "b", "c": "c"}, 9, sequential=True))
+    assert seen[0] == "a" and seen.count("a") == 1
+    assert set(seen[1:]) == {"b", "c"} and len(seen) == 10
+    assert pool.snapshot()["a"]["available"] <= 0 and len(pool) == 3
+
+    # Throughput scales with the number of tokens. Tokens without a name are named
+    # by their position, the tokens are kept out of the names.
+    seen.clear()
+    single, _ = run(main(["x"], 9))
+    seen.clear()
+    multiple, pool = run(main(["x", "y", "z"], 9))
+    assert multiple < single / 2
+    assert list(pool.snapshot()) == ["token-0", "token-1", "token-2"]
+    assert pool.pick("token-1").token == "y" and "y" not in repr(pool.pick("token-1"))
+
+    # Pinned requests only use their own token.
+    seen.clear()
+    run(main({"alice": "x", "bob": "y"}, 3, "bob"))
+    assert seen == ["y"] * 3
+
+    with raises(ValueError):
+        run(main(["x"], 1, "unknown"))
+
+    with raises(ValueError):
+        Anilist(scheduler=LaneScheduler(), credentials=CredentialPool(["x"]))
+
+
+def test_retry_after():
+    calls = []
+    handler = media_handler(10)
+
+    async def limited(request: web.Request) -> web.Response:
+        calls.append(monotonic())
+        if len(calls) == 1:
+            return web.Response(status=429, headers={"Retry-After": "0.05"})
+
+        return await handler(request)
+
+    async def main():
+        async with stand_in(limited) as url:
+            async with Anilist(url, limiter=TokenBucket(1000, 10)) as client:
+                query = MediaQuery(id_in=[1, 2])
+                return await client.execute(query.query, query.variables())
+
+    response = run(main())
+    assert [x["id"] for x in response["data"]["Page"]["media"]] == [1, 2]
+    assert len(calls) == 2 and calls[1] - calls[0] >= 0.04
+
+
+def test_crawl():
+    requests = []
+    pages = []
+
+    async def sink(items):
+        # A slow sink - the fetch stage should be held back by the queues.
+        await sleep(0.01)
+        pages.append([x.id for x in items])
+
+    async def main():
+        async with stand_in(media_handler(120, requests)) as url:
+            async with Anilist(url, limiter=TokenBucket(1000, 1000)) as client:
+                ids = (x for x in range(1, 131))
+                metrics = CrawlMetrics()
+
+                result = await client.crawl(
+                    ids, sink, concurrency=3, queue_size=2, metrics=metrics
+                )
+                assert result is metrics
+
+                await client.crawl(
+                    [MediaQuery(sort=[MediaSort.ID])],
+                    lambda items: pages.append([x.id for x in items]),
+                    per_page=50,
+                )
+
+                return metrics.snapshot()
+
+    metrics = run(main())
+
+    # Batches of ids, and all three pages of the query.
+    assert sorted(sum(pages[:3], [])) == list(range(1, 121))
+    assert pages[3:] == [
+        list(range(1, 51)),
+        list(range(51, 101)),
+        list(range(101, 121)),
+    ]
+    assert [len(x["id_in"]) for x in requests[:3]] == [50, 50, 30]
+    assert [x["page"] for x in requests[3:]] == [1, 2, 3]
+
+    assert metrics["fetch"]["items"] == 3
+    assert metrics["decode"]["items"] == metrics["sink"]["items"] == 120
+    assert metrics["decode"]["peak_queue"] <= 2 and metrics["sink"]["peak_queue"] <= 2
+    assert metrics["sink"]["busy_seconds"] >= 0.03 and metrics["sink"]["throughput"]
+
+
+def test_crawl_errors():
+    def sink(items):
+        raise RuntimeError("Sink failed")
+
+    async def main(sources, sink, concurrency=2):
+        async with stand_in(media_handler(10)) as url:
+            async with Anilist(url, limiter=TokenBucket(1000, 1000)) as client:
+                await client.crawl(sources, sink, concurrency)
+
+    with raises(RuntimeError):
+        run(main(range(1, 200), sink))
+
+    with raises(TypeError):
+        run(main(["1"], print))
+
+    with raises(ValueError):
+        run(main([1], print, 0))
@@ -0,0 +1,84 @@
+# Tests the table-driven decoder against `initialize`.
+
+from json import loads
+
+from pytest import raises
+from tests.commons import build_media, catch
+
+from anilist.client import BaseObject
+
+
+def test_decode():
+    from anilist.types import (
+        AiringSchedule,
+        FuzzyDate,
+        MediaData,
+        MediaStats,
+        MediaTitle,
+        decode,
+    )
+
+    media = build_media()
+    raw = media.stringify(None)
+
+    # Same result as `initialize`, for raw JSON and parsed data alike.
+    for data in (raw, raw.encode("utf-8"), memoryview(raw.encode("utf-8")), loads(raw)):
+        decoded = decode(data, MediaData)
+        assert type(decoded) is MediaData
+        assert decoded == media
+        assert decoded.stringify() == media.stringify()
+
+    assert decode([loads(raw), {"id": 2}], MediaData) == [media, MediaData(2)]
+    assert decode([], MediaData) == []
+
+    # Missing fields are set to their defaults, nulls are treated the same way.
+    assert decode({"year": 2020, "day": None}, FuzzyDate) == FuzzyDate(year=2020)
+    assert decode({}, MediaStats) == MediaStats([], [])
+    assert decode({"id": 1, "unknown": 2}, MediaData) == MediaData(1)
+
+    # Values normalized by the constructors are normalized the same way.
+    for date in ({"day": 1, "month": 2, "year": 21}, {"year": None}, {"year": 1998}):
+        expected = FuzzyDate.initialize({"day": None, "month": None, **date})
+        assert decode(date, FuzzyDate) == expected
+        assert decode({"id": 1, "endDate": date}, MediaData).endDate == expected
+
+    assert decode({"day": 1, "month": 2, "year": 21}, FuzzyDate).year == 2021
+
+    catch(TypeError, decode, {}, BaseObject)
+    catch(TypeError, decode, None, MediaTitle)
+    catch(TypeError, decode, {"id": 1, "title": "title"}, MediaData)
+
+    with raises(ValueError):
+        decode({"id": 1, "format": "NOT_A_FORMAT"}, MediaData)
+
+    # Deeply nested responses do not run into the recursion limit.
+    from sys import getrecursionlimit
+
+    data = {"id": 0}
+    for x in range(getrecursionlimit() * 2):
+        schedule = {"id": x, "airingAt": 0, "timeUntilAiring": 0, "episode": x}
+        data = {"id": x, "nextAiringEpisode": {**schedule, "media": data}}
+
+    decoded = decode(data, MediaData)
+    assert isinstance(decoded.nextAiringEpisode, AiringSchedule)
+    assert decoded.nextAiringEpisode.media.nextAiringEpisode.episode == x - 1
+
+
+def test_decode_page():
+    from anilist.types import MediaData, decode_page
+
+    media = build_media()
+    response = {
+        "data": {
+            "Page": {
+                "pageInfo": {"hasNextPage": False},
+                "media": [loads(media.stringify()), {"id": 3}],
+            }
+        }
+    }
+
+    items, info = decode_page(response)
+    assert items == [media, MediaData(3)]
+    assert info == {"hasNextPage": False}
+
+    assert decode_page({"data": {"Page": {"media": None}}}) == ([], {})
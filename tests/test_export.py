@@ -0,0 +1,164 @@
+# Tests the streaming export of media.
+
+import csv
+import gzip
+import io
+import tracemalloc
+from asyncio import run
+from json import loads
+
+from pytest import raises
+from tests.commons import build_media, catch, media_handler, stand_in
+
+from anilist import Anilist
+from anilist.client import export
+from anilist.client.export import (
+    CSVExporter,
+    NDJSONExporter,
+    ParquetExporter,
+    flatten,
+    schema,
+)
+from anilist.client.rate_limit import TokenBucket
+from anilist.types import MediaData, MediaTitle
+
+
+def _media(count: int):
+    # Objects are generated lazily, the export should never hold all of them.
+    return (build_media(x) for x in range(count))
+
+
+def test_flatten():
+    record = flatten(build_media())
+
+    assert list(record) == [x[0] for x in schema()]
+    assert record["id"] == 21 and record["title_native"] == "ワンピース"
+    assert record["type"] == "ANIME" and record["season"] == "FALL"
+    assert (record["startDate_year"], record["startDate_month"]) == (1999, 10)
+    assert record["endDate_year"] is None and record["trailer_site"] is None
+    assert record["genres"] == build_media().genres
+    assert record["tags_name"] == [x.name for x in build_media().tags]
+    assert record["rankings_type"] == [x.type.translate for x in build_media().rankings]
+    assert record["nextAiringEpisode_episode"] == 950
+    assert len(record["stats_scoreDistribution_score"]) == len(
+        build_media().stats.scoreDistribution
+    )
+
+    # Cycles are skipped - the airing schedule does not repeat the media.
+    assert not any(x[0].startswith("nextAiringEpisode_media_") for x in schema())
+    assert ("trailer_id", "str", False) in schema()
+
+    assert flatten(MediaData(1))["tags_name"] == []
+    catch(TypeError, flatten, object())
+    catch(TypeError, schema, int)
+
+
+def test_ndjson(tmp_path):
+    path = tmp_path / "media.ndjson.gz"
+    with NDJSONExporter(path) as exporter:
+        exporter(_media(50))
+
+    with gzip.open(path, "rb") as file:
+        lines = file.read().splitlines()
+
+    assert exporter.count == 50 and len(lines) == 50
+    assert loads(lines[7]) == flatten(build_media(7))
+
+    # Nested records can be read back into objects.
+    buffer = io.BytesIO()
+    with NDJSONExporter(buffer, flat=False) as exporter:
+        exporter.write(build_media())
+
+    assert not buffer.closed
+    assert MediaData.initialize(buffer.getvalue()) == build_media()
+
+    with raises(TypeError):
+        exporter.write(MediaTitle("a", "b", "c", "d"))
+
+    catch(ValueError, NDJSONExporter, io.BytesIO(), "zip")
+    catch(TypeError, NDJSONExporter, 10)
+
+
+def test_csv(tmp_path):
+    path = tmp_path / "media.csv"
+    with CSVExporter(path) as exporter:
+        exporter(_media(10))
+
+    with open(path, encoding="utf-8", newline="") as file:
+        rows = list(csv.reader(file))
+
+    assert rows[0] == [x[0] for x in schema()]
+    assert len(rows) == 11
+
+    row = dict(zip(rows[0], rows[4]))
+    assert row["id"] == "3" and row["title_native"] == "ワンピース"
+    assert loads(row["tags_name"]) == [x.name for x in build_media().tags]
+
+    # Compressed output, to a file owned by the caller.
+    buffer = io.BytesIO()
+    with CSVExporter(buffer, compression="gzip") as exporter:
+        exporter(_media(3))
+
+    assert not buffer.closed
+    assert len(gzip.decompress(buffer.getvalue()).splitlines()) == 4
+
+
+def test_parquet(tmp_path, monkeypatch):
+    if export.pyarrow is None:
+        with raises(ImportError):
+            ParquetExporter(tmp_path / "media.parquet")
+
+        return
+
+    path = tmp_path / "media.parquet"
+    with ParquetExporter(path, row_group=4) as exporter:
+        exporter(_media(10))
+
+    table = export.pyarrow.parquet.read_table(path)
+    assert table.num_rows == 10 and table.column_names == [x[0] for x in schema()]
+
+    monkeypatch.setattr(export, "pyarrow", None)
+    with raises(ImportError):
+        ParquetExporter(path)
+
+
+def test_constant_memory():
+    def peak(count: int) -> int:
+        tracemalloc.start()
+        with NDJSONExporter(io.BytesIO()) as exporter:
+            for media in _media(count):
+                exporter.write(media)
+                exporter._file.seek(0)
+                exporter._file.truncate()
+
+        result = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return result
+
+    assert peak(2000) < peak(200) * 2
+
+
+def test_export_sink(tmp_path):
+    path = tmp_path / "crawl.ndjson"
+
+    async def main():
+        async with stand_in(media_handler(120)) as url:
+            async with Anilist(url, limiter=TokenBucket(1000, 1000)) as client:
+                with NDJSONExporter(path) as exporter:
+                    await client.crawl(range(1, 121), exporter)
+
+        return exporter.count
+
+    assert run(main()) == 120
+
+    with open(path, "rb") as file:
+        ids = sorted(loads(x)["id"] for x in file)
+
+    assert ids == list(range(1, 121))
+
+    async def objects():
+        for media in _media(5):
+            yield media
+
+    buffer = io.BytesIO()
+    assert run(NDJSONExporter(buffer).consume(objects())) == 5
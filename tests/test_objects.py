@@ -4,7 +4,7 @@ from inspect import getmembers, isabstract, isclass
 from json import loads
 
 from pytest import raises
-from tests.commons import bruteforce_exception, catch, check_initialize
+from tests.commons import bruteforce_exception, build_media, catch, check_initialize
 
 from . import LOGGER
 
@@ -275,3 +275,217 @@ def test_media_data():
     assert check_initialize(
         MediaTag(13, "name", "description", "category", 10, False, True, False)
     )
+
+
+def test_media_data_nested():
+    from anilist.types import MediaData
+
+    catch(TypeError, MediaData, None)
+    catch(TypeError, MediaData, 2, "mal_id")
+    catch(TypeError, MediaData, 2, None, "title")
+
+    media = build_media()
+    assert media.id == 21
+    assert check_initialize(media)
+    assert check_initialize(MediaData(10))
+
+
+def test_pickle():
+    import pickle
+
+    from anilist.types import MediaData, MediaFormat
+
+    media = build_media()
+    for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+        restored = pickle.loads(pickle.dumps(media, protocol=protocol))
+        assert type(restored) is MediaData
+        assert restored.stringify() == media.stringify()
+
+    # Enums are restored to the very same member, and pickled using their value.
+    assert pickle.loads(pickle.dumps(MediaFormat.TV)) is MediaFormat.TV
+    assert MediaFormat.TV.__reduce_ex__(4) == (MediaFormat, (MediaFormat.TV.value,))
+
+    # The constructor should not run while restoring an object.
+    blob = pickle.dumps(media)
+    original = MediaData.__init__
+    try:
+        MediaData.__init__ = None
+        assert pickle.loads(blob).id == media.id
+    finally:
+        MediaData.__init__ = original
+
+
+def test_equality():
+    from anilist.types import (
+        FuzzyDate,
+        MediaData,
+        MediaStats,
+        MediaTitle,
+        ScoreDistribution,
+    )
+
+    media = build_media()
+    assert media == build_media()
+    assert media != MediaData(21)
+    assert MediaData(21) == MediaData(21)
+
+    # Objects of different types are never equal, even with the same values.
+    class Score(ScoreDistribution):
+        pass
+
+    assert Score(1, 2)._fields() == ScoreDistribution(1, 2)._fields()
+    assert Score(1, 2) != ScoreDistribution(1, 2)
+    assert ScoreDistribution(1, 2) != Score(1, 2)
+    assert ScoreDistribution(1, 2) != (1, 2)
+
+    # Objects of the same type differ by their values.
+    assert FuzzyDate(1, 1, 2000) != FuzzyDate(1, 1, 2001)
+
+    # Mutable objects can't be hashed.
+    with raises(TypeError):
+        hash(media)
+
+    with raises(TypeError):
+        hash(MediaStats([], []))
+
+    # Value objects hash by their value, and can be used as keys.
+    title = MediaTitle("romaji", "english", "native", "user_preferred")
+    same = MediaTitle("romaji", "english", "native", "user_preferred")
+    assert hash(title) == hash(same)
+    assert len({title, same, MediaTitle("a", "b", "c", "d")}) == 2
+    assert {FuzzyDate(1, 2, 2000): True}[FuzzyDate(1, 2, 2000)]
+
+    # Modifying the object invalidates the cached hash.
+    cached = hash(title)
+    title.english = "modified"
+    assert hash(title) != cached
+    assert title != same
+    assert "_hash" not in title.stringify()
+
+    # The cached hash is specific to the process, it should never be pickled.
+    import pickle
+
+    hash(title)
+    assert "_hash" not in pickle.loads(pickle.dumps(title)).__dict__
+
+
+def test_packed_dates():
+    from anilist.types import DateRangeIndex, FuzzyDate, filter_dates, pack_dates
+
+    date = FuzzyDate(20, 10, 1999)
+    assert date.packed == 19991020
+    assert date.fuzz == "19991020"
+    assert FuzzyDate.from_packed(date.packed) == date
+    assert FuzzyDate.from_packed(20200000) == FuzzyDate(year=2020)
+    assert FuzzyDate.initialize({"day": None, "month": None, "year": 2020}).packed == (
+        20200000
+    )
+
+    catch(TypeError, FuzzyDate.from_packed, "19991020")
+    catch(TypeError, FuzzyDate.from_packed, None)
+    catch(ValueError, FuzzyDate.from_packed, -1)
+
+    # Unknown components are zero - a partial date falls before the complete ones.
+    assert FuzzyDate(year=2020) < FuzzyDate(1, 1, 2020) < FuzzyDate(2, 1, 2020)
+    assert FuzzyDate(month=5, year=2020) > FuzzyDate(31, 4, 2020)
+    assert FuzzyDate(1, 1, 2020) <= FuzzyDate(1, 1, 2020) >= FuzzyDate(1, 1, 2020)
+    assert sorted([FuzzyDate(2, 1, 2020), FuzzyDate(year=2019)])[0].year == 2019
+
+    with raises(TypeError):
+        assert FuzzyDate(1, 1, 2020) < 20200101
+
+    dates = [
+        FuzzyDate(1, 4, 2020),
+        None,
+        FuzzyDate(year=2019),
+        FuzzyDate(15, 10, 2020),
+        FuzzyDate(),
+        FuzzyDate(1, 1, 2021),
+    ]
+    packed = pack_dates(dates)
+    assert list(packed) == [20200401, 0, 20190000, 20201015, 0, 20210101]
+
+    # Boundaries are exclusive, and unknown dates are never selected.
+    assert filter_dates(packed) == [0, 2, 3, 5]
+    assert filter_dates(packed, greater=FuzzyDate(year=2020)) == [0, 3, 5]
+    assert filter_dates(packed, lesser=20200401) == [2]
+    assert filter_dates(packed, FuzzyDate(year=2020), FuzzyDate(1, 1, 2021)) == [0, 3]
+    catch(TypeError, filter_dates, packed, "2020")
+
+    index = DateRangeIndex(packed)
+    assert len(index) == 4
+    assert index.range() == [2, 0, 3, 5]
+    assert index.range(greater=FuzzyDate(year=2020)) == [0, 3, 5]
+    assert index.range(lesser=20200401) == [2]
+    assert index.range(FuzzyDate(year=2020), FuzzyDate(1, 1, 2021)) == [0, 3]
+    assert index.range(greater=20210101) == []
+
+
+def test_diff():
+    import pickle
+
+    from anilist.types import (
+        AiringSchedule,
+        MediaData,
+        MediaFormat,
+        MediaTitle,
+        ScoreDistribution,
+    )
+
+    media = build_media()
+    assert media.diff(build_media()) == []
+    catch(TypeError, media.diff, MediaTitle("a", "b", "c", "d"))
+    catch(TypeError, media.apply, None)
+    catch(ValueError, media.apply, [((), 2)])
+
+    updated = build_media()
+    updated.stats.scoreDistribution[0] = ScoreDistribution(100, 25)
+    updated.nextAiringEpisode.timeUntilAiring = 1800
+    updated.genres.append("Comedy")
+    updated.format = MediaFormat.TV_SHORT
+
+    patch = media.diff(updated)
+    assert sorted(patch, key=str) == sorted(
+        [
+            (("stats", "scoreDistribution", 0), ScoreDistribution(100, 25)),
+            (("nextAiringEpisode", "timeUntilAiring"), 1800),
+            (("genres",), ["Action", "Adventure", "Comedy"]),
+            (("format",), MediaFormat.TV_SHORT),
+        ],
+        key=str,
+    )
+
+    # Patches can be shipped to another process, and applied over there - value
+    # objects in use as keys keep their hash.
+    entry = media.stats.scoreDistribution[0]
+    keys = {entry: "first"}
+
+    patch = pickle.loads(pickle.dumps(patch))
+    assert media.apply(patch) is media
+    assert media == updated
+    assert media.stringify() == updated.stringify()
+    assert keys[ScoreDistribution(100, 20)] == "first" and entry.amount == 20
+
+    catch(ValueError, media.apply, [(("stats", "scoreDistribution", 0, "amount"), 1)])
+
+    # Nested objects being added or removed replace the value as a whole.
+    bare = MediaData(21)
+    schedule = AiringSchedule(1, 2, 3, 4, 21)
+    bare.apply([(("nextAiringEpisode",), schedule)])
+    assert bare.nextAiringEpisode is schedule
+    assert bare.diff(MediaData(21)) == [(("nextAiringEpisode",), None)]
+
+
+def test_initialize_bytes():
+    from anilist.types import FuzzyDate, MediaData
+
+    media = build_media()
+    raw = media.stringify(None).encode("utf-8")
+
+    # Raw bytes, as received over the network, can be used directly.
+    for data in (raw, bytearray(raw), memoryview(raw), memoryview(bytearray(raw))):
+        assert MediaData.initialize(data) == media
+
+    assert FuzzyDate.initialize(b'{"day": 1, "month": 2, "year": 2003}').packed == (
+        20030201
+    )
@@ -0,0 +1,129 @@
+# Tests the fuzzy title search, over the index and through the catalogue.
+
+from pytest import raises
+from tests.commons import build_media, catch
+
+from anilist.catalogue import MediaCatalogue, TitleIndex, normalize
+from anilist.types import MediaData, MediaTitle
+
+_TITLES = {
+    1: ("Shingeki no Kyojin", "Attack on Titan", "進撃の巨人"),
+    2: (
+        "Shingeki no Kyojin Season 2",
+        "Attack on Titan Season 2",
+        "進撃の巨人 Season2",
+    ),
+    3: ("Kimetsu no Yaiba", "Demon Slayer", "鬼滅の刃"),
+    4: ("Pokémon", "Pokemon", "ポケットモンスター"),
+    5: ("Sword Art Online", "Sword Art Online", "ソードアート・オンライン"),
+    6: (
+        "Kaguya-sama wa Kokurasetai",
+        "Kaguya-sama: Love is War",
+        "かぐや様は告らせたい",
+    ),
+    7: ("Steins;Gate", "Steins;Gate", "シュタインズ・ゲート"),
+}
+
+
+def _media(media_id: int, synonyms=None) -> MediaData:
+    romaji, english, native = _TITLES[media_id]
+    return build_media(
+        media_id,
+        title=MediaTitle(romaji, english, native, romaji),
+        synonyms=synonyms or [],
+    )
+
+
+def _ids(index, text, **kwargs):
+    return [x for x, _ in index.search(text, **kwargs)]
+
+
+def test_normalize():
+    assert normalize("Pokémon ＰＯＫＥＭＯＮ！ ポケモン") == "pokemon pokemon ぽけもん"
+    assert normalize("  Steins;Gate  0 ") == "steins gate 0"
+    assert normalize("Kaguya-sama: Love is War") == "kaguya sama love is war"
+    assert normalize("!?") == ""
+
+
+def test_search():
+    index = TitleIndex(_media(x) for x in _TITLES)
+    assert len(index) == 7
+
+    # Exact matches first, then longer titles starting with the text.
+    results = index.search("Attack on Titan")
+    assert [x for x, _ in results] == [1, 2] and results[0][1] == 3.0
+    assert 2 < results[1][1] < 3
+
+    # Titles starting with the text rank above titles with a word starting with it.
+    # Shorter titles go first.
+    assert _ids(index, "s") == [7, 5, 1, 2, 3, 6]
+    assert _ids(index, "s", limit=2) == [7, 5]
+    assert _ids(index, "slay") == [3]
+    assert _ids(index, "gate") == [7]
+
+    # Typos, accents and scripts.
+    assert _ids(index, "atack on titan")[:2] == [1, 2]
+    assert _ids(index, "kimetsu no yaeba") == [3]
+    assert _ids(index, "swrod art online") == [5]
+    assert _ids(index, "POKEMON") == [4]
+    assert _ids(index, "ぽけっと") == [4]
+    assert _ids(index, "鬼滅") == [3]
+    assert _ids(index, "xyzzy") == []
+
+    # Lower thresholds let more distant titles through.
+    assert _ids(index, "kagyua lvoe war", threshold=0.3) == [6]
+    assert _ids(index, "kagyua lvoe war") == []
+    assert _ids(index, "atack on titan", threshold=1) == []
+
+    assert _ids(index, "shingeki", limit=1) == [1]
+    assert index.search("shingeki", limit=0) == [] == index.search("!!")
+
+    catch(TypeError, index.search, None)
+    catch(TypeError, index.add, "Pokemon")
+    with raises(ValueError):
+        index.search("pokemon", threshold=0)
+
+
+def test_search_updates():
+    index = TitleIndex()
+    for x in range(1, 8):
+        index.add(_media(x))
+
+    index.remove(1)
+    index.remove(1000)
+    assert _ids(index, "attack on titan") == [2] and len(index) == 6
+
+    # Adding media again replaces its titles.
+    index.add(_media(3, synonyms=["Blade of Demon Destruction"]))
+    assert _ids(index, "blade of demon") == [3]
+    index.add(_media(3))
+    assert _ids(index, "blade of demon") == []
+
+    # Enough titles to merge the sorted lists, while some of them are removed.
+    for x in range(10, 1010):
+        index.add(
+            MediaData(x, title=MediaTitle(f"Series {x}", "", "", ""), synonyms=[])
+        )
+        if x % 2:
+            index.remove(x)
+
+    # The best matches are kept, shorter titles ahead of longer ones that come first
+    # alphabetically.
+    assert _ids(index, "series 10", limit=11) == (
+        [10] + list(range(100, 110, 2)) + list(range(1000, 1010, 2))
+    )
+    assert _ids(index, "series 10", limit=6) == [10] + list(range(100, 110, 2))
+    assert _ids(index, "seires 500")[0] == 500
+    assert len(index) == 506
+
+
+def test_catalogue_search():
+    catalogue = MediaCatalogue(_media(x) for x in _TITLES)
+    assert [x.id for x in catalogue.search("shingeki no")] == [1, 2]
+    assert [x.id for x in catalogue.search("kyojin", limit=1)] == [1]
+
+    catalogue.remove(1)
+    assert [x.id for x in catalogue.search("shingeki no")] == [2]
+
+    catalogue.add(_media(1))
+    assert [x.id for x in catalogue.search("進撃の巨人")] == [1, 2]
@@ -0,0 +1,126 @@
+# Tests the tag similarity over the catalogue.
+
+import heapq
+import math
+from random import Random
+
+from tests.commons import build_media, catch
+
+from anilist.catalogue import MediaCatalogue, TagSimilarity
+from anilist.types import MediaTag
+
+
+def _tag(name, rank, spoiler=False, adult=False):
+    return MediaTag(1, name, "", "Theme", rank, False, spoiler, adult)
+
+
+def _media(media_id, *tags, adult=False):
+    return build_media(media_id, tags=list(tags), is_adult=adult)
+
+
+def test_similarity():
+    catalogue = MediaCatalogue(
+        [
+            _media(1, _tag("Isekai", 90), _tag("Magic", 80), _tag("Time Skip", 30)),
+            _media(2, _tag("Isekai", 85), _tag("Magic", 70)),
+            _media(3, _tag("Magic", 95), _tag("School", 90)),
+            _media(4, _tag("Mecha", 100), _tag("School", 60)),
+            _media(5, _tag("Isekai", 95, spoiler=True), _tag("Mecha", 90)),
+            _media(6, _tag("Isekai", 90), _tag("Magic", 80), adult=True),
+            _media(7, _tag("Gore", 90, adult=True), _tag("Magic", 10)),
+            _media(8),
+        ]
+    )
+    similarity = TagSimilarity(catalogue)
+
+    # Media with no usable tags left is not indexed.
+    assert len(similarity) == 6 and 6 not in similarity and 8 not in similarity
+    assert similarity.vector(catalogue[5]) == {"Mecha": 1.0}
+
+    results = similarity.similar(1, limit=3)
+    assert [x for x, _ in results] == [2, 7, 3]
+    assert 0 < results[-1][1] < results[0][1] < 1
+
+    assert [x for x, _ in similarity.similar(4)] == [5, 3]
+    assert similarity.similar(8) == [] and similarity.similar(1, 0) == []
+
+    assert [x for x, _ in similarity.similar_to({"Mecha": 1.0})] == [5, 4]
+    assert similarity.similar_to({"Unknown": 1.0}) == []
+    assert [x for x, _ in similarity.similar_to({"Magic": 1.0}, exclude=[3, 7])][0] == 1
+
+    batch = similarity.similar_many([1, 4, 8], limit=2)
+    assert batch == {1: similarity.similar(1, 2), 4: similarity.similar(4, 2), 8: []}
+
+    # Spoilers, adult media and tags, and tags below a rank.
+    everything = TagSimilarity(catalogue, spoilers=True, adult=True)
+    assert 6 in everything and 6 in [x for x, _ in everything.similar(1, 2)]
+    assert everything.vector(catalogue[5])["Isekai"] > 0.7
+
+    ranked = TagSimilarity(catalogue, minimum_rank=50)
+    assert ranked.vector(catalogue[7]) == {} and 7 not in ranked
+
+    # Updates to the catalogue.
+    catalogue.add(_media(9, _tag("Isekai", 90), _tag("Magic", 80)))
+    assert 9 in [x for x, _ in similarity.similar(1, limit=2)]
+    catalogue.remove(9)
+    catalogue.add(_media(2, _tag("Mecha", 40)))
+    assert 9 not in similarity and [x for x, _ in similarity.similar(1, 2)] == [7, 3]
+
+    # Seeds sharing the same tags are looked up once, every seed leaves itself out.
+    catalogue.add(_media(10, _tag("Magic", 95), _tag("School", 90)))
+    batch = similarity.similar_many([3, 10, 4, 3, 8], limit=2)
+    assert batch == {x: similarity.similar(x, 2) for x in (3, 10, 4, 8)}
+    assert batch[3][0][0] == 10 and batch[10][0][0] == 3
+    assert similarity.similar_many([3, 10], 0) == {3: [], 10: []}
+
+    catch(TypeError, TagSimilarity, [])
+    catch(TypeError, similarity.similar_to, ["Magic"])
+    catch(TypeError, TagSimilarity, catalogue, False, False, "50")
+
+
+def test_similarity_exact():
+    # Pruning the tags gives the same results as scoring every media.
+    rng = Random(1)
+    names = [f"Tag {x}" for x in range(60)]
+    weights = [1 / (x + 1) for x in range(60)]
+
+    catalogue = MediaCatalogue(
+        _media(
+            x,
+            *[
+                _tag(y, rng.randint(1, 100))
+                for y in set(rng.choices(names, weights, k=8))
+            ],
+        )
+        for x in range(1, 1501)
+    )
+    similarity = TagSimilarity(catalogue)
+    vectors = {x.id: similarity.vector(x) for x in catalogue}
+    frequency = {x: sum(x in y for y in vectors.values()) for x in names}
+
+    def expected(seed, limit):
+        query = {
+            x: y * math.log(1 + len(vectors) / frequency[x])
+            for x, y in vectors[seed].items()
+        }
+        norm = math.sqrt(sum(x * x for x in query.values()))
+        scores = {
+            x: sum(query.get(name, 0.0) * weight for name, weight in vector.items())
+            / norm
+            for x, vector in vectors.items()
+            if x != seed
+        }
+        return heapq.nlargest(limit, scores.items(), key=lambda x: (x[1], -x[0]))
+
+    seeds = rng.sample(range(1, 1501), 40)
+    for seed in seeds:
+        for limit in (1, 10, 100):
+            actual = similarity.similar(seed, limit)
+            assert [x for x, _ in actual] == [x for x, _ in expected(seed, limit)]
+            assert all(
+                math.isclose(x[1], y[1]) for x, y in zip(actual, expected(seed, limit))
+            )
+
+    assert similarity.similar_many(seeds, 10) == {
+        x: similarity.similar(x, 10) for x in seeds
+    }
@@ -0,0 +1,86 @@
+# Tests memory-mapped snapshots of the catalogue.
+
+from pytest import raises
+from tests.commons import catch
+from tests.test_catalogue import _media
+
+from anilist.catalogue import CatalogueSnapshot, MediaCatalogue, write_snapshot
+from anilist.types import MediaData, MediaFormat, MediaSeason, MediaStatus
+
+
+def test_snapshot(tmp_path):
+    catalogue = MediaCatalogue(_media(x) for x in range(1, 301))
+    catalogue.add(MediaData(1000))
+    path = tmp_path / "catalogue.snapshot"
+    write_snapshot(catalogue, path)
+
+    with CatalogueSnapshot(path) as snapshot:
+        assert len(snapshot) == 301 and 5 in snapshot and 0 not in snapshot
+        assert "5" not in snapshot
+
+        assert snapshot.get(5) == catalogue[5] and snapshot.get(500) is None
+        assert snapshot[1000] == MediaData(1000)
+        assert snapshot.get_mal(1005) == catalogue[5] and snapshot.get_mal(5) is None
+        with raises(KeyError):
+            snapshot[0]
+
+        assert [x.id for x in snapshot] == sorted(x.id for x in catalogue)
+
+        # Every lookup matches the catalogue.
+        for filters in (
+            {},
+            {"media_format": MediaFormat.TV, "season": MediaSeason.FALL, "year": 2021},
+            {"status": MediaStatus.RELEASING, "tag": ["Common", "Tag 3"]},
+            {"genre": "Drama", "tag": "Common"},
+            {"season": MediaSeason.SPRING},
+            {"year": 2019, "tag": "Unknown"},
+        ):
+            assert snapshot.ids(**filters) == catalogue.ids(**filters), filters
+
+        assert snapshot.find(tag="Tag 0") == catalogue.find(tag="Tag 0")
+        for index in ("format", "season", "tag", "genre", "source"):
+            assert snapshot.values(index) == catalogue.values(index)
+
+        loaded = snapshot.load()
+        assert len(loaded) == 301 and loaded.ids(tag="Common") == set(range(1, 301))
+        assert [x.id for x in loaded.search("title 12", limit=1)] == [12]
+
+        catch(ValueError, snapshot.values, "title")
+        catch(TypeError, snapshot.ids, None, None, None, None, "2020")
+
+        media = snapshot.get(7)
+        common = snapshot.ids(tag="Common")
+        fall = snapshot.ids(season=MediaSeason.FALL, year=2021)
+
+    # Media built from the snapshot, and the results of lookups, outlive it.
+    assert media == catalogue[7]
+    assert common == set(range(1, 301)) and fall == catalogue.ids(
+        season=MediaSeason.FALL, year=2021
+    )
+
+
+def test_snapshot_replaced(tmp_path):
+    path = tmp_path / "catalogue.snapshot"
+    write_snapshot(MediaCatalogue(_media(x) for x in range(1, 11)), path)
+
+    # Readers of the previous snapshot are not affected by a new one.
+    with CatalogueSnapshot(path) as old:
+        write_snapshot(MediaCatalogue(_media(x) for x in range(5, 8)), path)
+
+        with CatalogueSnapshot(path) as new:
+            assert len(old) == 10 and old.get(1).id == 1
+            assert len(new) == 3 and new.get(1) is None
+
+    assert not (tmp_path / "catalogue.snapshot.tmp").exists()
+
+    write_snapshot(MediaCatalogue(), path)
+    with CatalogueSnapshot(path) as empty:
+        assert len(empty) == 0 and empty.ids() == set() and empty.get(1) is None
+
+    # Files that are not snapshots.
+    for content in (b"", b"not a snapshot", bytes(200)):
+        (tmp_path / "invalid").write_bytes(content)
+        with raises(ValueError):
+            CatalogueSnapshot(tmp_path / "invalid")
+
+    catch(TypeError, write_snapshot, [], path)
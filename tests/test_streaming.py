@@ -0,0 +1,83 @@
+# Tests incremental parsing of responses received in chunks.
+
+from asyncio import run
+from json import dumps, loads
+
+from pytest import raises
+from tests.commons import build_media, catch
+
+from anilist.client.streaming import StreamingParser, aiter_objects, iter_objects
+
+
+def _response() -> bytes:
+    media = loads(build_media().stringify())
+    media["description"] = 'Escaped \\" quotes, [brackets] and {braces}, "media": []'
+
+    return dumps(
+        {
+            "data": {
+                "Page": {
+                    "pageInfo": {"hasNextPage": True, "media": [1]},
+                    "media": [media, {"id": 2, "genres": []}, {"id": 3}],
+                    "after": [{"id": 4}],
+                }
+            }
+        },
+        indent=2,
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
+def _chunks(data: bytes, size: int):
+    return [data[x : x + size] for x in range(0, len(data), size)]
+
+
+def test_streaming_parser():
+    from anilist.types import MediaData
+
+    data = _response()
+    expected = [build_media(), MediaData(2, genres=[]), MediaData(3)]
+    expected[0].description = loads(data)["data"]["Page"]["media"][0]["description"]
+
+    # Result should be the same irrespective of how the response is split up.
+    for size in (1, 2, 3, 7, 64, len(data)):
+        assert list(iter_objects(_chunks(data, size))) == expected
+
+    # Entries are handed out as soon as they are complete.
+    parser = StreamingParser()
+    first = data.index(b'"id": 2,')
+    assert len(parser.feed(data[:first])) == 1
+    assert parser.found and not parser.done
+    assert len(parser.feed(data[first:])) == 2
+    assert parser.done
+    assert parser.close() == []
+
+    # Entries that are not objects, and an array at a custom path.
+    parser = StreamingParser(("a", "b"))
+    raw = b'{"x": {"b": [0]}, "a": {"b": [1, "two", null, [3], {"c": 4}]}}'
+    items = [loads(x) for chunk in _chunks(raw, 5) for x in parser.feed(chunk)]
+    assert items + parser.close() == [1, "two", None, [3], {"c": 4}]
+
+    parser = StreamingParser()
+    assert parser.feed(b'{"data": null}') == []
+    assert parser.close() == [] and not parser.found
+
+    catch(TypeError, StreamingParser, "data")
+    catch(TypeError, StreamingParser().feed, "text")
+
+    for broken in (data[:-10], b'{"data": "unterminated', b"}"):
+        with raises(ValueError):
+            parser = StreamingParser()
+            parser.feed(broken)
+            parser.close()
+
+
+def test_streaming_async():
+    async def chunks():
+        for chunk in _chunks(_response(), 100):
+            yield chunk
+
+    async def collect():
+        return [x.id async for x in aiter_objects(chunks())]
+
+    assert run(collect()) == [21, 2, 3]
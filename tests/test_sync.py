@@ -0,0 +1,94 @@
+# Tests the incremental sync of a catalogue, against a stand-in for the API.
+
+from asyncio import Event, create_task, run, sleep
+
+from aiohttp import web
+from pytest import raises
+from tests.commons import catch, stand_in
+
+from anilist import Anilist
+from anilist.catalogue import DeltaSync, MediaCatalogue
+from anilist.client.rate_limit import TokenBucket
+from anilist.types import MediaType
+
+
+def _handler(updated, requests):
+    # Pages through the media, most recently updated first.
+    async def handler(request):
+        variables = (await request.json())["variables"]
+        requests.append(variables)
+
+        assert variables["sort"] == ["UPDATED_AT_DESC"]
+        page, per_page = variables["page"], variables["perPage"]
+
+        ordered = sorted(updated.items(), key=lambda x: (-x[1], x[0]))
+        chunk = ordered[(page - 1) * per_page : page * per_page]
+        info = {"currentPage": page, "hasNextPage": page * per_page < len(ordered)}
+        media = [{"id": x, "updatedAt": y, "type": "ANIME"} for x, y in chunk]
+
+        return web.json_response({"data": {"Page": {"pageInfo": info, "media": media}}})
+
+    return handler
+
+
+def test_sync(tmp_path):
+    updated = {x: 1000 + x for x in range(1, 96)}
+    requests = []
+    path = tmp_path / "mark.json"
+
+    async def main():
+        reports = []
+        async with stand_in(_handler(updated, requests)) as url:
+            async with Anilist(url, limiter=TokenBucket(1000, 1000)) as client:
+                catalogue = MediaCatalogue()
+                syncer = DeltaSync(client, catalogue, path, per_page=10)
+
+                # Full pass on the first sync.
+                reports.append(await syncer.sync())
+
+                # Nothing changed, a single page.
+                reports.append(await syncer.sync())
+
+                # A few media updated, one of them at the same second as the mark.
+                for media_id, time in ((3, 2000), (50, 2001), (7, 1095)):
+                    updated[media_id] = time
+                reports.append(
+                    await DeltaSync(client, catalogue, path, per_page=10).sync()
+                )
+
+                # The mark is picked up from the file.
+                resumed = DeltaSync(client, catalogue, path, per_page=10)
+                assert resumed.mark == 2001
+
+                stop = Event()
+                task = create_task(resumed.run(interval=0.01, stop=stop))
+                await sleep(0.1)
+                stop.set()
+                await task
+
+        return reports, catalogue
+
+    reports, catalogue = run(main())
+    first, second, third = reports
+
+    assert first == {"pages": 10, "received": 95, "stored": 95, "mark": 1095}
+    assert len(catalogue) == 95 and len(requests) > 12
+
+    assert second == {"pages": 1, "received": 10, "stored": 0, "mark": 1095}
+    assert third == {"pages": 1, "received": 10, "stored": 3, "mark": 2001}
+    assert catalogue[3].updatedAt == 2000 and catalogue[7].updatedAt == 1095
+
+    assert "type" not in requests[0]
+
+
+def test_sync_arguments(tmp_path):
+    catalogue = MediaCatalogue()
+
+    catch(TypeError, DeltaSync, None, [])
+    with raises(TypeError):
+        DeltaSync(None, catalogue, media_type="ANIME")
+    with raises(ValueError):
+        DeltaSync(None, catalogue, per_page=100)
+
+    syncer = DeltaSync(None, catalogue, tmp_path / "missing.json", MediaType.MANGA)
+    assert syncer.mark is None
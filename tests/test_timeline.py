@@ -0,0 +1,190 @@
+# Tests the airing timeline, and the scheduler refreshing it.
+
+from asyncio import Event, create_task, run, sleep
+
+from aiohttp import web
+from tests.commons import catch, stand_in
+
+from anilist import Anilist
+from anilist.catalogue import (
+    AiringTimeline,
+    MediaCatalogue,
+    RefreshScheduler,
+    time_until,
+)
+from anilist.client.rate_limit import TokenBucket
+from anilist.types import AiringSchedule, MediaData
+
+NOW = 1_700_000_000
+HOUR = 3600
+
+
+def _episode(media_id: int, episode: int, hours: float) -> AiringSchedule:
+    return AiringSchedule(
+        media_id * 100 + episode, NOW + int(hours * HOUR), 0, episode, media_id
+    )
+
+
+def test_timeline():
+    timeline = AiringTimeline(
+        [_episode(1, 5, 2), _episode(2, 1, 30), _episode(1, 6, 170), _episode(3, 9, -1)]
+    )
+    assert len(timeline) == 4 and 1 in timeline and 4 not in timeline
+
+    upcoming = timeline.upcoming(48, now=NOW)
+    assert [(x.mediaId, x.episode) for x in upcoming] == [(1, 5), (2, 1)]
+    assert [x.timeUntilAiring for x in upcoming] == [2 * HOUR, 30 * HOUR]
+    assert timeline.upcoming(1, now=NOW) == []
+
+    assert timeline.next_episode(1, now=NOW).episode == 5
+    assert timeline.next_episode(1, now=NOW + 3 * HOUR).episode == 6
+    assert timeline.next_episode(3, now=NOW) is None
+    assert timeline.next_episode(4, now=NOW) is None
+    assert time_until(_episode(1, 1, 1), NOW + 60) == HOUR - 60
+
+    # The same episode is replaced, when delayed.
+    timeline.add(_episode(1, 5, 26))
+    assert [x.mediaId for x in timeline.upcoming(48, now=NOW)] == [1, 2]
+    assert len(timeline) == 4
+
+    # Media replaces every episode of the media, with its next airing episode.
+    timeline.add(MediaData(1, next_airing=_episode(1, 7, 200)))
+    assert [x.episode for x in timeline.between(NOW, NOW + 1000 * HOUR)] == [1, 7]
+    timeline([MediaData(2)])
+    assert 2 not in timeline and sorted(timeline.media()) == [1, 3]
+
+    assert timeline.prune(NOW) == 1 and [x.mediaId for x in timeline] == [1]
+    timeline.remove(1)
+    timeline.remove(1)
+    assert len(timeline) == 0
+
+    catch(TypeError, timeline.add, {"airingAt": NOW})
+
+
+def test_scheduler():
+    timeline = AiringTimeline(
+        [_episode(1, 5, 0.5), _episode(2, 1, 3), _episode(3, 9, 12), _episode(4, 2, -1)]
+    )
+    scheduler = RefreshScheduler(timeline, None)
+
+    # The closer to airing, the more often the media is polled.
+    intervals = [scheduler.interval(x, NOW) for x in range(1, 6)]
+    assert intervals == [300, 900, 3600, 300, 6 * HOUR]
+    assert scheduler.interval(3, NOW - 20 * HOUR) == 6 * HOUR
+
+    for media_id in range(1, 6):
+        scheduler.track(media_id, NOW)
+    assert len(scheduler) == 5 and scheduler.next_due() == NOW + 300
+
+    assert scheduler.due(NOW + 299) == []
+    assert scheduler.due(NOW + 900) == [1, 4, 2]
+    assert scheduler.next_due() == NOW + 3600
+
+    # Tracking again replaces the refresh.
+    scheduler.track(5, NOW)
+    scheduler.untrack(3)
+    assert scheduler.due(NOW + 7 * HOUR) == [5] and len(scheduler) == 0
+    assert scheduler.next_due() is None
+
+    catch(TypeError, RefreshScheduler, [], None)
+    catch(TypeError, scheduler.track, "1")
+
+
+def test_scheduler_refresh():
+    requests = []
+
+    # Media 1 airs its next episode, media 2 finishes airing.
+    async def handler(request):
+        variables = (await request.json())["variables"]
+        requests.append(variables["id_in"])
+
+        media = []
+        for x in variables["id_in"]:
+            entry = {"id": x, "type": "ANIME"}
+            if x == 1:
+                entry["nextAiringEpisode"] = {
+                    "id": 106,
+                    "airingAt": NOW + 170 * HOUR,
+                    "timeUntilAiring": 0,
+                    "episode": 6,
+                    "mediaId": 1,
+                }
+            media.append(entry)
+
+        page = {"pageInfo": {"total": len(media)}, "media": media}
+        return web.json_response({"data": {"Page": page}})
+
+    async def main():
+        timeline = AiringTimeline([_episode(1, 5, -0.1), _episode(2, 12, 0.5)])
+        catalogue = MediaCatalogue()
+
+        async with stand_in(handler) as url:
+            async with Anilist(url, limiter=TokenBucket(1000, 1000)) as client:
+                scheduler = RefreshScheduler(timeline, client, catalogue)
+                scheduler.track(1, NOW)
+                scheduler.track(2, NOW)
+                scheduler.track(3, NOW)
+
+                nothing = await scheduler.refresh(NOW)
+                media = await scheduler.refresh(NOW + 300)
+
+                # Both are now days away from airing (or not airing).
+                due = scheduler.next_due()
+
+                # Running refreshes everything that is due (all of it, in real time),
+                # then sleeps till stopped.
+                stop = Event()
+                task = create_task(scheduler.run(stop))
+                await sleep(0.1)
+                stop.set()
+                await task
+
+        return timeline, catalogue, scheduler, nothing, media, due
+
+    timeline, catalogue, scheduler, nothing, media, due = run(main())
+
+    assert nothing == [] and requests == [[1, 2], [3, 1, 2]]
+    assert sorted(x.id for x in media) == [1, 2] and len(catalogue) == 3
+    assert [(x.mediaId, x.episode) for x in timeline] == [(1, 6)]
+    assert due == NOW + 6 * HOUR and len(scheduler) == 3
+
+
+def test_scheduler_errors():
+    class Client:
+        # Fails every batch starting with media 1, returns the media otherwise.
+        def __init__(self):
+            self.calls = 0
+
+        async def execute(self, query, variables, decode):
+            self.calls += 1
+            if variables["id_in"][0] == 1:
+                raise ConnectionError
+
+            return [MediaData(x) for x in variables["id_in"]], None
+
+    async def main():
+        client = Client()
+        catalogue = MediaCatalogue()
+        scheduler = RefreshScheduler(AiringTimeline(), client, catalogue)
+        for media_id in range(1, 61):
+            scheduler.track(media_id, NOW)
+
+        # The failed batch is scheduled again, the other one is still applied.
+        try:
+            await scheduler.refresh(NOW + 7 * HOUR)
+        except ConnectionError:
+            failed = True
+
+        assert failed and len(scheduler) == 60 and len(catalogue) == 10
+        assert scheduler.next_due() == NOW + 13 * HOUR
+
+        # Running keeps going after a failure.
+        stop = Event()
+        task = create_task(scheduler.run(stop))
+        await sleep(0.1)
+        stop.set()
+        await task
+
+        assert client.calls == 4 and len(scheduler) == 60
+
+    run(main())